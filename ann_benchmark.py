@@ -0,0 +1,139 @@
+"""
+ANN 인덱스 recall@k / 지연시간 리포트
+정확 검색(flat) 결과를 기준으로 IVF / HNSW / IVF-PQ의 검색 파라미터별 recall과 쿼리당 지연시간 측정
+
+사용법:
+    python ann_benchmark.py --count 20000 --queries 200 --k 10
+    python ann_benchmark.py --embeddings professor_embeddings.npy   # 실제 임베딩 사용
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+import faiss
+import numpy as np
+
+from ann_index import build_index, set_search_params, describe_index
+from vector_engine import normalize_rows
+
+# 인덱스 타입별 검색 파라미터 스윕
+SWEEPS = {
+    "flat": [{}],
+    "ivf": [{"nprobe": n} for n in (1, 4, 8, 16, 32, 64)],
+    "hnsw": [{"ef_search": ef} for ef in (16, 32, 64, 128, 256)],
+    "ivfpq": [{"nprobe": n} for n in (1, 4, 8, 16, 32, 64)],
+}
+
+
+def synthetic_vectors(count: int, dimension: int, clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """연구분야 군집 구조를 흉내 낸 가우시안 혼합 정규화 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=count)
+    noise = rng.standard_normal((count, dimension)).astype(np.float32) * 0.8
+    return normalize_rows(centers[labels] + noise)
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    """저장된 벡터에 잡음을 더해 쿼리 생성 (실제 쿼리는 문서와 완전히 같지 않으므로)"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, vectors.shape[0], size=count)
+    noise = rng.standard_normal((count, vectors.shape[1])).astype(np.float32) * 0.05
+    return normalize_rows(np.asarray(vectors[picks]) + noise)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """정확 검색 상위 k 중 ANN이 찾은 비율"""
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def run_report(vectors: np.ndarray, queries: np.ndarray, k: int, index_types: List[str],
+               index_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """인덱스별 빌드 시간, 파라미터별 recall@k와 지연시간 측정"""
+    exact = build_index(vectors, "flat")
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type, **index_params)
+        build_seconds = time.perf_counter() - start
+        actual_type = describe_index(index)["type"]
+
+        for params in SWEEPS[actual_type]:
+            set_search_params(index, **params)
+
+            # 서비스 환경과 같이 쿼리 1개씩 검색하여 지연시간 측정
+            latencies = []
+            found = np.empty_like(truth)
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                _, ids = index.search(query.reshape(1, -1), k)
+                latencies.append(time.perf_counter() - start)
+                found[i] = ids[0]
+
+            latencies_ms = np.array(latencies) * 1000
+            rows.append({
+                "index_type": actual_type,
+                "params": params,
+                "build_seconds": round(build_seconds, 3),
+                f"recall@{k}": round(recall_at_k(found, truth), 4),
+                "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+                "p95_ms": round(float(np.percentile(latencies_ms, 95)), 4),
+                "memory_mb": round(index_memory_mb(index), 1),
+            })
+            print_row(rows[-1], k)
+
+    return rows
+
+
+def index_memory_mb(index) -> float:
+    """직렬화 크기로 인덱스 메모리 근사"""
+    return faiss.serialize_index(index).nbytes / 1024 / 1024
+
+
+def print_row(row: Dict[str, Any], k: int):
+    params = ", ".join(f"{key}={value}" for key, value in row["params"].items()) or "-"
+    print(f"  {row['index_type']:<6} {params:<14} recall@{k}={row[f'recall@{k}']:.3f}  "
+          f"p50={row['p50_ms']:.3f}ms  p95={row['p95_ms']:.3f}ms  "
+          f"build={row['build_seconds']:.1f}s  mem={row['memory_mb']:.0f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ANN 인덱스 recall@k / 지연시간 리포트')
+    parser.add_argument('--embeddings', default=None,
+                        help='실제 임베딩 행렬(.npy) 경로 (없으면 합성 벡터 사용)')
+    parser.add_argument('--count', type=int, default=20000, help='합성 벡터 수')
+    parser.add_argument('--dimension', type=int, default=1536, help='합성 벡터 차원')
+    parser.add_argument('--queries', type=int, default=200, help='쿼리 수')
+    parser.add_argument('--k', type=int, default=10, help='recall@k의 k')
+    parser.add_argument('--index-types', nargs='+', default=list(SWEEPS), choices=list(SWEEPS))
+    parser.add_argument('--pq-m', type=int, default=64, help='PQ 서브벡터 수')
+    parser.add_argument('--output', default='ann_report.json', help='결과 JSON 경로')
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = normalize_rows(np.load(args.embeddings, mmap_mode='r'))
+    else:
+        vectors = synthetic_vectors(args.count, args.dimension)
+    queries = make_queries(vectors, args.queries)
+
+    print(f"📊 벡터 {vectors.shape[0]}개 x {vectors.shape[1]}차원, 쿼리 {len(queries)}개, k={args.k}")
+    rows = run_report(vectors, queries, args.k, args.index_types, {"pq_m": args.pq_m})
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "count": int(vectors.shape[0]),
+            "dimension": int(vectors.shape[1]),
+            "queries": len(queries),
+            "k": args.k,
+            "results": rows,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"💾 리포트 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
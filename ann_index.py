@@ -0,0 +1,99 @@
+"""
+FAISS 인덱스 백엔드 선택
+정확 검색(flat) / IVF / HNSW / IVF-PQ 인덱스 생성과 검색 시점 파라미터(nprobe, efSearch) 설정
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+import faiss
+import numpy as np
+
+from vector_engine import normalize_rows
+
+INDEX_TYPES = ["flat", "ivf", "hnsw", "ivfpq"]
+
+# PQ 코드북(2^8 중심) 학습에 필요한 최소 벡터 수
+PQ_MIN_TRAINING = 256 * 39
+
+
+def default_nlist(count: int) -> int:
+    """IVF 클러스터 수 기본값 (약 4√N, 클러스터당 학습 벡터 39개 이상 보장)"""
+    return max(1, min(int(4 * math.sqrt(count)), count // 39))
+
+
+def build_index(vectors: np.ndarray, index_type: str = "flat", nlist: Optional[int] = None,
+                hnsw_m: int = 32, ef_construction: int = 200, pq_m: int = 64) -> faiss.Index:
+    """정규화 벡터로 내적(=코사인) 기반 FAISS 인덱스 생성"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 타입: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+
+    vectors = normalize_rows(vectors)
+    count, dimension = vectors.shape
+
+    if index_type == "ivfpq" and (count < PQ_MIN_TRAINING or dimension % pq_m != 0):
+        print(f"⚠️ IVF-PQ 학습 조건 미충족 (벡터 {count}개, 차원 {dimension}, pq_m {pq_m}) → IVF로 대체")
+        index_type = "ivf"
+
+    if index_type == "ivf" and count < 39:
+        print(f"⚠️ IVF 학습에 벡터가 부족합니다 ({count}개) → flat으로 대체")
+        index_type = "flat"
+
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dimension)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        nlist = nlist or default_nlist(count)
+        factory = f"IVF{nlist},Flat" if index_type == "ivf" else f"IVF{nlist},PQ{pq_m}"
+        index = faiss.index_factory(dimension, factory, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+
+    index.add(vectors)
+    enable_reconstruct(index)
+    return index
+
+
+def enable_reconstruct(index: faiss.Index):
+    """IVF 인덱스의 direct map 구성 (저장 파일에 포함되지 않으므로 로드/추가 후마다 호출)"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        # 같은 타입으로 다시 설정하면 재구성되지 않으므로 한 번 해제 후 재생성
+        ivf.set_direct_map_type(faiss.DirectMap.NoMap)
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """인덱스 객체에서 타입 이름 추정"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return "ivfpq" if isinstance(faiss.downcast_index(ivf), faiss.IndexIVFPQ) else "ivf"
+    if hasattr(index, "hnsw"):
+        return "hnsw"
+    return "flat"
+
+
+def supports_removal(index: faiss.Index) -> bool:
+    """벡터 삭제 후 위치 재번호가 LangChain FAISS 매핑과 일치하는지 (flat만 해당)"""
+    return isinstance(index, faiss.IndexFlat)
+
+
+def set_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """검색 시점 파라미터 설정 (해당 인덱스 타입에만 적용)"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if nprobe is not None and ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    if ef_search is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+
+
+def describe_index(index: faiss.Index) -> Dict[str, Any]:
+    """인덱스 설정 요약"""
+    info = {"type": index_type_of(index), "count": int(index.ntotal), "dimension": int(index.d)}
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        info.update(nlist=int(ivf.nlist), nprobe=int(ivf.nprobe))
+    if hasattr(index, "hnsw"):
+        info.update(ef_search=int(index.hnsw.efSearch))
+    return info
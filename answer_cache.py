@@ -0,0 +1,142 @@
+"""
+의미 기반 답변 캐시
+질문 임베딩 유사도(임계값) + 질문 유형 + 검색된 교수 ID 집합이 같은 이전 답변을 LLM 생성 없이 재사용
+(TTL 만료 + 크기 기반 LRU 제거, 벡터 저장소 버전이 바뀌면 전체 무효화)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class CachedAnswer:
+    """캐시된 답변 한 건"""
+    query: str
+    query_type: str
+    professor_ids: FrozenSet[str]
+    answer: str
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """질문 임베딩 행렬 위의 최근접 탐색으로 동작하는 답변 캐시
+
+    임베딩은 미리 할당한 (max_entries x dimension) 정규화 행렬의 슬롯에 보관하여
+    조회 시 행렬곱 한 번으로 전체 항목과의 유사도를 계산한다.
+    """
+
+    def __init__(self, threshold: float = 0.9, ttl_seconds: float = 3600, max_entries: int = 1024,
+                 version: str = None):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version = version
+
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    @staticmethod
+    def professor_ids_of(documents: Iterable) -> FrozenSet[str]:
+        """근거 문서의 교수 ID 집합 (문서 메타데이터 professor_id)"""
+        return frozenset(doc.metadata.get("professor_id") for doc in documents or []
+                         if doc.metadata.get("professor_id"))
+
+    def _release(self, slot: int):
+        del self._entries[slot]
+        self._valid[slot] = False
+        self._free_slots.append(slot)
+
+    def get(self, embedding: Sequence[float], query_type: str,
+            professor_ids: FrozenSet[str] = frozenset()) -> Optional[CachedAnswer]:
+        """유사도 임계값 이상이고 질문 유형과 교수 ID 집합이 같은 가장 가까운 답변 반환"""
+        query = self._normalize(embedding)
+        now = time.time()
+
+        with self._lock:
+            if self._matrix is None or not self._entries or self._matrix.shape[1] != query.shape[0]:
+                self.counters["misses"] += 1
+                return None
+
+            similarities = self._matrix @ query
+            similarities[~self._valid] = -np.inf
+            for slot in np.argsort(-similarities):
+                slot = int(slot)
+                if similarities[slot] < self.threshold:
+                    break
+                entry = self._entries[slot]
+                if now - entry.created_at > self.ttl_seconds:
+                    self._release(slot)
+                    self.counters["expirations"] += 1
+                    continue
+                if entry.query_type == query_type and entry.professor_ids == professor_ids:
+                    self._entries.move_to_end(slot)
+                    self.counters["hits"] += 1
+                    return entry
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, embedding: Sequence[float], query: str, query_type: str, answer: str,
+            professor_ids: FrozenSet[str] = frozenset()):
+        """답변 저장 (가득 차면 가장 오래 사용되지 않은 항목 제거)"""
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                # 첫 저장 또는 임베딩 차원 변경 시 행렬 재할당 (기존 항목은 폐기)
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._entries.clear()
+                self._valid[:] = False
+                self._free_slots = list(range(self.max_entries - 1, -1, -1))
+
+            if not self._free_slots:
+                oldest = next(iter(self._entries))
+                self._release(oldest)
+                self.counters["evictions"] += 1
+
+            slot = self._free_slots.pop()
+            self._matrix[slot] = vector
+            self._valid[slot] = True
+            self._entries[slot] = CachedAnswer(query, query_type, frozenset(professor_ids), answer,
+                                               time.time())
+
+    def set_version(self, version: str):
+        """벡터 저장소 버전 설정 (이전과 다르면 캐시 전체 무효화)"""
+        with self._lock:
+            changed = self.version is not None and version != self.version
+            self.version = version
+        if changed:
+            self.clear()
+            self.counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._valid[:] = False
+            self._free_slots = list(range(self.max_entries - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """적중률 등 캐시 통계"""
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+        }
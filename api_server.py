@@ -0,0 +1,361 @@
+"""
+연구실 추천 HTTP/JSON API 서버
+Streamlit 없이 LabRecommenderRAG를 서비스하는 헤드리스 엔드포인트 + 동시 요청 임베딩/검색 마이크로 배치
+
+사용법:
+    python api_server.py --port 8000 --max-batch 32 --max-wait-ms 5
+
+엔드포인트:
+    GET  /health
+    GET  /metrics                                               # Prometheus 텍스트 형식 지표
+    GET  /traces                                                # 최근 질문별 계측 기록 (JSON)
+    POST /query       {"query": "...", "session_id": "..."}   # 자동 질문 분류
+    POST /recommend   {"query": "..."}                         # 연구실 추천 (new_search)
+    POST /professor   {"query": "...", "session_id": "..."}   # 교수 상세 정보 (professor_detail)
+    POST /refine      {"query": "...", "session_id": "..."}   # 이전 추천 결과 내 추가 질문 (refine_previous)
+    POST /general     {"query": "..."}                         # 대학원 일반 질문 (general_info)
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import AbstractSet, Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain.schema import Document
+
+import metrics
+from ann_index import INDEX_TYPES
+from rag_lab_recommender import LabRecommenderRAG, ConversationHistory
+from retrieval import ProfessorRetriever
+
+# 엔드포인트 → 강제 질문 유형 (None이면 classify_query로 자동 분류)
+ROUTES = {
+    "/query": None,
+    "/recommend": "new_search",
+    "/professor": "professor_detail",
+    "/refine": "refine_previous",
+    "/general": "general_info",
+}
+
+
+class MicroBatcher:
+    """동시 요청의 쿼리 임베딩을 한 번의 API 호출로 묶고, 검색을 쿼리 행렬 단위로 실행하는 배처
+
+    첫 요청이 들어온 뒤 max_wait_ms 동안(또는 max_batch개가 찰 때까지) 모인 요청을 한 배치로 처리한다.
+    """
+
+    def __init__(self, embeddings, max_batch: int = 32, max_wait_ms: float = 5.0):
+        self.embeddings = embeddings
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[str, str, Optional[AbstractSet[str]], ProfessorRetriever, Future]]" = queue.Queue()
+        self.stats = {"requests": 0, "batches": 0, "max_batch_seen": 0}
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, embed_text: str, lexical_text: str, retriever: ProfessorRetriever,
+               professor_filter: Optional[AbstractSet[str]] = None) -> Future:
+        """검색 요청 등록 (dense 검색은 embed_text, BM25는 lexical_text, 우선 교수는 professor_filter 사용)"""
+        future = Future()
+        self._queue.put((embed_text, lexical_text, professor_filter, retriever, future))
+        return future
+
+    def search(self, embed_text: str, lexical_text: str, retriever: ProfessorRetriever,
+               professor_filter: Optional[AbstractSet[str]] = None) -> List[Document]:
+        return self.submit(embed_text, lexical_text, retriever, professor_filter).result()
+
+    def _collect(self) -> List[Tuple[str, str, Optional[AbstractSet[str]], ProfessorRetriever, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+            try:
+                self._process(batch)
+            except Exception as e:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _process(self, batch: List[Tuple[str, str, Optional[AbstractSet[str]], ProfessorRetriever, Future]]):
+        # 중복 텍스트는 한 번만 임베딩 (캐시 적중분은 CachedEmbeddings가 API 호출에서 제외)
+        unique_texts = list(dict.fromkeys(embed_text for embed_text, *_ in batch))
+        with metrics.stage("batch_embedding"):
+            vectors = dict(zip(unique_texts, self.embeddings.embed_documents(unique_texts)))
+        metrics.REGISTRY.inc("batch_size_total", len(batch), "마이크로 배치로 처리한 요청 수")
+        metrics.REGISTRY.inc("batches_total", 1, "마이크로 배치 수")
+
+        # 같은 검색기(brief/detail)를 쓰는 요청끼리 쿼리 행렬로 한 번에 검색
+        groups: Dict[int, List[int]] = {}
+        for i, (*_, retriever, _) in enumerate(batch):
+            groups.setdefault(id(retriever), []).append(i)
+
+        for members in groups.values():
+            retriever = batch[members[0]][3]
+            results = retriever.search_by_vectors(
+                [vectors[batch[i][0]] for i in members],
+                [batch[i][1] for i in members],
+                [batch[i][2] for i in members],
+            )
+            for i, docs in zip(members, results):
+                batch[i][4].set_result(docs)
+
+
+class SessionStore:
+    """세션 ID별 ConversationHistory (LRU + 유휴 시간 만료, 세션별 잠금)"""
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, Tuple[ConversationHistory, threading.Lock, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, session_id: Optional[str]) -> Tuple[str, ConversationHistory, threading.Lock]:
+        now = time.time()
+        with self._lock:
+            # 최근 사용 순서로 정렬되어 있으므로 앞쪽의 만료된 세션만 제거
+            while self._sessions and now - next(iter(self._sessions.values()))[2] > self.ttl_seconds:
+                self._sessions.popitem(last=False)
+            entry = self._sessions.pop(session_id, None) if session_id else None
+            if entry is None:
+                session_id = session_id or uuid.uuid4().hex
+                entry = (ConversationHistory(), threading.Lock(), now)
+            self._sessions[session_id] = (entry[0], entry[1], now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id, entry[0], entry[1]
+
+    def get(self, session_id: Optional[str]) -> Tuple[str, ConversationHistory]:
+        """세션 히스토리 조회 (없거나 만료되었으면 새로 생성)"""
+        session_id, history, _ = self._entry(session_id)
+        return session_id, history
+
+    @contextmanager
+    def acquire(self, session_id: Optional[str]) -> Iterator[Tuple[str, ConversationHistory]]:
+        """세션 히스토리를 잠근 채 사용 (같은 세션의 동시 요청은 순서대로 처리)"""
+        session_id, history, lock = self._entry(session_id)
+        with lock:
+            yield session_id, history
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def memory_bytes(self) -> int:
+        """전체 세션 히스토리의 대략적인 크기 (세션당 max_turns 턴으로 제한됨)"""
+        with self._lock:
+            histories = [history for history, *_ in self._sessions.values()]
+        return sum(history.memory_bytes() for history in histories)
+
+
+class RecommendationService:
+    """공유 RAG 엔진 + 마이크로 배처 + 세션 저장소를 묶은 API 처리 로직"""
+
+    def __init__(self, rag: LabRecommenderRAG, max_batch: int = 32, max_wait_ms: float = 5.0):
+        self.rag = rag
+        self.batcher = MicroBatcher(rag.embeddings, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        self.sessions = SessionStore()
+
+    def handle(self, query: str, query_type: str = None, session_id: str = None) -> Dict[str, Any]:
+        """질문 하나 처리 - 분류 → 확장 → (배치) 검색 → 생성
+
+        응답의 timings는 요청 Trace의 단계별 합계(ms)이며, 배치 워커에서 실행되는
+        임베딩/벡터 검색은 retrieval(배치 대기 포함) 한 단계로 집계된다.
+        """
+        # 같은 세션의 요청이 동시에 오면 히스토리를 읽고 쓰는 전체 과정을 순서대로 처리
+        with self.sessions.acquire(session_id) as (session_id, history):
+            with metrics.start_trace("api", query=query, endpoint=query_type or "auto") as trace:
+                # 엔드포인트가 유형을 정하면 분류(규칙/라우터/LLM) 생략
+                if query_type is None:
+                    query_type = self.rag.classify_query(query, history).get("type", "new_search")
+                if query_type == "refine_previous" and not history.retrieved:
+                    query_type = "new_search"
+                metrics.set_attribute("query_type", query_type)
+
+                enhanced_query, docs = "", None
+                # 이름으로 교수가 확정되는 상세 질문은 번역/배치 검색 없이 프로필을 직접 사용
+                named_pids = self.rag.named_professors(query_type, query)
+                if self.rag.needs_retrieval(query_type, named_pids):
+                    enhanced_query = self.rag.enhance_query_with_translation(query)
+                    retriever = self.rag.detail_retriever if query_type == "professor_detail" else self.rag.retriever
+                    with metrics.stage("retrieval"):
+                        docs = self.batcher.search(query, enhanced_query, retriever, self.rag.professor_filter(query))
+
+                prompt, docs = self.rag.prepare_strategy(query_type, query, enhanced_query, docs, history, named_pids)
+                answer = self.rag.generate_answer(query, query_type, prompt, docs)
+
+            history.add_turn(query, answer, docs)
+            history.last_trace = trace
+        timings = {**trace.stage_totals(), "total": trace.duration_ms}
+        return {
+            "session_id": session_id,
+            "query_type": query_type,
+            "enhanced_query": enhanced_query if enhanced_query != query else "",
+            "answer": answer,
+            "professors": [self.professor_summary(doc) for doc in docs],
+            "timings": {stage: round(ms, 1) for stage, ms in timings.items()},
+            "tokens": dict(trace.tokens),
+            "trace_id": trace.trace_id,
+        }
+
+    @staticmethod
+    def professor_summary(doc: Document) -> Dict[str, Any]:
+        """응답 JSON용 교수 요약 (근거 문서 메타데이터)"""
+        metadata = doc.metadata
+        return {
+            "professor_id": metadata.get("professor_id"),
+            "name": metadata.get("professor_name"),
+            "lab": metadata.get("lab_name"),
+            "university": metadata.get("university"),
+            "department": metadata.get("department"),
+            "email": metadata.get("email"),
+            "score": metadata.get("score"),
+        }
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "sessions": len(self.sessions),
+            "session_history_bytes": self.sessions.memory_bytes(),
+            "batcher": dict(self.batcher.stats),
+            "embedding_cache": self.rag.embedding_cache.stats(),
+            "answer_cache": self.rag.answer_cache.stats(),
+        }
+
+    def prometheus_metrics(self) -> str:
+        """누적 단계/토큰/캐시 지표 + 현재 캐시/세션 상태 게이지"""
+        gauges = {
+            "sessions": len(self.sessions),
+            "session_history_bytes": self.sessions.memory_bytes(),
+            "answer_cache_entries": len(self.rag.answer_cache),
+            "embedding_cache_hit_rate": self.rag.embedding_cache.stats()["hit_rate"],
+            "answer_cache_hit_rate": self.rag.answer_cache.stats()["hit_rate"],
+        }
+        lines = [metrics.render_prometheus()]
+        for name, value in gauges.items():
+            metric = f"{metrics.METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge\n{metric} {value:g}\n")
+        return "".join(lines)
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    """JSON 요청/응답 핸들러"""
+
+    server_version = "LabRecommenderAPI/0.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_body(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send_body(status, body, "application/json; charset=utf-8")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.server.service.health())
+        elif self.path == "/metrics":
+            body = self.server.service.prometheus_metrics().encode("utf-8")
+            self._send_body(200, body, "text/plain; version=0.0.4; charset=utf-8")
+        elif self.path == "/traces":
+            self._send_json(200, metrics.recent_traces())
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ROUTES:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self._send_json(400, {"error": "invalid JSON body"})
+            return
+
+        query = str(payload.get("query", "")).strip()
+        if not query:
+            self._send_json(400, {"error": "query is required"})
+            return
+
+        try:
+            result = self.server.service.handle(query, ROUTES[self.path], payload.get("session_id"))
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, result)
+
+
+def create_server(service: RecommendationService, host: str = "127.0.0.1", port: int = 8000,
+                  verbose: bool = False) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), APIHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='연구실 추천 HTTP/JSON API 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--data', default='professors_final_complete.json', help='교수 데이터 JSON 경로')
+    parser.add_argument('--vector-store', default='./vector_store', help='벡터 저장소 경로')
+    parser.add_argument('--index-type', default='flat', choices=INDEX_TYPES)
+    parser.add_argument('--k', type=int, default=5, help='추천할 교수 수')
+    parser.add_argument('--fetch-k', type=int, default=100, help='MMR 후보 수')
+    parser.add_argument('--max-batch', type=int, default=32, help='마이크로 배치 최대 요청 수')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help='배치를 모으는 최대 대기 시간(ms)')
+    parser.add_argument('--verbose', action='store_true', help='요청 로그 출력')
+    parser.add_argument('--trace-log', default=None,
+                        help='질문별 계측 기록(JSON Lines) 파일 경로 ("-"이면 표준 에러)')
+    args = parser.parse_args()
+
+    if args.trace_log:
+        metrics.configure_trace_log(None if args.trace_log == "-" else args.trace_log)
+
+    rag = LabRecommenderRAG(args.data, args.vector_store, index_type=args.index_type)
+    if not rag.load_vector_store():
+        rag.create_vector_store()
+    rag.setup_qa_chains(k=args.k, fetch_k=args.fetch_k)
+
+    service = RecommendationService(rag, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server = create_server(service, args.host, args.port, args.verbose)
+    print(f"🚀 API 서버 실행: http://{args.host}:{server.server_address[1]} "
+          f"(배치 최대 {args.max_batch}개 / {args.max_wait_ms}ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 서버를 종료합니다.")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
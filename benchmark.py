@@ -0,0 +1,375 @@
+"""
+오프라인 엔드투엔드 벤치마크
+가짜 Azure OpenAI 백엔드(요청 지연 / 토큰 생성 속도 / 실패 주입) 위에서 LabRecommenderRAG와
+LabRecommendationSystem에 질문 코퍼스를 재생하여 교수 수별 p50/p95/p99 지연시간, 첫 토큰 지연,
+처리량, 메모리를 측정하고 JSON으로 저장 (이전 리포트와 비교해 회귀 검사)
+
+사용법:
+    python benchmark.py --sizes 31 1000 10000 --queries 200 --concurrency 4
+    python benchmark.py --sizes 100000 --dimension 256 --systems rag      # 대규모는 차원을 낮춰 메모리 절약
+    python benchmark.py --latency-ms 80 --token-rate 60 --failure-rate 0.02
+    python benchmark.py --baseline bench_report.json --max-regression 0.2  # 회귀 시 종료 코드 1
+"""
+
+import os
+
+# 가짜 벡터가 실제 임베딩 캐시(SQLite)에 섞이지 않도록 메모리 캐시만 사용 (프로젝트 모듈 import 전에 설정)
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+# 실제 임베딩으로 학습된 질문 라우터 파일이 있어도 가짜 벡터에 적용하지 않음 (분류는 규칙 기반으로 고정)
+os.environ["QUERY_ROUTER_PATH"] = ""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from corpus_utils import professor_id
+from fake_openai_server import fake_embedding, start_background_server
+from lexical_index import BM25Index
+from professor_store import ProfessorStore
+from synthetic_corpus import SyntheticCorpusGenerator
+
+# 재생할 대화 (세션 단위, 후속 질문은 같은 히스토리에서 처리)
+CONVERSATIONS = [
+    ["인공지능과 머신러닝으로 의료 영상을 연구하고 싶어", "그 중에서 PET/CT를 다루는 곳은?"],
+    ["암 면역치료 연구실 추천해줘"],
+    ["유전체 분석과 단일세포 시퀀싱 연구에 관심있어", "그 교수님들 연락처 알려줘"],
+    ["뇌 신경과학 연구하고 싶어"],
+    ["강건욱 교수님 연구실 알려줘"],
+    ["대학원 입학 절차가 궁금해"],
+    ["줄기세포와 재생의학 연구실", "그 중에서 동물실험을 하는 곳은?"],
+    ["감염병 백신 개발 연구하고 싶어"],
+    ["CyTOF 면역 프로파일링 하는 연구실"],
+    ["대사질환 비만 연구에 관심있어"],
+]
+
+DEFAULT_SIZES = [31, 1000, 10000, 100000]
+SYSTEMS = ["rag", "lab"]
+ERROR_PREFIXES = ("추천 생성 중 오류", "OpenAI 클라이언트가 초기화되지")
+
+
+def embed_matrix(texts: List[str], dimension: int) -> np.ndarray:
+    """가짜 서버와 같은 결정적 의사 임베딩을 HTTP 없이 직접 계산 (색인 단계 전용)"""
+    matrix = np.empty((len(texts), dimension), dtype=np.float32)
+    for i, text in enumerate(texts):
+        matrix[i] = fake_embedding(text, dimension)
+        if (i + 1) % 50000 == 0:
+            print(f"   임베딩 {i + 1}/{len(texts)}")
+    return matrix
+
+
+def memory_mb() -> Tuple[float, float]:
+    """현재 RSS / 최대 RSS (MB, /proc와 resource를 쓸 수 없는 플랫폼에서는 0)"""
+    current = peak = 0.0
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except (OSError, ImportError, ValueError):
+        pass
+    return current, peak
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 2) if values else None
+
+
+def build_rag(professors: List[Dict[str, Any]], workdir: str, dimension: int, k: int):
+    """합성 코퍼스로 LabRecommenderRAG 구성 (청크 임베딩은 오프라인 계산, 쿼리/생성은 가짜 백엔드 사용)"""
+    from rag_lab_recommender import LabRecommenderRAG
+
+    data_path = os.path.join(workdir, "professors.json")
+    with open(data_path, "w", encoding="utf-8") as f:
+        json.dump({"교수진": professors}, f, ensure_ascii=False)
+
+    rag = LabRecommenderRAG(data_path, os.path.join(workdir, "vector_store"))
+    rag.embeddings.embeddings.dimensions = dimension
+    # 오프라인 실행이므로 tiktoken 인코딩 다운로드 없이 원문을 그대로 전송
+    rag.embeddings.embeddings.check_embedding_ctx_length = False
+
+    documents = rag.load_and_chunk_data()
+    ids = [doc.metadata.get("doc_id", doc.metadata["professor_id"]) for doc in documents]
+    rag.vector_store = rag.build_vector_store(documents, ids, embed_matrix([doc.page_content for doc in documents],
+                                                                           dimension))
+    rag.lexical_index = BM25Index.from_documents(documents)
+    rag.setup_qa_chains(k=k)
+    return rag, len(documents)
+
+
+def build_lab_system(professors: List[Dict[str, Any]], dimension: int):
+    """합성 코퍼스로 LabRecommendationSystem 구성 (Streamlit 캐시 로더 대신 데이터/행렬을 직접 설정)"""
+    from generate_embeddings import EmbeddingGenerator
+    from streamlit_lab_recommender import LabRecommendationSystem
+
+    system = LabRecommendationSystem()
+    system.professor_store = ProfessorStore.from_professors(professors)
+    system.prompt_snippets = system.build_prompt_snippets()
+    texts = [EmbeddingGenerator.create_professor_text_for_embedding(professor) for professor in professors]
+    system.search_engine.set_matrix(embed_matrix(texts, dimension))
+    ok, message = system.init_openai_client()
+    if not ok:
+        raise RuntimeError(message)
+    return system, len(professors)
+
+
+def make_rag_runner(rag) -> Callable[[List[str]], List[Dict[str, Any]]]:
+    """대화 하나를 같은 히스토리로 처리하고 턴별 측정값 반환"""
+    from rag_lab_recommender import ConversationHistory
+
+    def run(turns: List[str]) -> List[Dict[str, Any]]:
+        history = ConversationHistory()
+        samples = []
+        for query in turns:
+            start = time.perf_counter()
+            first_token = None
+            try:
+                for _ in rag.process_query_stream(query, history):
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                ok = True
+            except Exception:
+                ok = False
+            trace = history.last_trace
+            samples.append({
+                "ok": ok,
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "first_token_ms": first_token * 1000 if first_token is not None else None,
+                "stages_ms": trace.stage_totals() if ok and trace is not None else {},
+            })
+        return samples
+
+    return run
+
+
+def make_lab_runner(system, k: int) -> Callable[[List[str]], List[Dict[str, Any]]]:
+    """단일 턴 추천 (벡터 매칭 → GPT 스트리밍) 측정"""
+
+    def run(turns: List[str]) -> List[Dict[str, Any]]:
+        samples = []
+        for query in turns:
+            start = time.perf_counter()
+            first_token, parts = None, []
+            matches = system.find_similar_professors(query, top_k=k)
+            matching = time.perf_counter() - start
+            for token in system.stream_recommendation_with_gpt(query, matches):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                parts.append(token)
+            answer = "".join(parts)
+            samples.append({
+                "ok": bool(matches) and not answer.startswith(ERROR_PREFIXES),
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "first_token_ms": first_token * 1000 if first_token is not None else None,
+                "stages_ms": {"matching": matching * 1000},
+            })
+        return samples
+
+    return run
+
+
+def replay(run: Callable[[List[str]], List[Dict[str, Any]]], conversations: List[List[str]],
+           total_queries: int, concurrency: int) -> Dict[str, Any]:
+    """대화를 순환하며 total_queries개 질문을 재생 (대화 단위로 concurrency개 동시 실행)"""
+    sessions, count = [], 0
+    while count < total_queries:
+        for turns in conversations:
+            turns = turns[:total_queries - count]
+            if not turns:
+                break
+            sessions.append(turns)
+            count += len(turns)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = [sample for result in executor.map(run, sessions) for sample in result]
+    wall = time.perf_counter() - start
+
+    succeeded = [sample for sample in samples if sample["ok"]]
+    latencies = [sample["latency_ms"] for sample in succeeded]
+    first_tokens = [sample["first_token_ms"] for sample in succeeded if sample["first_token_ms"] is not None]
+    stage_values: Dict[str, List[float]] = {}
+    for sample in succeeded:
+        for stage, ms in sample["stages_ms"].items():
+            stage_values.setdefault(stage, []).append(ms)
+
+    return {
+        "queries": len(samples),
+        "errors": len(samples) - len(succeeded),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": round(float(np.mean(latencies)), 2) if latencies else None,
+        "first_token_p50_ms": percentile(first_tokens, 50),
+        "first_token_p95_ms": percentile(first_tokens, 95),
+        "throughput_qps": round(len(succeeded) / wall, 3) if wall > 0 else None,
+        "stage_p50_ms": {stage: percentile(values, 50) for stage, values in stage_values.items()},
+    }
+
+
+def run_benchmark(args, conversations: List[List[str]], base: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """교수 수 × 시스템 조합별 색인 후 질문 재생"""
+    # 원본 교수를 앞에 포함해 교수명 질문 등이 그대로 동작하도록 함
+    generator = SyntheticCorpusGenerator(base, seed=args.seed)
+    rows = []
+    for size in args.sizes:
+        professors = list(generator.generate(size))
+        for system_name in args.systems:
+            gc.collect()
+            rss_before, _ = memory_mb()
+            start = time.perf_counter()
+            with tempfile.TemporaryDirectory() as workdir:
+                if system_name == "rag":
+                    system, indexed = build_rag(professors, workdir, args.dimension, args.k)
+                    run = make_rag_runner(system)
+                    # 같은 질문을 반복 재생하므로 답변 캐시를 끄고 매번 생성 경로를 측정 (코사인 유사도는 1을 넘지 않음)
+                    system.answer_cache.threshold = 2.0
+                else:
+                    system, indexed = build_lab_system(professors, args.dimension)
+                    run = make_lab_runner(system, args.k)
+                    system.answer_cache.threshold = 2.0
+                index_seconds = time.perf_counter() - start
+                rss_indexed, _ = memory_mb()
+
+                print(f"\n📊 {system_name} | 교수 {size}명 (색인 단위 {indexed}개, {index_seconds:.1f}s)")
+                # 파이프라인 진행 로그는 --verbose일 때만 출력
+                output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+                with output:
+                    # 워밍업 (커넥션 수립, 지연 import 등은 측정에서 제외)
+                    run(conversations[0][:1])
+                    result = replay(run, conversations, args.queries, args.concurrency)
+
+            rss_after, peak = memory_mb()
+            row = {
+                "system": system_name,
+                "professors": size,
+                "indexed_units": indexed,
+                "index_seconds": round(index_seconds, 2),
+                **result,
+                "rss_mb": round(rss_after, 1),
+                "index_rss_delta_mb": round(rss_indexed - rss_before, 1),
+                "peak_rss_mb": round(peak, 1),
+            }
+            rows.append(row)
+            print_row(row)
+            del system, run
+    return rows
+
+
+def print_row(row: Dict[str, Any]):
+    print(f"  p50={row['p50_ms']}ms  p95={row['p95_ms']}ms  p99={row['p99_ms']}ms  "
+          f"첫 토큰 p50={row['first_token_p50_ms']}ms  처리량={row['throughput_qps']}qps  "
+          f"오류={row['errors']}/{row['queries']}  메모리 +{row['index_rss_delta_mb']}MB")
+    if row["stage_p50_ms"]:
+        print("  단계별 p50: " + ", ".join(f"{stage} {ms}ms" for stage, ms in row["stage_p50_ms"].items()))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_with_baseline(rows: List[Dict[str, Any]], baseline_path: str, max_regression: float) -> List[str]:
+    """같은 (시스템, 교수 수)의 p95 지연시간/처리량이 기준 리포트보다 max_regression 이상 나빠졌는지 검사"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(row["system"], row["professors"]): row for row in json.load(f)["results"]}
+
+    regressions = []
+    for row in rows:
+        previous = baseline.get((row["system"], row["professors"]))
+        if not previous:
+            continue
+        label = f"{row['system']} / 교수 {row['professors']}명"
+        if previous.get("p95_ms") and row["p95_ms"] and row["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{label}: p95 {previous['p95_ms']}ms → {row['p95_ms']}ms")
+        if (previous.get("throughput_qps") and row["throughput_qps"]
+                and row["throughput_qps"] < previous["throughput_qps"] * (1 - max_regression)):
+            regressions.append(f"{label}: 처리량 {previous['throughput_qps']} → {row['throughput_qps']}qps")
+    return regressions
+
+
+def load_conversations(path: Optional[str]) -> List[List[str]]:
+    """질문 파일(한 줄에 질문 하나, 각각 독립 세션) 또는 기본 대화 코퍼스"""
+    if not path:
+        return CONVERSATIONS
+    with open(path, "r", encoding="utf-8") as f:
+        return [[line.strip()] for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='가짜 Azure OpenAI 백엔드 기반 오프라인 벤치마크')
+    parser.add_argument('--data', default='professors_final_complete.json', help='합성 템플릿 교수 데이터')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='교수 수 목록')
+    parser.add_argument('--systems', nargs='+', default=SYSTEMS, choices=SYSTEMS,
+                        help='rag: LabRecommenderRAG / lab: LabRecommendationSystem')
+    parser.add_argument('--queries', type=int, default=100, help='크기별 재생할 질문 수')
+    parser.add_argument('--query-file', default=None, help='질문 파일 (한 줄에 하나)')
+    parser.add_argument('--concurrency', type=int, default=1, help='동시 세션 수')
+    parser.add_argument('--k', type=int, default=5, help='추천 교수 수')
+    parser.add_argument('--dimension', type=int, default=1536, help='임베딩 차원')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='가짜 백엔드 요청당 지연(ms)')
+    parser.add_argument('--token-rate', type=float, default=0.0, help='가짜 LLM 생성 속도(토큰/초, 0이면 즉시)')
+    parser.add_argument('--completion-tokens', type=int, default=120, help='가짜 LLM 답변 토큰 수')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='가짜 백엔드 500 응답 확률')
+    parser.add_argument('--seed', type=int, default=0, help='합성 코퍼스 / 실패 주입 시드')
+    parser.add_argument('--output', default='bench_report.json', help='결과 JSON 경로')
+    parser.add_argument('--baseline', default=None, help='비교할 이전 결과 JSON')
+    parser.add_argument('--verbose', action='store_true', help='파이프라인 진행 로그 출력')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='허용 회귀 비율 (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    server = start_background_server(port=0, dimension=args.dimension, latency_ms=args.latency_ms,
+                                     token_rate=args.token_rate, failure_rate=args.failure_rate,
+                                     completion_tokens=args.completion_tokens, seed=args.seed)
+    os.environ.update(
+        AZURE_OPENAI_ENDPOINT=f"http://127.0.0.1:{server.server_address[1]}",
+        OPENAI_API_KEY="fake",
+        OPENAI_API_VERSION="2024-02-01",
+    )
+
+    with open(args.data, "r", encoding="utf-8") as f:
+        base = json.load(f)["교수진"]
+    # 템플릿 교수 ID 중복이 있으면 합성 결과도 겹치므로 미리 확인
+    if len({professor_id(professor) for professor in base}) != len(base):
+        print("⚠️ 템플릿 데이터에 중복 교수 ID가 있습니다.")
+
+    print(f"🧪 가짜 백엔드: 지연 {args.latency_ms}ms, 생성 {args.token_rate or '∞'}토큰/초, "
+          f"실패율 {args.failure_rate:.0%} | 차원 {args.dimension}, 동시 세션 {args.concurrency}")
+    rows = run_benchmark(args, load_conversations(args.query_file), base)
+    server.shutdown()
+
+    report = {
+        "timestamp": time.time(),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "results": rows,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 리포트 저장: {args.output}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(rows, args.baseline, args.max_regression)
+        if regressions:
+            print(f"❌ 성능 회귀 ({args.max_regression:.0%} 초과):")
+            for message in regressions:
+                print(f"  - {message}")
+            sys.exit(1)
+        print(f"✅ 기준 리포트 대비 회귀 없음 ({args.baseline})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+교수 프로필 필드별 청크 분할
+연구분야 / 연구주제 / 기술및방법 / 논문(편별) / 학력경력 / 학생지도 단위로 나누고 상위 교수 메타데이터를 부착
+"""
+
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+
+CHUNK_TYPE_LABELS = {
+    "research": "연구분야",
+    "topics": "연구주제",
+    "methods": "기술 및 방법",
+    "paper": "논문",
+    "career": "학력 및 경력",
+    "mentoring": "학생지도",
+}
+
+
+def chunk_prefix(metadata: Dict[str, Any]) -> str:
+    """임베딩 품질을 위해 각 청크 앞에 붙이는 교수/연구실 표기"""
+    return f"[{metadata['professor_name']} · {metadata.get('lab_name') or '연구실 정보 없음'}] "
+
+
+def chunk_body(doc: Document) -> str:
+    """청크 본문에서 교수/연구실 접두어 제거"""
+    prefix = chunk_prefix(doc.metadata)
+    if doc.page_content.startswith(prefix):
+        return doc.page_content[len(prefix):]
+    return doc.page_content
+
+
+def chunk_professor_id(doc_id: str) -> str:
+    """청크 문서 ID("교수ID:순번")의 교수 ID (교수 단위 문서 ID는 그대로)"""
+    return doc_id.split(":", 1)[0]
+
+
+def professor_header(metadata: Dict[str, Any]) -> str:
+    """프롬프트용 교수 기본 정보 (청크 묶음 앞에 한 번만 표시)"""
+    affiliation = " ".join(filter(None, [metadata.get("university"), metadata.get("department")]))
+    lines = [f"교수명: {metadata['professor_name']}" + (f" ({affiliation})" if affiliation else "")]
+    if metadata.get("lab_name"):
+        lines.append(f"연구실: {metadata['lab_name']}")
+    if metadata.get("keywords"):
+        lines.append(f"연구분야: {metadata['keywords']}")
+    if metadata.get("email"):
+        lines.append(f"이메일: {metadata['email']}")
+    return "\n".join(lines)
+
+
+def create_professor_chunks(professor: Dict[str, Any], metadata: Dict[str, Any]) -> List[Document]:
+    """교수 한 명을 필드 타입별 청크 Document 목록으로 분할"""
+    sections = []
+
+    research = "\n".join(filter(None, [professor['연구분야']['키워드'], professor['연구분야']['설명']]))
+    if research:
+        sections.append(("research", research))
+    if professor['연구주제']:
+        sections.append(("topics", "\n".join(professor['연구주제'])))
+    if professor['기술및방법']:
+        sections.append(("methods", "\n".join(professor['기술및방법'])))
+    for paper in professor['논문']:
+        sections.append(("paper", paper))
+    if professor['학력경력']:
+        sections.append(("career", "\n".join(professor['학력경력'])))
+
+    guidance = "\n".join(filter(None, [professor['학생지도'].get('특징'), professor['학생지도'].get('진로')]))
+    if guidance:
+        sections.append(("mentoring", guidance))
+
+    # 내용이 전혀 없는 교수도 이름/연구실로 검색될 수 있도록 최소 1개 청크 유지
+    if not sections:
+        sections.append(("research", "정보 없음"))
+
+    prefix = chunk_prefix(metadata)
+    chunks = []
+    for n, (chunk_type, text) in enumerate(sections):
+        chunks.append(Document(
+            page_content=f"{prefix}{CHUNK_TYPE_LABELS[chunk_type]}: {text}",
+            metadata={**metadata, "chunk_type": chunk_type, "doc_id": f"{metadata['professor_id']}:{n}"}
+        ))
+    return chunks
@@ -0,0 +1,37 @@
+"""
+공용 테스트 fixture - 가짜 Azure OpenAI 서버에 연결한 LabRecommenderRAG
+"""
+import json
+import os
+
+import pytest
+
+from fake_openai_server import start_background_server
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "professors_final_complete.json")
+
+
+@pytest.fixture(scope="module")
+def fake_rag(tmp_path_factory):
+    """교수 5명으로 색인한 엔진 (임베딩/채팅은 로컬 가짜 서버, 캐시/라우터/용어 사전 기본 경로는 임시 폴더)"""
+    workdir = tmp_path_factory.mktemp("fake_rag")
+    server = start_background_server(port=0)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(workdir)
+        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", f"http://127.0.0.1:{server.server_address[1]}")
+        monkeypatch.setenv("OPENAI_API_KEY", "fake")
+        monkeypatch.setenv("OPENAI_API_VERSION", "2024-02-01")
+        from rag_lab_recommender import LabRecommenderRAG
+
+        with open(DATA_PATH, "r", encoding="utf-8") as f:
+            professors = json.load(f)["교수진"][:5]
+        data_path = workdir / "professors.json"
+        data_path.write_text(json.dumps({"교수진": professors}, ensure_ascii=False), encoding="utf-8")
+
+        rag = LabRecommenderRAG(str(data_path), str(workdir / "vector_store"))
+        # 가짜 서버는 tiktoken 토큰 배열도 받지만 토크나이저 다운로드를 피하기 위해 텍스트로 전송
+        rag.embeddings.embeddings.check_embedding_ctx_length = False
+        rag.create_vector_store()
+        rag.setup_qa_chains(k=3)
+        yield rag
+    server.shutdown()
@@ -0,0 +1,28 @@
+"""
+교수진 코퍼스 공용 유틸리티
+교수 고유 ID / 콘텐츠 해시 계산
+"""
+
+import hashlib
+import json
+from typing import Any, Dict
+
+
+def professor_id(professor: Dict[str, Any]) -> str:
+    """교수 고유 ID (대학명/학과명/교수명/이메일 기반, 데이터 갱신에도 유지)"""
+    basic = professor["기본정보"]
+    key = "/".join([
+        basic.get("대학명", ""),
+        basic.get("학과명", ""),
+        basic.get("교수이름", ""),
+        basic.get("이메일", "").strip().lower(),
+    ])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def content_hash(text: str, metadata: Dict[str, Any] = None) -> str:
+    """문서 본문 + 메타데이터의 콘텐츠 해시"""
+    payload = text
+    if metadata:
+        payload += "\x1f" + json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
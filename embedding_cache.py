@@ -0,0 +1,178 @@
+"""
+임베딩 캐시
+메모리 LRU + SQLite 디스크 2단 캐시 (모델명 / 차원 / 정규화 텍스트 해시 기반 키)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from metrics import record_cache, stage
+
+DEFAULT_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFC + 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """임베딩 벡터 2단 캐시 (메모리 LRU → SQLite)"""
+
+    def __init__(self, model: str, dimension: int, max_memory_entries: int = 2048,
+                 db_path: Optional[str] = DEFAULT_CACHE_PATH):
+        self.model = model
+        self.dimension = dimension
+        self.max_memory_entries = max_memory_entries
+        self.db_path = db_path
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dimension INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn.commit()
+
+    def make_key(self, text: str) -> str:
+        """모델명, 차원, 정규화 텍스트로 콘텐츠 해시 키 생성"""
+        raw = f"{self.model}\x1f{self.dimension}\x1f{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """메모리 LRU에 저장 (용량 초과 시 가장 오래된 항목 제거)"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """캐시 조회 - 없으면 None"""
+        key = self.make_key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return vector.tolist()
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.counters["disk_hits"] += 1
+                    return vector.tolist()
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, text: str, embedding: List[float]):
+        """캐시 저장 (메모리 + 디스크)"""
+        self.put_many([text], [embedding])
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        """여러 임베딩을 한 번의 트랜잭션으로 저장"""
+        rows = []
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self.make_key(text)
+                vector = np.asarray(embedding, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, self.model, self.dimension, vector.tobytes(), time.time()))
+
+            if self._conn is not None and rows:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """히트/미스/제거 카운터 반환"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain 임베딩 모델을 EmbeddingCache로 감싼 래퍼"""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """캐시에 없는 텍스트만 모아서 한 번에 임베딩"""
+        results = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(results) if vector is None]
+
+        if missing:
+            new_vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many([texts[i] for i in missing], new_vectors)
+            for i, vector in zip(missing, new_vectors):
+                results[i] = vector
+
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        with stage("embedding"):
+            vector = self.cache.get(text)
+            record_cache("embedding", vector is not None)
+            if vector is None:
+                vector = self.embeddings.embed_query(text)
+                self.cache.put(text, vector)
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        results = [self.cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(results) if vector is None]
+
+        if missing:
+            new_vectors = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            self.cache.put_many([texts[i] for i in missing], new_vectors)
+            for i, vector in zip(missing, new_vectors):
+                results[i] = vector
+
+        return results
+
+    async def aembed_query(self, text: str) -> List[float]:
+        with stage("embedding"):
+            vector = self.cache.get(text)
+            record_cache("embedding", vector is not None)
+            if vector is None:
+                vector = await self.embeddings.aembed_query(text)
+                self.cache.put(text, vector)
+        return vector
@@ -0,0 +1,191 @@
+"""
+교수 임베딩 저장 포맷
+정규화된 float32 행렬(.npy, memmap으로 로드) + JSON 헤더(모델, 차원, 개수, 교수 ID 목록/콘텐츠 해시 요약값)
++ 행별 목록 파일(.rows.json: 교수 ID, 콘텐츠 해시, 프롬프트 요약 등 - 필요할 때만 로드)
+
+사용법 (기존 pickle 파일 변환):
+    python embedding_store.py convert professor_embeddings.pkl --data professors_final_complete.json
+"""
+
+import argparse
+import json
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corpus_utils import professor_id, content_hash
+from vector_engine import normalize_rows
+
+FORMAT_VERSION = 2
+# 행별 목록을 헤더 안에 그대로 담던 이전 포맷 (로드 시 요약값을 계산해 호환)
+LEGACY_FORMAT_VERSION = 1
+LEGACY_ROW_FIELDS = ("professor_ids", "content_hashes", "professor_names", "prompt_snippets")
+DEFAULT_EMBEDDING_PATH = "professor_embeddings.npy"
+
+
+def header_path_for(matrix_path: str) -> str:
+    """행렬 파일 경로에 대응하는 JSON 헤더 경로"""
+    return os.path.splitext(matrix_path)[0] + ".json"
+
+
+def rows_path_for(matrix_path: str) -> str:
+    """행렬 파일 경로에 대응하는 행별 목록 파일 경로"""
+    return os.path.splitext(matrix_path)[0] + ".rows.json"
+
+
+def ids_digest(professor_ids: Sequence[str]) -> str:
+    """교수 ID 목록(순서 포함) 전체의 요약 해시 - 헤더에는 목록 대신 이 값만 저장"""
+    return content_hash("\n".join(professor_ids))
+
+
+def save_embedding_matrix(matrix_path: str, embeddings: Sequence[Sequence[float]], model: str,
+                          professor_ids: List[str], content_hashes: List[str],
+                          extra: Dict[str, Any] = None, rows: Dict[str, List[Any]] = None) -> Dict[str, Any]:
+    """정규화 float32 행렬과 헤더를 저장 (헤더는 마지막에 원자적으로 교체)"""
+    matrix = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    if len(professor_ids) != matrix.shape[0]:
+        raise ValueError("교수 ID/해시 개수가 임베딩 개수와 일치하지 않습니다.")
+
+    np.save(matrix_path, matrix)
+    return write_embedding_header(matrix_path, model, int(matrix.shape[1]), professor_ids, content_hashes,
+                                  extra, rows)
+
+
+def _write_json(path: str, payload: Dict[str, Any]):
+    """임시 파일에 쓴 뒤 원자적으로 교체"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_embedding_header(matrix_path: str, model: str, dimension: int, professor_ids: List[str],
+                           content_hashes: List[str], extra: Dict[str, Any] = None,
+                           rows: Dict[str, List[Any]] = None) -> Dict[str, Any]:
+    """이미 저장된 정규화 행렬(.npy)의 헤더 작성 (행렬을 memmap으로 직접 채운 경우에도 사용)
+
+    교수 ID/콘텐츠 해시와 rows(교수명, 프롬프트 요약 등 행별 목록)는 행별 목록 파일에 저장하고,
+    헤더에는 시작할 때 비교할 요약값만 남긴다 (헤더 크기가 교수 수와 무관).
+    """
+    if len(professor_ids) != len(content_hashes):
+        raise ValueError("교수 ID/해시 개수가 임베딩 개수와 일치하지 않습니다.")
+    row_lists = {"professor_ids": list(professor_ids), "content_hashes": list(content_hashes), **(rows or {})}
+    if any(len(values) != len(professor_ids) for values in row_lists.values()):
+        raise ValueError("행별 목록 길이가 임베딩 개수와 일치하지 않습니다.")
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "model": model,
+        "dimension": int(dimension),
+        "count": len(professor_ids),
+        "dtype": "float32",
+        "normalized": True,
+        "ids_digest": ids_digest(professor_ids),
+        "content_digest": content_hash(json.dumps(list(content_hashes))),
+        "row_fields": sorted(row_lists),
+    }
+    if extra:
+        header.update(extra)
+
+    # 헤더가 마지막에 교체되므로 헤더가 가리키는 행별 목록은 항상 완성된 상태
+    _write_json(rows_path_for(matrix_path), row_lists)
+    _write_json(header_path_for(matrix_path), header)
+    return header
+
+
+def load_embedding_matrix(matrix_path: str = DEFAULT_EMBEDDING_PATH) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """헤더를 읽고 행렬을 읽기 전용 memmap으로 연결 (복사 없음)"""
+    with open(header_path_for(matrix_path), 'r', encoding='utf-8') as f:
+        header = json.load(f)
+
+    if header.get("format_version") == LEGACY_FORMAT_VERSION:
+        # 이전 포맷: 헤더의 목록에서 요약값을 계산 (행별 목록은 헤더에 그대로 둠)
+        header["ids_digest"] = ids_digest(header["professor_ids"])
+        header["content_digest"] = content_hash(json.dumps(header["content_hashes"]))
+    elif header.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 임베딩 포맷 버전: {header.get('format_version')}")
+
+    matrix = np.load(matrix_path, mmap_mode='r')
+    if matrix.shape != (header["count"], header["dimension"]) or matrix.dtype != np.float32:
+        raise ValueError(f"임베딩 행렬 형태가 헤더와 다릅니다: {matrix.shape} {matrix.dtype}")
+
+    return matrix, header
+
+
+def load_embedding_rows(matrix_path: str, header: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """행별 목록(교수 ID, 콘텐츠 해시, 프롬프트 요약 등) 로드 - 목록이 실제로 필요할 때만 호출"""
+    if header.get("format_version") == LEGACY_FORMAT_VERSION:
+        return {field: header[field] for field in LEGACY_ROW_FIELDS if field in header}
+    with open(rows_path_for(matrix_path), 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    if len(rows.get("professor_ids", ())) != header["count"]:
+        raise ValueError("행별 목록 파일이 임베딩 헤더와 일치하지 않습니다.")
+    return rows
+
+
+def load_embedding_row_field(matrix_path: str, header: Dict[str, Any], field: str) -> Optional[List[Any]]:
+    """행별 목록 중 한 필드 (없거나 길이가 맞지 않으면 None)"""
+    values = load_embedding_rows(matrix_path, header).get(field)
+    return values if values is not None and len(values) == header["count"] else None
+
+
+def convert_pickle(pickle_path: str, data_path: str, matrix_path: str = DEFAULT_EMBEDDING_PATH) -> Dict[str, Any]:
+    """기존 professor_embeddings.pkl을 새 포맷으로 변환 (신뢰할 수 있는 로컬 파일만 사용)"""
+    # 순환 import 방지를 위해 지연 import
+    from generate_embeddings import EmbeddingGenerator
+
+    with open(pickle_path, 'rb') as f:
+        embedding_data = pickle.load(f)
+
+    with open(data_path, 'r', encoding='utf-8') as f:
+        professors = json.load(f)["교수진"]
+
+    embeddings = embedding_data["embeddings"]
+    if len(embeddings) != len(professors):
+        raise ValueError(f"임베딩 {len(embeddings)}개와 교수 {len(professors)}명이 일치하지 않습니다.")
+
+    # 교수명 순서가 다르면 변환하지 않음
+    names = embedding_data.get("professor_names")
+    if names and names != [prof["기본정보"]["교수이름"] for prof in professors]:
+        raise ValueError("pickle의 교수 순서가 데이터 파일과 다릅니다. 임베딩을 다시 생성해주세요.")
+
+    texts = [EmbeddingGenerator.create_professor_text_for_embedding(prof) for prof in professors]
+    return save_embedding_matrix(
+        matrix_path,
+        embeddings,
+        model=embedding_data.get("model", "text-embedding-3-small"),
+        professor_ids=[professor_id(prof) for prof in professors],
+        content_hashes=[content_hash(text) for text in texts],
+        rows={"prompt_snippets": [EmbeddingGenerator.create_professor_prompt_snippet(prof) for prof in professors]},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='교수 임베딩 저장 포맷 도구')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help='pickle 임베딩 파일을 memmap 포맷으로 변환')
+    convert_parser.add_argument('pickle_path', help='기존 professor_embeddings.pkl 경로')
+    convert_parser.add_argument('--data', default='professors_final_complete.json',
+                                help='교수진 데이터 JSON 경로')
+    convert_parser.add_argument('--output', default=DEFAULT_EMBEDDING_PATH,
+                                help='출력 행렬 경로 (.npy)')
+
+    info_parser = subparsers.add_parser('info', help='임베딩 파일 헤더 확인')
+    info_parser.add_argument('matrix_path', nargs='?', default=DEFAULT_EMBEDDING_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        header = convert_pickle(args.pickle_path, args.data, args.output)
+        print(f"💾 변환 완료: {args.output} ({header['count']}개 벡터, {header['dimension']}차원)")
+    elif args.command == 'info':
+        matrix, header = load_embedding_matrix(args.matrix_path)
+        print(f"📊 모델: {header['model']}, 개수: {header['count']}, 차원: {header['dimension']}")
+        print(f"   정규화: {header['normalized']}, 파일 크기: {matrix.nbytes / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
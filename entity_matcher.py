@@ -0,0 +1,326 @@
+"""
+질문 엔티티 매칭 (코퍼스에서 만든 Aho-Corasick 자동자)
+교수 이름 / 연구실명 / 이메일 / 연구 키워드 / 기술·방법 용어와 연구 관련 일반 단서를
+질문을 한 번 선형 스캔하여 모두 찾는다. 패턴 수와 무관하게 질문 길이(+ 매칭 수)에 비례하는 비용.
+
+사용 예:
+    matcher = EntityMatcher.from_store(store)
+    entities = matcher.match("강건욱 교수님의 PET/CT 연구")
+    mentions = matcher.find_mentions(query, entities)   # 교수 언급 (오타 보정 포함)
+    positions = matcher.term_filter(entities)           # 검색 필터용 교수 레코드 인덱스
+"""
+
+import re
+import sys
+from typing import AbstractSet, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from professor_store import ProfessorStore, name_key
+
+# 교수 한 명(또는 동명이인)을 가리키는 엔티티 / 연구 주제 엔티티
+PROFESSOR_KINDS = frozenset({"name", "lab", "email"})
+TERM_KINDS = frozenset({"keyword", "method"})
+RESEARCH_KINDS = TERM_KINDS | {"cue"}
+
+# 코퍼스와 무관한 연구 관련 일반 단서 (분류용, 검색 필터에는 사용하지 않음)
+RESEARCH_CUES = (
+    "연구", "AI", "인공지능", "머신러닝", "바이오", "의료", "생명과학", "분자", "세포",
+    "유전", "면역", "영상", "신경", "뇌", "암", "종양", "치료", "진단", "약물",
+    "실험실", "연구실", "교수", "추천", "관심", "하고싶다", "배우고싶다",
+)
+
+# 영문 이름 필드에는 이름이 아닌 값("selected", "Neuroscience" 등)이 섞여 있어 사람 이름 형태만 색인
+ENGLISH_NAME_PATTERN = re.compile(r"^[A-Z][a-zA-Z'-]+(?: [A-Z][a-zA-Z'-]+){1,3}$")
+# 오타 보정 대상: "OOO 교수" 앞의 한글 2~4자
+HONORIFIC_PATTERN = re.compile(r"([가-힣]{2,4})\s*교수")
+MIN_LAB_KEY_LENGTH = 4
+# 연구실 필드에 이름 대신 들어간 항목명 등 (질문에 흔히 나오므로 색인하지 않음)
+LAB_KEY_STOPWORDS = frozenset({"실험실명", "연구실명", "laboratory"})
+TERM_SPLIT_PATTERN = re.compile(r"[,;/·|()\[\]\n]")
+MIN_TERM_LENGTH = 2
+MIN_ASCII_TERM_LENGTH = 3
+MAX_TERM_LENGTH = 30
+PARTICLES = ("에서", "으로", "를", "을", "의", "에", "와", "과", "로")
+# 키워드 구를 단어로 나눌 때 용어로 보지 않는 일반어
+TERM_STOPWORDS = frozenset({
+    "이용한", "이용", "통한", "기반", "관련", "개발", "연구", "기술", "분석", "방법", "응용", "활용",
+    "and", "the", "for", "with", "using", "based", "from", "into", "its",
+})
+
+
+def lab_keys(lab_name: str) -> List[str]:
+    """연구실명 패턴 (URL/괄호 속 호수 등을 제거하고 쉼표/콜론으로 나뉜 이름마다 하나)"""
+    text = re.sub(r"https?://\S+", "", lab_name)
+    outer = re.sub(r"\([^)]*\)?", "", text)
+    # 괄호만으로 된 이름은 괄호 안을 사용 ("(Biomedical Electronics Lab)")
+    text = outer if name_key(outer) else text
+    keys = [name_key(part) for part in re.split(r"[,:]", text)]
+    return [key for key in keys if len(key) >= MIN_LAB_KEY_LENGTH and key not in LAB_KEY_STOPWORDS]
+
+
+def term_keys(text: str) -> List[str]:
+    """연구 키워드/기술 항목의 용어 패턴 (구분자로 나눈 구 + 구 안의 단어)"""
+    keys = []
+    for part in TERM_SPLIT_PATTERN.split(text):
+        words = part.split()
+        candidates = [part] + [strip_particle(word) for word in words] if len(words) > 1 else [part]
+        for candidate in candidates:
+            key = name_key(candidate)
+            min_length = MIN_ASCII_TERM_LENGTH if key.isascii() else MIN_TERM_LENGTH
+            if min_length <= len(key) <= MAX_TERM_LENGTH and key not in TERM_STOPWORDS:
+                keys.append(key)
+    return keys
+
+
+def strip_particle(word: str) -> str:
+    """단어 끝의 조사 제거 ("나노입자를" → "나노입자")"""
+    for particle in PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+
+def deletion_variants(key: str) -> List[str]:
+    """한 글자씩 지운 변형 (symmetric delete 방식 오타 보정용)"""
+    return [key[:i] + key[i + 1:] for i in range(len(key))]
+
+
+def compact_text(text: str) -> Tuple[str, Set[int]]:
+    """매칭용 정규화 (소문자 + 문자/숫자만) 및 원문에서 단어 경계였던 위치"""
+    chars: List[str] = []
+    boundaries = {0}
+    for char in text.lower():
+        if char.isalnum():
+            chars.append(char)
+        else:
+            boundaries.add(len(chars))
+    boundaries.add(len(chars))
+    return "".join(chars), boundaries
+
+
+def _is_ascii_alnum(char: str) -> bool:
+    return char.isascii() and char.isalnum()
+
+
+class AhoCorasick:
+    """다중 패턴 문자열 자동자 (전이는 (상태, 문자)를 정수 키로 하는 단일 dict)"""
+
+    _SHIFT = 21  # 유니코드 코드 포인트 < 2^21
+
+    def __init__(self):
+        self.patterns: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._goto: Dict[int, int] = {}
+        self._fail: List[int] = [0]
+        self._output_link: List[int] = [0]
+        self._outputs: Dict[int, List[int]] = {}
+        # 실패 링크 계산용 (build 후 해제)
+        self._parent: List[int] = [0]
+        self._char: List[int] = [0]
+        self._depth: List[int] = [0]
+
+    def add(self, pattern: str) -> int:
+        """패턴 추가 (같은 패턴은 같은 ID)"""
+        if pattern in self._ids:
+            return self._ids[pattern]
+        state = 0
+        for char in pattern:
+            key = (state << self._SHIFT) | ord(char)
+            child = self._goto.get(key)
+            if child is None:
+                child = len(self._fail)
+                self._goto[key] = child
+                self._fail.append(0)
+                self._output_link.append(0)
+                self._parent.append(state)
+                self._char.append(ord(char))
+                self._depth.append(self._depth[state] + 1)
+            state = child
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self._ids[pattern] = pattern_id
+        self._outputs.setdefault(state, []).append(pattern_id)
+        return pattern_id
+
+    def build(self):
+        """실패 링크/출력 링크 계산 (얕은 상태부터)"""
+        order = sorted(range(1, len(self._fail)), key=self._depth.__getitem__)
+        for state in order:
+            parent, char = self._parent[state], self._char[state]
+            if parent == 0:
+                self._fail[state] = 0
+            else:
+                fallback = self._fail[parent]
+                while fallback and ((fallback << self._SHIFT) | char) not in self._goto:
+                    fallback = self._fail[fallback]
+                self._fail[state] = self._goto.get((fallback << self._SHIFT) | char, 0)
+            fail = self._fail[state]
+            self._output_link[state] = fail if fail in self._outputs else self._output_link[fail]
+        self._parent = self._char = self._depth = []
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """(시작, 끝, 패턴 ID) - 겹치는 매칭 포함 전부"""
+        goto, fail, shift = self._goto, self._fail, self._SHIFT
+        state = 0
+        for end, char in enumerate(text, 1):
+            code = ord(char)
+            while state and ((state << shift) | code) not in goto:
+                state = fail[state]
+            state = goto.get((state << shift) | code, 0)
+            node = state if state in self._outputs else self._output_link[state]
+            while node:
+                for pattern_id in self._outputs[node]:
+                    yield end - len(self.patterns[pattern_id]), end, pattern_id
+                node = self._output_link[node]
+
+
+class Entity(NamedTuple):
+    """질문에서 찾은 엔티티 (위치는 정규화된 질문 기준)"""
+    kind: str
+    key: str
+    start: int
+    end: int
+    professors: Tuple[int, ...] = ()
+
+
+class EntityMatcher:
+    """교수 저장소에서 만든 엔티티 자동자 + 이름 오타 보정"""
+
+    def __init__(self, max_filter_share: float = 0.05, min_filter_size: int = 20):
+        self.automaton = AhoCorasick()
+        # 패턴 ID → [(종류, 교수 레코드 인덱스)]
+        self._payloads: List[List[Tuple[str, Tuple[int, ...]]]] = []
+        self._names: Dict[str, Tuple[int, ...]] = {}
+        self._fuzzy_names: Dict[str, Set[str]] = {}
+        # 너무 많은 교수에게 나오는 용어(예: "분석")는 분류에만 쓰고 검색 필터에서는 제외
+        self.max_filter_share = max_filter_share
+        self.min_filter_size = min_filter_size
+
+    @classmethod
+    def from_store(cls, store: ProfessorStore, professor_ids: Optional[AbstractSet[str]] = None,
+                   **kwargs) -> "EntityMatcher":
+        """교수 이름/영문 이름/연구실명/이메일/키워드/기술 용어 + 연구 단서로 자동자 구성
+
+        professor_ids가 주어지면 그 교수(예: 벡터 색인에 있는 교수)만 패턴으로 등록한다.
+        """
+        matcher = cls(**kwargs)
+        entries: Dict[str, Dict[str, Set[int]]] = {}
+
+        def add(kind: str, key: str, position: Optional[int] = None):
+            if key:
+                positions = entries.setdefault(sys.intern(key), {}).setdefault(kind, set())
+                if position is not None:
+                    positions.add(position)
+
+        for record in store:
+            if professor_ids is not None and record.professor_id not in professor_ids:
+                continue
+            add("name", name_key(record.name or ""), record.index)
+            if record.english_name and ENGLISH_NAME_PATTERN.match(record.english_name.strip()):
+                add("name", name_key(record.english_name), record.index)
+            for key in lab_keys(record.lab_name or ""):
+                add("lab", key, record.index)
+            add("email", name_key(record.email or ""), record.index)
+            for key in term_keys(record.keywords or ""):
+                add("keyword", key, record.index)
+            for method in record.methods:
+                for key in term_keys(method):
+                    add("method", key, record.index)
+        for cue in RESEARCH_CUES:
+            add("cue", name_key(cue))
+
+        matcher.build(entries, len(store))
+        return matcher
+
+    def build(self, entries: Dict[str, Dict[str, Set[int]]], total: int):
+        max_filter_size = max(self.min_filter_size, int(total * self.max_filter_share))
+        for key, kinds in entries.items():
+            payload = []
+            for kind, positions in kinds.items():
+                if kind in TERM_KINDS and len(positions) > max_filter_size:
+                    positions = ()
+                payload.append((kind, tuple(sorted(positions))))
+            self.automaton.add(key)
+            self._payloads.append(payload)
+            names = kinds.get("name")
+            if names:
+                self._names[key] = tuple(sorted(names))
+                if len(key) >= 3 and not key.isascii():
+                    for variant in deletion_variants(key):
+                        self._fuzzy_names.setdefault(variant, set()).add(key)
+        self.automaton.build()
+
+    def __len__(self) -> int:
+        return len(self.automaton)
+
+    def match(self, query: str) -> List[Entity]:
+        """질문의 모든 엔티티 (한 번의 선형 스캔)
+
+        영문 패턴은 단어 중간에서 시작/끝나면 제외 ("ai"가 "taiwan"에 매칭되지 않도록).
+        한글은 조사가 붙으므로 경계를 따지지 않는다.
+        """
+        compact, boundaries = compact_text(query)
+        entities = []
+        for start, end, pattern_id in self.automaton.iter_matches(compact):
+            if start not in boundaries and _is_ascii_alnum(compact[start - 1]) and _is_ascii_alnum(compact[start]):
+                continue
+            if end not in boundaries and _is_ascii_alnum(compact[end - 1]) and _is_ascii_alnum(compact[end]):
+                continue
+            key = self.automaton.patterns[pattern_id]
+            for kind, positions in self._payloads[pattern_id]:
+                entities.append(Entity(kind, key, start, end, positions))
+        return entities
+
+    def find_mentions(self, query: str, entities: List[Entity] = None,
+                      fuzzy: bool = True) -> List[Tuple[str, List[int]]]:
+        """질문에 언급된 교수 [(언급된 키, 후보 레코드 인덱스)] - 후보가 여럿이면 동명이인 등 모호한 언급
+
+        긴 언급을 우선해 겹치는 짧은 언급(연구실명 안의 이름 등)은 버린다.
+        정확히 일치하는 언급이 없으면 "OOO 교수" 형태의 이름을 한 글자 오타까지 보정한다.
+        """
+        if entities is None:
+            entities = self.match(query)
+        candidates = sorted((entity for entity in entities if entity.kind in PROFESSOR_KINDS),
+                            key=lambda entity: entity.start - entity.end)
+        mentions: List[Tuple[str, List[int]]] = []
+        covered: List[Tuple[int, int]] = []
+        for entity in candidates:
+            if any(entity.start < end and start < entity.end for start, end in covered):
+                continue
+            covered.append((entity.start, entity.end))
+            mentions.append((entity.key, list(entity.professors)))
+
+        if fuzzy and not mentions:
+            mentions.extend(self.find_fuzzy_names(query))
+        return mentions
+
+    def find_fuzzy_names(self, query: str) -> List[Tuple[str, List[int]]]:
+        """"OOO 교수" 형태의 한글 이름을 한 글자 오타까지 보정해 조회"""
+        mentions = []
+        for match in HONORIFIC_PATTERN.finditer(query):
+            candidate = match.group(1)
+            # 앞 단어에 붙은 글자가 섞일 수 있으므로 끝에서 3/2/4자를 차례로 시도
+            for length in (3, 2, 4):
+                if len(candidate) < length:
+                    continue
+                keys = set()
+                for variant in [candidate[-length:]] + deletion_variants(candidate[-length:]):
+                    if len(variant) >= 2:
+                        keys.update(self._fuzzy_names.get(variant, ()))
+                if keys:
+                    positions = sorted({i for key in keys for i in self._names[key]})
+                    mentions.append((candidate[-length:], positions))
+                    break
+        return mentions
+
+    @staticmethod
+    def is_research_related(entities: Iterable[Entity]) -> bool:
+        return any(entity.kind in RESEARCH_KINDS for entity in entities)
+
+    @staticmethod
+    def term_filter(entities: Iterable[Entity]) -> Optional[FrozenSet[int]]:
+        """연구 키워드/기술 용어를 가진 교수 레코드 인덱스 (검색 필터, 해당 엔티티가 없으면 None)"""
+        positions = {i for entity in entities if entity.kind in TERM_KINDS for i in entity.professors}
+        return frozenset(positions) if positions else None
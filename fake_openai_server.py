@@ -0,0 +1,254 @@
+"""
+로컬 가짜 Azure OpenAI 임베딩/채팅 서버 (테스트/벤치마크용)
+실제 API 없이 임베딩 파이프라인과 답변 생성을 검증하기 위한 결정적(deterministic) 응답 서버
+(요청 지연, 생성 토큰 속도, 실패 주입 설정 가능)
+
+사용법:
+    python fake_openai_server.py --port 8765 --rate-limit-every 7
+    python fake_openai_server.py --latency-ms 80 --token-rate 60 --failure-rate 0.02
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8765 OPENAI_API_KEY=fake python generate_embeddings.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Union
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+|[가-힣]+")
+
+# 가짜 채팅 응답 본문 (토큰 = 공백 단위 단어)
+FAKE_ANSWER_WORDS = (
+    "### 🥇 1순위: 추천 교수 연구실 - **추천 이유:** 질문한 연구 분야와 연구주제 및 기술방법이 "
+    "가장 많이 겹칩니다. **연구 분야:** 관련 키워드 **연락처:** 이메일로 사전 면담을 요청하세요. "
+    "### 🥈 2순위: 관련 연구실 - 공동 연구 주제가 유사하며 실험 기법을 배울 수 있습니다. "
+    "**💡 추가 조언:** 관심 논문을 읽고 구체적인 질문을 준비하면 좋습니다."
+).split()
+
+
+def tokenize_for_fake_embedding(text: str) -> List[str]:
+    """영문/숫자 단어 + 한글 음절 bigram 토큰화"""
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def fake_embedding(text: Union[str, List[int]], dimension: int = 1536) -> List[float]:
+    """해싱 트릭 기반 결정적 의사 임베딩 (토큰이 겹치는 텍스트일수록 유사)"""
+    if isinstance(text, list):
+        # tiktoken 토큰 ID 배열로 들어온 경우
+        tokens = [str(token) for token in text]
+    else:
+        tokens = tokenize_for_fake_embedding(text)
+
+    vector = np.zeros(dimension, dtype=np.float32)
+    for token in tokens or [""]:
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+        # 토큰당 8개 차원에 ±1 기여
+        for j in range(8):
+            index = int.from_bytes(digest[j * 3:j * 3 + 3], "little") % dimension
+            vector[index] += 1.0 if digest[24 + j] & 1 else -1.0
+
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector.tolist()
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Azure/OpenAI 호환 임베딩 엔드포인트 핸들러"""
+
+    server_version = "FakeAzureOpenAI/0.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _should_rate_limit(self) -> bool:
+        """N번째 요청마다 429 반환 (재시도 로직 검증용)"""
+        every = self.server.rate_limit_every
+        if not every:
+            return False
+        with self.server.lock:
+            self.server.request_count += 1
+            return self.server.request_count % every == 0
+
+    def _should_fail(self) -> bool:
+        """failure_rate 확률로 500 반환 (시드 고정 난수로 재현 가능)"""
+        rate = self.server.failure_rate
+        if not rate:
+            return False
+        with self.server.lock:
+            return self.server.rng.random() < rate
+
+    def _handle_chat(self, request: Dict[str, Any]):
+        """채팅 완성 - 고정 답변을 token_rate(토큰/초) 속도로 생성 (stream=true면 SSE)"""
+        prompt = " ".join(str(message.get("content", "")) for message in request.get("messages", []))
+        prompt_tokens = len(tokenize_for_fake_embedding(prompt))
+        limit = request.get("max_tokens") or request.get("max_completion_tokens") or self.server.completion_tokens
+        words = [FAKE_ANSWER_WORDS[i % len(FAKE_ANSWER_WORDS)]
+                 for i in range(min(limit, self.server.completion_tokens))]
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+        base = {"id": f"chatcmpl-{self.server.request_count}", "created": int(time.time()),
+                "model": request.get("model", "gpt-4o-mini")}
+        delay = 1 / self.server.token_rate if self.server.token_rate else 0.0
+
+        if not request.get("stream"):
+            time.sleep(delay * len(words))
+            self._send_json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": " ".join(words)}}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        def send_event(payload: Dict[str, Any]):
+            self.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        for i, word in enumerate(words):
+            time.sleep(delay)
+            send_event({**base, "object": "chat.completion.chunk", "choices": [{
+                "index": 0, "finish_reason": None,
+                "delta": {"role": "assistant", "content": word if i == 0 else " " + word},
+            }]})
+        send_event({**base, "object": "chat.completion.chunk",
+                    "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}]})
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send_event({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if not path.endswith("/embeddings") and not path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {path}"}})
+            return
+
+        if self._should_rate_limit():
+            self._send_json(429, {"error": {"code": "429", "message": "Rate limit exceeded"}},
+                            headers={"Retry-After": "0"})
+            return
+
+        if self._should_fail():
+            self._send_json(500, {"error": {"code": "500", "message": "Injected failure"}})
+            return
+
+        # 요청당 고정 지연 (네트워크 + 첫 토큰까지의 시간)
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+
+        if path.endswith("/chat/completions"):
+            self._handle_chat(request)
+            return
+
+        inputs = request.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        dimension = request.get("dimensions") or self.server.dimension
+
+        data = [
+            {"object": "embedding", "index": i, "embedding": fake_embedding(item, dimension)}
+            for i, item in enumerate(inputs)
+        ]
+        token_count = sum(len(item) if isinstance(item, list) else len(tokenize_for_fake_embedding(item))
+                          for item in inputs)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": token_count, "total_tokens": token_count},
+        })
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8765, dimension: int = 1536,
+                  rate_limit_every: int = 0, verbose: bool = False, latency_ms: float = 0.0,
+                  token_rate: float = 0.0, failure_rate: float = 0.0, completion_tokens: int = 120,
+                  seed: int = 0) -> ThreadingHTTPServer:
+    """가짜 서버 생성 (port=0이면 빈 포트 자동 할당)
+
+    latency_ms: 요청당 고정 지연, token_rate: 채팅 생성 속도(토큰/초, 0이면 즉시),
+    failure_rate: 500 응답 확률, completion_tokens: 채팅 답변 토큰 수
+    """
+    server = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.dimension = dimension
+    server.rate_limit_every = rate_limit_every
+    server.latency_ms = latency_ms
+    server.token_rate = token_rate
+    server.failure_rate = failure_rate
+    server.completion_tokens = completion_tokens
+    server.rng = random.Random(seed)
+    server.verbose = verbose
+    server.request_count = 0
+    server.lock = threading.Lock()
+    return server
+
+
+def start_background_server(**kwargs) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 서버 실행 후 반환 (server.server_address로 주소 확인)"""
+    server = create_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 가짜 Azure OpenAI 임베딩/채팅 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--dimension', type=int, default=1536)
+    parser.add_argument('--rate-limit-every', type=int, default=0,
+                        help='N번째 요청마다 429 응답 (0이면 비활성화)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='요청당 고정 지연(ms)')
+    parser.add_argument('--token-rate', type=float, default=0.0, help='채팅 생성 속도(토큰/초, 0이면 즉시)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='500 응답 확률 (0~1)')
+    parser.add_argument('--completion-tokens', type=int, default=120, help='채팅 답변 토큰 수')
+    parser.add_argument('--seed', type=int, default=0, help='실패 주입 난수 시드')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.dimension, args.rate_limit_every, args.verbose,
+                           args.latency_ms, args.token_rate, args.failure_rate, args.completion_tokens,
+                           args.seed)
+    print(f"🧪 가짜 임베딩/채팅 서버 실행 중: http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 서버 종료")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
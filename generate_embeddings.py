@@ -2,23 +2,41 @@
 교수진 벡터 임베딩 생성 스크립트
 """
 
+import argparse
 import json
 import os
-import pickle
-from openai import AzureOpenAI
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from openai import AzureOpenAI, RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
 from typing import List, Dict, Any
 
+from corpus_utils import professor_id, content_hash
+from embedding_store import DEFAULT_EMBEDDING_PATH, save_embedding_matrix
+
+# 재시도 대상 오류 (레이트 리밋 / 일시적 네트워크 / 서버 오류)
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
 class EmbeddingGenerator:
-    def __init__(self):
+    def __init__(self, client: AzureOpenAI = None, batch_token_budget: int = 8000,
+                 max_batch_size: int = 256, max_workers: int = 4, max_retries: int = 6):
         self.professors_data = []
         self.professor_embeddings = []
         self.embedding_model = "text-embedding-3-small"
+        self.dimension = 1536
+        
+        # 배치/동시성 설정
+        self.batch_token_budget = batch_token_budget
+        self.max_batch_size = max_batch_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
         
-        # Azure OpenAI 클라이언트 초기화
-        self.client = AzureOpenAI(
+        # Azure OpenAI 클라이언트 초기화 (재시도는 직접 제어)
+        self.client = client or AzureOpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
             api_version=os.getenv("OPENAI_API_VERSION", "2024-12-01-preview"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            max_retries=0
         )
     
     def load_professor_data(self, json_path: str):
@@ -30,7 +48,8 @@ class EmbeddingGenerator:
         print(f"✅ {len(self.professors_data)}명 교수 데이터 로드 완료")
         return self.professors_data
     
-    def create_professor_text_for_embedding(self, professor: Dict) -> str:
+    @staticmethod
+    def create_professor_text_for_embedding(professor: Dict) -> str:
         """교수 정보를 임베딩용 텍스트로 변환"""
         parts = []
         
@@ -68,54 +87,140 @@ class EmbeddingGenerator:
         
         return " / ".join(parts)
     
-    def generate_all_embeddings(self):
-        """모든 교수에 대한 임베딩 벡터 생성"""
-        print("🔄 교수별 임베딩 벡터 생성 중...")
+    @staticmethod
+    def create_professor_prompt_snippet(professor: Dict) -> str:
+        """추천 프롬프트용 교수 요약 한 줄 (색인 시 미리 계산, 들여쓴 JSON 대비 토큰 절약)"""
+        parts = [f"교수명: {professor['기본정보']['교수이름']}"]
+        fields = [
+            ("연구실", professor["연구실"]["연구실명"]),
+            ("키워드", professor["연구분야"]["키워드"][:150]),
+            ("연구주제", "; ".join(professor["연구주제"][:3])),
+            ("기술방법", "; ".join(professor["기술및방법"][:3])),
+            ("이메일", professor["기본정보"]["이메일"]),
+        ]
+        parts.extend(f"{label}: {value}" for label, value in fields if value)
+        parts.append(f"논문수: {len(professor['논문'])}")
+        return " | ".join(parts)
+    
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """토큰 수 추정 (영문 약 4자당 1토큰, 한글 등 비ASCII는 1자당 1토큰)"""
+        ascii_chars = sum(1 for char in text if ord(char) < 128)
+        return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+    
+    def pack_batches(self, texts: List[str]) -> List[List[int]]:
+        """텍스트 인덱스를 토큰 예산/최대 개수 내의 배치로 묶음"""
+        batches = []
+        current, current_tokens = [], 0
         
-        self.professor_embeddings = []
+        for i, text in enumerate(texts):
+            tokens = self.estimate_tokens(text)
+            if current and (current_tokens + tokens > self.batch_token_budget
+                            or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
         
-        for i, professor in enumerate(self.professors_data):
-            # 임베딩용 텍스트 생성
-            text = self.create_professor_text_for_embedding(professor)
-            
+        if current:
+            batches.append(current)
+        return batches
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """배치 하나를 임베딩 (레이트 리밋 시 지수 백오프 재시도)"""
+        for attempt in range(self.max_retries + 1):
             try:
-                # Azure OpenAI 임베딩 API 호출
                 response = self.client.embeddings.create(
                     model=self.embedding_model,
-                    input=text
+                    input=texts
                 )
+                # 응답 순서가 입력 순서와 다를 수 있으므로 index 기준 정렬
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
                 
-                embedding = response.data[0].embedding
-                self.professor_embeddings.append(embedding)
+                # Retry-After 헤더가 있으면 우선 사용
+                delay = min(2 ** attempt, 30) + random.uniform(0, 1)
+                response = getattr(e, "response", None)
+                if response is not None and response.headers.get("retry-after"):
+                    try:
+                        delay = float(response.headers["retry-after"])
+                    except ValueError:
+                        pass
                 
-                prof_name = professor["기본정보"]["교수이름"]
-                print(f"  ✅ {i+1}/31: {prof_name} 임베딩 완료")
+                print(f"  ⏳ 재시도 {attempt + 1}/{self.max_retries} ({delay:.1f}초 후): {e.__class__.__name__}")
+                time.sleep(delay)
+    
+    def generate_all_embeddings(self):
+        """모든 교수에 대한 임베딩 벡터 생성 (토큰 예산 배치 + 병렬 요청)"""
+        print("🔄 교수별 임베딩 벡터 생성 중...")
+        
+        texts = [self.create_professor_text_for_embedding(professor) for professor in self.professors_data]
+        batches = self.pack_batches(texts)
+        total = len(texts)
+        print(f"  📦 {total}명 → {len(batches)}개 배치, 동시 요청 {self.max_workers}개")
+        
+        results: List[List[float]] = [None] * total
+        completed = 0
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.embed_batch, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    for i, embedding in zip(batch, future.result()):
+                        results[i] = embedding
+                except Exception as e:
+                    names = ", ".join(self.professors_data[i]["기본정보"]["교수이름"] for i in batch[:3])
+                    print(f"  ❌ 배치 임베딩 실패 ({len(batch)}명: {names}...): {e}")
+                    # 실패한 경우 0 벡터로 채움
+                    for i in batch:
+                        results[i] = [0.0] * self.dimension
                 
-            except Exception as e:
-                print(f"  ❌ {professor['기본정보']['교수이름']} 임베딩 실패: {e}")
-                # 실패한 경우 0 벡터로 채움
-                self.professor_embeddings.append([0.0] * 1536)
+                completed += len(batch)
+                print(f"  ✅ {completed}/{total} 임베딩 완료")
         
+        self.professor_embeddings = results
         print(f"📊 총 {len(self.professor_embeddings)}개 임베딩 벡터 생성 완료")
         return self.professor_embeddings
     
-    def save_embeddings(self, filepath: str = "professor_embeddings.pkl"):
-        """임베딩 벡터 저장"""
-        embedding_data = {
-            "embeddings": self.professor_embeddings,
-            "professor_names": [prof["기본정보"]["교수이름"] for prof in self.professors_data],
-            "model": self.embedding_model,
-            "total_count": len(self.professor_embeddings),
-            "dimension": 1536
-        }
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump(embedding_data, f)
+    def save_embeddings(self, filepath: str = DEFAULT_EMBEDDING_PATH):
+        """임베딩 벡터 저장 (float32 .npy 행렬 + JSON 헤더)"""
+        texts = [self.create_professor_text_for_embedding(prof) for prof in self.professors_data]
+        header = save_embedding_matrix(
+            filepath,
+            self.professor_embeddings,
+            model=self.embedding_model,
+            professor_ids=[professor_id(prof) for prof in self.professors_data],
+            content_hashes=[content_hash(text) for text in texts],
+            rows={
+                "professor_names": [prof["기본정보"]["교수이름"] for prof in self.professors_data],
+                # 추천 프롬프트는 요청마다 dict/JSON을 만들지 않고 이 요약을 이어 붙여 구성
+                "prompt_snippets": [self.create_professor_prompt_snippet(prof) for prof in self.professors_data],
+            }
+        )
         
         print(f"💾 임베딩 벡터 저장 완료: {filepath}")
-        print(f"📊 {len(self.professor_embeddings)}개 벡터, 1536차원")
+        print(f"📊 {header['count']}개 벡터, {header['dimension']}차원")
 
 def main():
+    parser = argparse.ArgumentParser(description='교수진 벡터 임베딩 생성')
+    parser.add_argument('--data', default='professors_final_complete.json',
+                       help='교수진 데이터 JSON 경로')
+    parser.add_argument('--output', default=DEFAULT_EMBEDDING_PATH,
+                       help='임베딩 행렬 저장 경로 (.npy, 헤더는 같은 이름의 .json)')
+    parser.add_argument('--batch-tokens', type=int, default=8000,
+                       help='배치당 추정 토큰 예산 (기본값: 8000)')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='동시 요청 수 (기본값: 4)')
+    args = parser.parse_args()
+    
     print("🚀 교수진 벡터 임베딩 생성 시작")
     print("="*50)
     
@@ -130,23 +235,23 @@ def main():
         print("❌ AZURE_OPENAI_ENDPOINT 환경변수가 설정되지 않았습니다.")
         return
     
-    generator = EmbeddingGenerator()
+    generator = EmbeddingGenerator(batch_token_budget=args.batch_tokens, max_workers=args.workers)
     
     try:
         # 1. 교수 데이터 로드
-        generator.load_professor_data("professors_final_complete.json")
+        generator.load_professor_data(args.data)
         
         # 2. 임베딩 생성
         generator.generate_all_embeddings()
         
         # 3. 임베딩 저장
-        generator.save_embeddings()
+        generator.save_embeddings(args.output)
         
         print("\n🎉 임베딩 생성 완료!")
         print("이제 streamlit run streamlit_lab_recommender.py 로 웹앱을 실행할 수 있습니다.")
         
     except FileNotFoundError:
-        print("❌ professors_final_complete.json 파일을 찾을 수 없습니다.")
+        print(f"❌ {args.data} 파일을 찾을 수 없습니다.")
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
 
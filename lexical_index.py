@@ -0,0 +1,117 @@
+"""
+BM25 역색인 (한국어/영어 혼합)
+한글은 음절 bigram, 영문/숫자는 소문자 단어(+ 'PET/CT' 같은 복합 표기와 그 구성 요소) 단위로 색인
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from vector_engine import top_k_indices
+
+LATIN_PATTERN = re.compile(r"[a-z0-9]+(?:[/\-+.][a-z0-9]+)*")
+HANGUL_PATTERN = re.compile(r"[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """BM25용 토큰화 (영문 복합어 + 구성 단어, 한글 음절 bigram)"""
+    text = text.lower()
+    tokens = []
+
+    for word in LATIN_PATTERN.findall(text):
+        tokens.append(word)
+        parts = re.split(r"[/\-+.]", word)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+
+    for run in HANGUL_PATTERN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], rrf_k: int = 60) -> Dict[str, float]:
+    """여러 순위 목록을 RRF 점수(Σ 1 / (rrf_k + rank))로 결합"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return fused
+
+
+class BM25Index:
+    """Okapi BM25 역색인 (용어별 posting을 numpy 배열로 보관)"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: Dict[str, float] = {}
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document], **kwargs) -> "BM25Index":
+        """청크 Document 목록으로 색인 생성 (문서 ID는 metadata['doc_id'])"""
+        index = cls(**kwargs)
+        index.build((doc.metadata.get("doc_id", doc.metadata.get("professor_id")), doc.page_content)
+                    for doc in documents)
+        return index
+
+    def build(self, items: Iterable[Tuple[str, str]]):
+        """(문서 ID, 텍스트) 목록으로 색인 생성"""
+        raw_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = []
+
+        for doc_index, (doc_id, text) in enumerate(items):
+            tokens = tokenize(text)
+            self.doc_ids.append(doc_id)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                docs, tfs = raw_postings.setdefault(term, ([], []))
+                docs.append(doc_index)
+                tfs.append(tf)
+
+        count = len(self.doc_ids)
+        self.doc_lengths = np.asarray(lengths, dtype=np.float32)
+        self.postings = {
+            term: (np.asarray(docs, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+            for term, (docs, tfs) in raw_postings.items()
+        }
+        self.idf = {
+            term: math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, (docs, _) in self.postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def search(self, query: str, top_k: int = 100) -> List[Tuple[str, float]]:
+        """쿼리와 BM25 점수가 높은 문서 ID 목록 반환 (점수 0 문서 제외)"""
+        if not self.doc_ids:
+            return []
+
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        average_length = float(self.doc_lengths.mean()) or 1.0
+
+        for term, query_tf in Counter(tokenize(query)).items():
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, tfs = posting
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / average_length)
+            scores[docs] += query_tf * self.idf[term] * tfs * (self.k1 + 1) / (tfs + norm)
+
+        results = []
+        for i in top_k_indices(scores, top_k)[0]:
+            if scores[i] <= 0:
+                break
+            results.append((self.doc_ids[i], float(scores[i])))
+        return results
@@ -0,0 +1,267 @@
+"""
+질의 파이프라인 계측 (단계별 지연시간 / 토큰 수 / 캐시 적중)
+요청 단위 Trace는 contextvars로 전달하고, 프로세스 전체 누적값은 Prometheus 텍스트 형식으로 내보낸다.
+
+사용 예:
+    with start_trace("process_query", query=user_query):
+        with stage("classify"):
+            ...
+        record_tokens(prompt_tokens, completion_tokens)
+        record_cache("answer", hit=True)
+
+완료된 Trace는 JSON 한 줄로 로깅되며(TRACE_LOG_PATH 설정 시 파일), 최근 Trace는 recent_traces()로 조회한다.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH")
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "lab_recommender"
+
+logger = logging.getLogger("lab_recommender.trace")
+T = TypeVar("T")
+
+
+class MetricsRegistry:
+    """프로세스 전체 카운터/히스토그램 (Prometheus 텍스트 형식 출력)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, List[float]]] = {}
+        self._help: Dict[str, str] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> Tuple:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, amount: float = 1, help_text: str = "", **labels):
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            series = self._counters.setdefault(name, {})
+            key = self._key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, help_text: str = "", **labels):
+        """히스토그램 관측 (버킷별 누적 개수 + 합계 + 개수)"""
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            series = self._histograms.setdefault(name, {})
+            state = series.setdefault(self._key(labels), [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _format_labels(key: Tuple, extra: Tuple = ()) -> str:
+        pairs = list(key) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 (text/plain; version=0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{METRIC_PREFIX}_{name}"
+                if self._help.get(name):
+                    lines.append(f"# HELP {metric} {self._help[name]}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{metric}{self._format_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{METRIC_PREFIX}_{name}"
+                if self._help.get(name):
+                    lines.append(f"# HELP {metric} {self._help[name]}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, state in sorted(series.items()):
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f"{metric}_bucket{self._format_labels(key, (('le', f'{bound:g}'),))} {count}")
+                    lines.append(f"{metric}_bucket{self._format_labels(key, (('le', '+Inf'),))} {state[-1]}")
+                    lines.append(f"{metric}_sum{self._format_labels(key)} {state[-2]:.6f}")
+                    lines.append(f"{metric}_count{self._format_labels(key)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+@dataclass
+class Trace:
+    """질문 1건의 계측 기록"""
+    name: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    trace_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    started_at: float = field(default_factory=time.time)
+    duration_ms: float = 0.0
+    stages: List[Tuple[str, float]] = field(default_factory=list)
+    tokens: Dict[str, int] = field(default_factory=lambda: {"prompt": 0, "completion": 0})
+    cache: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def stage_totals(self) -> Dict[str, float]:
+        """단계별 합계(ms) - 같은 단계가 여러 번 실행되면 합산"""
+        totals: Dict[str, float] = {}
+        for name, ms in self.stages:
+            totals[name] = totals.get(name, 0.0) + ms
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "timestamp": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "stages_ms": {name: round(ms, 2) for name, ms in self.stage_totals().items()},
+            "tokens": dict(self.tokens),
+            "cache": {name: dict(counts) for name, counts in self.cache.items()},
+            **self.attributes,
+        }
+
+
+REGISTRY = MetricsRegistry()
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+_recent_traces: "deque[Trace]" = deque(maxlen=100)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str, **attributes) -> Iterator[Trace]:
+    """요청 단위 Trace 시작 (종료 시 누적 지표 반영 + JSON 로그 + 최근 목록 저장)
+
+    제너레이터 안에서는 쓰지 말 것 - yield 사이에 Trace가 소비자 쪽 컨텍스트로 새어 나간다.
+    스트리밍은 open_trace + activate_trace / iterate_in_trace로 단계마다 활성화한다.
+    """
+    with open_trace(name, **attributes) as trace, activate_trace(trace):
+        yield trace
+
+
+@contextmanager
+def open_trace(name: str, **attributes) -> Iterator[Trace]:
+    """Trace 생성/종료만 담당 (현재 Trace로 활성화하지 않음)"""
+    trace = Trace(name=name, attributes=attributes)
+    start = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.duration_ms = (time.perf_counter() - start) * 1000
+        REGISTRY.observe("request_seconds", trace.duration_ms / 1000, "질문 1건 전체 처리 시간", pipeline=name)
+        _recent_traces.append(trace)
+        logger.info(json.dumps(trace.to_dict(), ensure_ascii=False, default=str))
+
+
+@contextmanager
+def activate_trace(trace: Trace) -> Iterator[Trace]:
+    """블록 실행 동안만 trace를 현재 Trace로 설정 (블록 안에서 yield하지 않는 구간에 사용)"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def iterate_in_trace(trace: Trace, iterable: Iterable[T]) -> Iterator[T]:
+    """항목을 하나씩 꺼내는 동안만 trace를 활성화 (소비자 코드는 Trace 밖에서 실행)"""
+    iterator = iter(iterable)
+    while True:
+        with activate_trace(trace):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+async def aiterate_in_trace(trace: Trace, iterable: AsyncIterable[T]) -> AsyncIterator[T]:
+    """iterate_in_trace의 비동기 버전"""
+    iterator = iterable.__aiter__()
+    while True:
+        with activate_trace(trace):
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+        yield item
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """파이프라인 단계 지연시간 측정 (Trace가 없어도 누적 히스토그램에는 반영)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe("stage_seconds", elapsed, "파이프라인 단계별 처리 시간", stage=name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.stages.append((name, elapsed * 1000))
+
+
+def record_tokens(prompt_tokens: int, completion_tokens: int, model: str = "gpt-4o-mini"):
+    """LLM 프롬프트/완성 토큰 수 기록"""
+    REGISTRY.inc("llm_tokens_total", prompt_tokens, "LLM 토큰 사용량", kind="prompt", model=model)
+    REGISTRY.inc("llm_tokens_total", completion_tokens, "LLM 토큰 사용량", kind="completion", model=model)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.tokens["prompt"] += prompt_tokens
+        trace.tokens["completion"] += completion_tokens
+
+
+def record_cache(cache: str, hit: bool):
+    """캐시 조회 결과 기록 (cache: embedding / answer / expansion 등)"""
+    result = "hit" if hit else "miss"
+    REGISTRY.inc("cache_requests_total", 1, "캐시 조회 수", cache=cache, result=result)
+    trace = _current_trace.get()
+    if trace is not None:
+        # 같은 캐시를 여러 번 조회하면 마지막 결과가 아니라 적중/미스 횟수로 요약
+        counts = trace.cache.setdefault(cache, {"hit": 0, "miss": 0})
+        counts[result] += 1
+
+
+def set_attribute(key: str, value: Any):
+    """현재 Trace에 속성 추가 (질문 유형 등)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.attributes[key] = value
+
+
+def recent_traces(limit: int = 20) -> List[Dict[str, Any]]:
+    """최근 완료된 Trace (최신순)"""
+    return [trace.to_dict() for trace in list(_recent_traces)[-limit:]][::-1]
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render_prometheus()
+
+
+def configure_trace_log(path: str = None):
+    """완료된 Trace를 JSON Lines로 기록 (path가 없으면 표준 에러)"""
+    handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+if TRACE_LOG_PATH:
+    configure_trace_log(TRACE_LOG_PATH)
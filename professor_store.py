@@ -0,0 +1,247 @@
+"""
+교수진 스트리밍 로더 + 정규화된 인메모리 교수 저장소
+JSON 전체를 메모리에 올리지 않고 `교수진` 배열 항목을 하나씩 파싱해
+__slots__ 기반 레코드(정수 ID, intern 문자열, 미리 계산한 파생 필드)로 보관한다.
+
+사용 예:
+    store = ProfessorStore.load("professors_final_complete.json")
+    record = store.get(professor_id)          # O(1)
+    matches = store.find_by_name("김철수")     # O(1), 동명이인은 여러 명
+    professor = record.to_dict()              # 원본 스키마 dict (청킹/문서 생성용)
+"""
+
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from corpus_utils import professor_id
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+PROFESSORS_KEY = "교수진"
+
+# (슬롯 이름, 섹션, 필드) - 섹션 dict 안의 문자열 필드
+SCALAR_FIELDS: Tuple[Tuple[str, str, str], ...] = (
+    ("name", "기본정보", "교수이름"),
+    ("english_name", "기본정보", "영문이름"),
+    ("degree", "기본정보", "학위"),
+    ("position", "기본정보", "직급"),
+    ("university", "기본정보", "대학명"),
+    ("department", "기본정보", "학과명"),
+    ("email", "기본정보", "이메일"),
+    ("phone", "기본정보", "전화번호"),
+    ("lab_name", "연구실", "연구실명"),
+    ("lab_website", "연구실", "연구실웹사이트"),
+    ("lab_location", "연구실", "위치"),
+    ("keywords", "연구분야", "키워드"),
+    ("description", "연구분야", "설명"),
+    ("guidance_traits", "학생지도", "특징"),
+    ("guidance_career", "학생지도", "진로"),
+)
+# (슬롯 이름, 필드) - 문자열 목록 필드 (tuple로 보관)
+LIST_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("topics", "연구주제"),
+    ("methods", "기술및방법"),
+    ("career", "학력경력"),
+    ("papers", "논문"),
+)
+SECTION_ORDER = ("기본정보", "연구실", "연구분야", "연구주제", "기술및방법", "학력경력", "논문", "학생지도")
+
+# 반복이 많은 짧은 값만 intern (긴 설명문은 중복이 거의 없어 이득이 없음)
+INTERNED_SLOTS = frozenset({"name", "degree", "position", "university", "department", "lab_location"})
+INTERN_MAX_LENGTH = 64
+
+
+class _JSONStream:
+    """파일을 청크 단위로 읽으며 JSON 값을 하나씩 디코딩하는 최소 스트리밍 파서"""
+
+    def __init__(self, f, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """소비한 앞부분을 버리고 다음 청크를 이어 붙임 (더 읽을 것이 없으면 False)"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        if not chunk:
+            self.eof = True
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """공백을 건너뛴 다음 문자 (파일 끝이면 빈 문자열)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON 형식 오류: '{char}' 예상, '{found}' 발견 (위치 {self.pos})")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """현재 위치의 JSON 값 하나를 디코딩 (버퍼 끝에서 잘린 값이면 더 읽고 재시도)"""
+        self.peek()
+        while True:
+            try:
+                result, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # 숫자 등은 버퍼 끝에서 잘려도 디코딩되므로 뒤에 구분자가 보일 때까지 확인
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return result
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # 한 값이 청크보다 크면 읽는 단위를 늘려 재디코딩 횟수를 줄임
+            self.chunk_size = max(self.chunk_size, len(self.buffer) - self.pos)
+            self._fill()
+
+
+def iter_professors(path: str, header: Optional[Dict[str, Any]] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """교수진 배열 항목을 하나씩 반환 (문서 전체를 메모리에 올리지 않음)
+
+    header가 주어지면 `교수진` 외 최상위 키(메타데이터, 사용법 등)를 채워 넣는다.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == PROFESSORS_KEY:
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        yield stream.value()
+                        if stream.peek() == ",":
+                            stream.pos += 1
+                            continue
+                        stream.expect("]")
+                        break
+            else:
+                value = stream.value()
+                if header is not None:
+                    header[key] = value
+            if stream.peek() == ",":
+                stream.pos += 1
+                continue
+            stream.expect("}")
+            return
+
+
+def _compact(slot: str, value: Any) -> Any:
+    if isinstance(value, str) and slot in INTERNED_SLOTS and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+class ProfessorRecord:
+    """교수 한 명 (__slots__ 레코드, 원본 스키마는 to_dict()로 복원)"""
+
+    __slots__ = ("index", "professor_id", "paper_count") \
+        + tuple(slot for slot, _, _ in SCALAR_FIELDS) + tuple(slot for slot, _ in LIST_FIELDS)
+
+    def __init__(self, index: int, professor: Dict[str, Any]):
+        self.index = index
+        self.professor_id = professor_id(professor)
+        for slot, section, key in SCALAR_FIELDS:
+            # 누락된 필드는 None으로 두고 to_dict()에서 생략 (원본의 .get 기본값 동작 유지)
+            setattr(self, slot, _compact(slot, professor.get(section, {}).get(key)))
+        for slot, key in LIST_FIELDS:
+            setattr(self, slot, tuple(professor.get(key) or ()))
+        self.paper_count = len(self.papers)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """원본 JSON 스키마의 교수 dict (필요한 곳에서만 일시적으로 생성)"""
+        sections: Dict[str, Any] = {}
+        for slot, section, key in SCALAR_FIELDS:
+            fields = sections.setdefault(section, {})
+            value = getattr(self, slot)
+            if value is not None:
+                fields[key] = value
+        for slot, key in LIST_FIELDS:
+            sections[key] = list(getattr(self, slot))
+        return {section: sections[section] for section in SECTION_ORDER}
+
+    def __repr__(self) -> str:
+        return f"ProfessorRecord({self.index}, {self.name!r}, {self.lab_name!r})"
+
+
+def name_key(name: str) -> str:
+    """이름 조회 키 (소문자 + 문자/숫자만, 영문 이름과 연구실명도 같은 규칙)"""
+    return "".join(char for char in name.lower() if char.isalnum())
+
+
+class ProfessorStore:
+    """정수 인덱스 순서의 교수 레코드 + ID/이름 O(1) 조회"""
+
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        self.records: List[ProfessorRecord] = []
+        self.metadata: Dict[str, Any] = metadata or {}
+        self._by_id: Dict[str, int] = {}
+        self._by_name: Dict[str, List[int]] = {}
+
+    @classmethod
+    def load(cls, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> "ProfessorStore":
+        """JSON 파일을 스트리밍으로 읽어 저장소 구성"""
+        store = cls()
+        for professor in iter_professors(path, store.metadata, chunk_size):
+            store.add(professor)
+        return store
+
+    @classmethod
+    def from_professors(cls, professors: Iterable[Dict[str, Any]],
+                        metadata: Optional[Dict[str, Any]] = None) -> "ProfessorStore":
+        store = cls(metadata)
+        for professor in professors:
+            store.add(professor)
+        return store
+
+    def add(self, professor: Dict[str, Any]) -> ProfessorRecord:
+        record = ProfessorRecord(len(self.records), professor)
+        # 인덱스는 임베딩 행 순서와 맞아야 하므로 중복 ID도 레코드는 유지하고 ID 조회만 첫 항목으로
+        if record.professor_id in self._by_id:
+            print(f"⚠️ 중복 교수 ID: {record.name} ({record.professor_id})")
+        self.records.append(record)
+        self._by_id.setdefault(record.professor_id, record.index)
+        for name in (record.name, record.english_name):
+            if name:
+                self._by_name.setdefault(sys.intern(name_key(name)), []).append(record.index)
+        return record
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ProfessorRecord]:
+        return iter(self.records)
+
+    def __getitem__(self, index: int) -> ProfessorRecord:
+        return self.records[index]
+
+    def __contains__(self, pid: str) -> bool:
+        return pid in self._by_id
+
+    def get(self, pid: str) -> Optional[ProfessorRecord]:
+        index = self._by_id.get(pid)
+        return None if index is None else self.records[index]
+
+    def find_by_name(self, name: str) -> List[ProfessorRecord]:
+        """교수 이름(한글/영문)으로 조회 - 동명이인이면 여러 명"""
+        return [self.records[i] for i in self._by_name.get(name_key(name), ())]
+
+    @property
+    def professor_ids(self) -> List[str]:
+        return [record.professor_id for record in self.records]
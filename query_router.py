@@ -0,0 +1,332 @@
+"""
+임베딩 기반 질문 라우터
+답변 캐시/dense 검색이 이미 계산하는 원본 질문 임베딩을 유형별 중심 벡터와 내적해 처리 전략을 고른다.
+라우팅 비용은 (유형 수 × 차원) 내적 한 번이고 추가 API 호출은 없다.
+중심 벡터는 라벨된 예시 질문으로 오프라인 학습하고, 교차 검증 혼동 행렬로 평가한다.
+
+사용법:
+    python query_router.py                                     # 기본 예시로 학습 + 교차 검증 + 저장
+    python query_router.py --data professors_final_complete.json  # 교수 이름 템플릿 예시 추가
+    python query_router.py --examples labeled.jsonl            # 추가 라벨 예시 ({"query": ..., "type": ...})
+    python query_router.py --eval-only --examples labeled.jsonl   # 저장된 라우터를 예시로 평가만
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_ROUTER_PATH = os.getenv("QUERY_ROUTER_PATH", "query_router.npz")
+# 서빙(LabRecommenderRAG)과 같은 임베딩 모델 - 중심 벡터는 학습에 쓴 모델/차원의 질문 벡터에만 유효
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSION = 1536
+QUERY_TYPES = ("new_search", "refine_previous", "professor_detail", "general_info")
+
+# 유형별 기본 라벨 예시 (교수 이름 언급은 엔티티 매처가 먼저 처리하므로 이름 없는 상세 질문 위주)
+SEED_EXAMPLES: Dict[str, Tuple[str, ...]] = {
+    "new_search": (
+        "암 면역치료 연구하는 연구실 추천해주세요", "단일세포 시퀀싱으로 연구하는 곳이 있나요",
+        "오가노이드 배양에 관심이 있어요", "뇌과학 쪽으로 대학원 진학하고 싶은데 어느 연구실이 좋을까요",
+        "의료영상 인공지능 연구실 찾고 있어요", "항암제 내성 기전을 공부하고 싶습니다",
+        "줄기세포 분화 연구하는 교수님 알려주세요", "미생물군집과 질병의 관계를 연구하고 싶어요",
+        "심혈관 질환 동물모델 실험하는 연구실", "머신러닝으로 유전체 데이터 분석하는 랩 있나요",
+        "나노입자 약물전달 연구하는 곳 추천", "신경회로와 행동을 연구하는 실험실이 궁금합니다",
+        "감염병 백신 개발 연구실 어디인가요", "대사질환이나 비만 연구하는 교수님 계신가요",
+        "I want to study cancer immunology", "labs working on deep learning for pathology",
+    ),
+    "refine_previous": (
+        "그 중에서 학생 지도를 잘 해주시는 분은 누구인가요", "방금 추천한 교수님들 중 논문이 가장 많은 분은요",
+        "그 연구실들 중에 동물실험 하는 곳만 알려주세요", "위에서 말한 분들 연락처도 알려줘",
+        "첫 번째 교수님에 대해 더 자세히 알려주세요", "두 번째 연구실은 어떤 기술을 쓰나요",
+        "그 중에 임상 연구 하는 곳은 어디예요", "추천해준 곳들 위치가 어디인지 정리해줘",
+        "그 분들 중 졸업생 진로가 좋은 곳은", "앞에서 말한 연구실끼리 비교해줄 수 있어요",
+        "그리고 그 연구실들 분위기는 어때요", "거기서 데이터 분석 위주인 곳은 어디야",
+        "또 다른 특징은 없나요", "그 중에서 신입생을 뽑는 곳이 있을까요",
+        "among those, which lab uses mouse models", "tell me more about the second one",
+    ),
+    "professor_detail": (
+        "이 교수님 연구실 위치가 어디인가요", "교수님 이메일 주소 알려주세요",
+        "그 교수님의 최근 논문 목록을 보여줘", "교수님 학력과 경력이 궁금해요",
+        "해당 교수님 연구실 홈페이지 주소는", "교수님은 학생들을 어떻게 지도하시나요",
+        "이 분 연구실 졸업생들은 어디로 진로를 정하나요", "교수님 전화번호 알 수 있을까요",
+        "교수님이 주로 쓰시는 실험 기법은 무엇인가요", "교수님 연구실명이 뭐였죠",
+        "연구실 출신 학생들 진로가 궁금합니다", "교수님 대표 논문 요약해주세요",
+        "그 교수님 연구주제 자세히 설명해줘", "교수님 직급이랑 소속 학과 알려줘",
+        "what is the professor's email", "where is the professor's lab located",
+    ),
+    "general_info": (
+        "대학원 입학 절차가 어떻게 되나요", "석사와 박사 통합과정 차이가 뭐예요",
+        "대학원 학비와 장학금 제도가 궁금합니다", "지도교수님께 컨택 메일은 어떻게 보내나요",
+        "면접 준비는 어떻게 해야 하나요", "연구계획서 작성 팁 알려주세요",
+        "대학원생 인건비는 보통 얼마인가요", "학부 성적이 낮아도 대학원에 갈 수 있나요",
+        "대학원 생활은 어떤가요", "졸업 요건이 보통 어떻게 되나요",
+        "전문연구요원 제도에 대해 알려줘", "추천서는 누구에게 받아야 하나요",
+        "안녕하세요", "고마워요 도움이 됐어요",
+        "how do I apply to graduate school", "is a master's degree worth it",
+    ),
+}
+
+# 교수 데이터로 상세 질문 예시를 늘릴 때 쓰는 템플릿
+PROFESSOR_TEMPLATES = (
+    "{name} 교수님 연구실 알려줘", "{name} 교수님은 어떤 연구를 하시나요", "{name} 교수 이메일",
+    "{lab} 학생 진로는 어떤가요",
+)
+
+
+class RouteDecision(NamedTuple):
+    """라우팅 결과 (score: 선택 유형 중심과의 코사인 유사도, margin: 2위와의 차이)"""
+    query_type: str
+    score: float
+    margin: float
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=-1, keepdims=True), 1e-12)
+
+
+class QueryRouter:
+    """유형별 중심 벡터(정규화된 예시 임베딩 평균) 기반 최근접 중심 분류기"""
+
+    def __init__(self, labels: Sequence[str], centroids: np.ndarray, min_margin: float = 0.02,
+                 model: Optional[str] = None):
+        self.labels = tuple(labels)
+        self.centroids = normalize_rows(centroids)
+        # 1, 2위 유사도 차이가 이보다 작으면 확신이 낮다고 보고 규칙 기반 분류에 맡김
+        self.min_margin = min_margin
+        # 학습에 쓴 임베딩 모델 (다른 모델의 벡터와는 비교할 수 없음)
+        self.model = model
+
+    @classmethod
+    def fit(cls, embeddings: Sequence[Sequence[float]], labels: Sequence[str],
+            min_margin: float = 0.02, model: Optional[str] = None) -> "QueryRouter":
+        vectors = normalize_rows(embeddings)
+        types = [query_type for query_type in QUERY_TYPES if query_type in set(labels)]
+        label_array = np.asarray(labels)
+        centroids = np.stack([vectors[label_array == query_type].mean(axis=0) for query_type in types])
+        return cls(types, centroids, min_margin, model)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ROUTER_PATH) -> Optional["QueryRouter"]:
+        """저장된 라우터 로드 (파일이 없으면 None → 규칙 기반 분류만 사용)"""
+        if not path or not os.path.exists(path):
+            return None
+        data = np.load(path)
+        model = str(data["model"]) if "model" in data.files else None
+        router = cls([str(label) for label in data["labels"]], data["centroids"], float(data["min_margin"]), model)
+        if "dimension" in data.files and int(data["dimension"]) != router.dimension:
+            raise ValueError(f"라우터 파일 손상: 기록된 차원 {int(data['dimension'])}, 중심 벡터 차원 {router.dimension}")
+        return router
+
+    def save(self, path: str = DEFAULT_ROUTER_PATH):
+        np.savez(path, labels=np.array(self.labels), centroids=self.centroids,
+                 min_margin=np.float32(self.min_margin), model=np.array(self.model or ""),
+                 dimension=np.int64(self.dimension))
+
+    @property
+    def dimension(self) -> int:
+        return self.centroids.shape[1]
+
+    def compatibility_error(self, model: Optional[str], dimension: int) -> Optional[str]:
+        """현재 임베딩 모델/차원으로 이 라우터를 쓸 수 없는 이유 (쓸 수 있으면 None)"""
+        if not self.model:
+            return "라우터에 임베딩 모델 정보가 없습니다 (다시 학습 필요)"
+        if model and self.model != model:
+            return f"임베딩 모델 불일치 (라우터 {self.model}, 현재 {model})"
+        if self.dimension != dimension:
+            return f"임베딩 차원 불일치 (라우터 {self.dimension}, 현재 {dimension})"
+        return None
+
+    def scores(self, embedding: Sequence[float]) -> np.ndarray:
+        """유형별 코사인 유사도"""
+        query = np.asarray(embedding, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            raise ValueError(f"임베딩 차원 불일치: 라우터 {self.dimension}, 질문 {query.shape}")
+        return self.centroids @ (query / (np.linalg.norm(query) or 1.0))
+
+    def predict(self, embeddings: Sequence[Sequence[float]]) -> List[str]:
+        """여러 임베딩의 유형 (평가용, 확신도와 무관하게 최근접 중심)"""
+        scores = normalize_rows(embeddings) @ self.centroids.T
+        return [self.labels[i] for i in scores.argmax(axis=1)]
+
+    def route(self, embedding: Sequence[float], exclude: Iterable[str] = ()) -> Optional[RouteDecision]:
+        """가장 가까운 유형 (exclude 유형 제외, 확신이 낮으면 None)"""
+        scores = self.scores(embedding)
+        excluded = set(exclude)
+        ranked = [i for i in np.argsort(-scores) if self.labels[i] not in excluded]
+        if not ranked:
+            return None
+        best = ranked[0]
+        margin = float(scores[best] - scores[ranked[1]]) if len(ranked) > 1 else float(scores[best])
+        if margin < self.min_margin:
+            return None
+        return RouteDecision(self.labels[best], float(scores[best]), margin)
+
+
+def cross_validate(embeddings: np.ndarray, labels: Sequence[str], folds: int = 5,
+                   seed: int = 42) -> List[str]:
+    """유형별로 고르게 나눈 k-fold 교차 검증 예측 (각 예시는 자신이 빠진 중심으로 분류)"""
+    by_type: Dict[str, List[int]] = {}
+    for i, label in enumerate(labels):
+        by_type.setdefault(label, []).append(i)
+    fold_of = np.zeros(len(labels), dtype=int)
+    rng = random.Random(seed)
+    for indices in by_type.values():
+        rng.shuffle(indices)
+        for position, i in enumerate(indices):
+            fold_of[i] = position % folds
+
+    predictions = [""] * len(labels)
+    label_array = np.asarray(labels)
+    for fold in range(folds):
+        test = np.flatnonzero(fold_of == fold)
+        train = np.flatnonzero(fold_of != fold)
+        if len(test) == 0:
+            continue
+        router = QueryRouter.fit(embeddings[train], label_array[train])
+        for i, prediction in zip(test, router.predict(embeddings[test])):
+            predictions[i] = prediction
+    return predictions
+
+
+def confusion_matrix(labels: Sequence[str], predictions: Sequence[str],
+                     types: Sequence[str] = QUERY_TYPES) -> np.ndarray:
+    """행: 실제 유형, 열: 예측 유형"""
+    index = {query_type: i for i, query_type in enumerate(types)}
+    matrix = np.zeros((len(types), len(types)), dtype=int)
+    for label, prediction in zip(labels, predictions):
+        if label in index and prediction in index:
+            matrix[index[label], index[prediction]] += 1
+    return matrix
+
+
+def format_report(matrix: np.ndarray, types: Sequence[str] = QUERY_TYPES) -> str:
+    """혼동 행렬 + 유형별 정밀도/재현율 + 정확도 텍스트 리포트"""
+    width = max(len(query_type) for query_type in types) + 2
+    lines = ["실제 \\ 예측".ljust(width) + "".join(query_type.rjust(width) for query_type in types)
+             + "재현율".rjust(8)]
+    for i, query_type in enumerate(types):
+        total = matrix[i].sum()
+        recall = matrix[i, i] / total if total else 0.0
+        lines.append(query_type.ljust(width) + "".join(str(count).rjust(width) for count in matrix[i])
+                     + f"{recall:8.2f}")
+    precisions = [matrix[j, j] / matrix[:, j].sum() if matrix[:, j].sum() else 0.0 for j in range(len(types))]
+    lines.append("정밀도".ljust(width) + "".join(f"{precision:{width}.2f}" for precision in precisions))
+    total = matrix.sum()
+    lines.append(f"정확도: {np.trace(matrix) / total if total else 0.0:.3f} ({np.trace(matrix)}/{total})")
+    return "\n".join(lines)
+
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    """라벨 예시 JSONL ({"query": ..., "type": ...} 한 줄에 하나)"""
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                if item["type"] not in QUERY_TYPES:
+                    raise ValueError(f"알 수 없는 질문 유형: {item['type']}")
+                examples.append((item["query"], item["type"]))
+    return examples
+
+
+def professor_examples(data_path: str, limit: int, seed: int = 42) -> List[Tuple[str, str]]:
+    """교수 데이터의 이름/연구실명으로 상세 질문 예시 생성"""
+    from professor_store import ProfessorStore
+
+    records = [record for record in ProfessorStore.load(data_path) if record.name]
+    rng = random.Random(seed)
+    rng.shuffle(records)
+    examples = []
+    for record in records[:limit]:
+        lab = (record.lab_name or "").split("(")[0].strip()
+        templates = PROFESSOR_TEMPLATES if lab else PROFESSOR_TEMPLATES[:-1]
+        examples.append((rng.choice(templates).format(name=record.name, lab=lab), "professor_detail"))
+    return examples
+
+
+def make_embeddings():
+    """서빙과 같은 임베딩 모델 + 캐시 (예시 임베딩을 재실행 시 재사용)"""
+    from dotenv import load_dotenv
+    from langchain_openai import AzureOpenAIEmbeddings
+    from embedding_cache import CachedEmbeddings, EmbeddingCache
+
+    load_dotenv()
+    return CachedEmbeddings(
+        AzureOpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_key=os.getenv("OPENAI_API_KEY"),
+            api_version=os.getenv("OPENAI_API_VERSION"),
+            dimensions=EMBEDDING_DIMENSION
+        ),
+        EmbeddingCache(model=EMBEDDING_MODEL, dimension=EMBEDDING_DIMENSION)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='라벨 예시 질문으로 임베딩 라우터 학습/평가')
+    parser.add_argument('--examples', help='추가 라벨 예시 JSONL ({"query", "type"})')
+    parser.add_argument('--data', help='교수 데이터 JSON (이름 템플릿으로 상세 질문 예시 추가)')
+    parser.add_argument('--professor-examples', type=int, default=16, help='--data에서 만들 상세 질문 예시 수')
+    parser.add_argument('--no-seed', action='store_true', help='기본 예시 제외')
+    parser.add_argument('--folds', type=int, default=5, help='교차 검증 fold 수')
+    parser.add_argument('--min-margin', type=float, default=0.02,
+                        help='1, 2위 유사도 차이가 이보다 작으면 규칙 기반 분류로 대체')
+    parser.add_argument('--output', default=DEFAULT_ROUTER_PATH, help='라우터 저장 경로 (.npz)')
+    parser.add_argument('--eval-only', action='store_true', help='저장된 라우터로 예시 평가만 수행')
+    args = parser.parse_args()
+
+    examples: List[Tuple[str, str]] = []
+    if not args.no_seed:
+        examples.extend((query, query_type) for query_type, queries in SEED_EXAMPLES.items() for query in queries)
+    if args.data:
+        examples.extend(professor_examples(args.data, args.professor_examples))
+    if args.examples:
+        examples.extend(load_examples(args.examples))
+    if not examples:
+        parser.error("예시가 없습니다 (--examples 또는 기본 예시 필요)")
+
+    counts = {query_type: sum(label == query_type for _, label in examples) for query_type in QUERY_TYPES}
+    print(f"📚 라벨 예시 {len(examples)}개: " + ", ".join(f"{t} {n}" for t, n in counts.items()))
+
+    queries = [query for query, _ in examples]
+    labels = [label for _, label in examples]
+    embedder = make_embeddings()
+    embeddings = np.asarray(embedder.embed_documents(queries), dtype=np.float32)
+    model = embedder.embeddings.model
+
+    if args.eval_only:
+        router = QueryRouter.load(args.output)
+        if router is None:
+            parser.error(f"저장된 라우터가 없습니다: {args.output}")
+        error = router.compatibility_error(model, embeddings.shape[1])
+        if error:
+            parser.error(error)
+        predictions = router.predict(embeddings)
+        print(f"\n📊 저장된 라우터 평가 ({args.output})")
+    else:
+        predictions = cross_validate(embeddings, labels, args.folds)
+        print(f"\n📊 {args.folds}-fold 교차 검증")
+    print(format_report(confusion_matrix(labels, predictions)))
+
+    misrouted = [(query, label, prediction) for query, label, prediction in zip(queries, labels, predictions)
+                 if label != prediction]
+    for query, label, prediction in misrouted[:10]:
+        print(f"  ❌ {query} ({label} → {prediction})")
+
+    if args.eval_only:
+        return
+    router = QueryRouter.fit(embeddings, labels, args.min_margin, model)
+    decisions = [router.route(vector) for vector in embeddings]
+    routed = sum(decision is not None for decision in decisions)
+    print(f"\n🎯 확신 라우팅 비율 (margin ≥ {args.min_margin}): {routed}/{len(decisions)}")
+    router.save(args.output)
+    print(f"💾 라우터 저장: {args.output} (유형 {len(router.labels)}개, {model}, 차원 {router.dimension})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,146 @@
 import os
+import sys
 import json
 import numpy as np
 from dotenv import load_dotenv
 from langchain_openai import AzureOpenAIEmbeddings, AzureChatOpenAI
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain.schema import Document
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 import argparse
-from typing import Dict, List, Any
+from typing import Dict, List, Any, AsyncIterator, Deque, Iterator, NamedTuple, Optional, Tuple
+import asyncio
+import threading
+import time
 from dataclasses import dataclass, field
+from collections import OrderedDict, deque
+
+from embedding_cache import EmbeddingCache, CachedEmbeddings, normalize_text
+from corpus_utils import professor_id, content_hash
+from professor_store import ProfessorStore, iter_professors
+from entity_matcher import EntityMatcher, Entity
+from query_router import QueryRouter
+from retrieval import ProfessorRetriever
+from chunking import create_professor_chunks
+from lexical_index import BM25Index
+from term_dictionary import TermDictionary
+from answer_cache import SemanticAnswerCache
+from generate_embeddings import EmbeddingGenerator
+from metrics import (start_trace, open_trace, activate_trace, iterate_in_trace, aiterate_in_trace, stage,
+                     record_tokens, record_cache, set_attribute)
+from vector_engine import normalize_rows
+from ann_index import INDEX_TYPES, build_index, enable_reconstruct, supports_removal, set_search_params, describe_index
 
 # 환경변수 로드
 load_dotenv()
 
+# 세션별 히스토리 최대 턴 수 (오래된 턴은 링 버퍼에서 밀려남)
+MAX_HISTORY_TURNS = int(os.getenv("MAX_HISTORY_TURNS", "20"))
+# get_context에 들어가는 응답 길이 (이보다 긴 응답은 저장하지 않음)
+CONTEXT_RESPONSE_CHARS = 200
+
+
+class RetrievedProfessor(NamedTuple):
+    """히스토리에 남기는 검색 결과 참조 (Document 대신 ID/점수만 보관, 필요할 때 재구성)"""
+    professor_id: str
+    score: float
+    chunk_ids: Tuple[str, ...] = ()
+    chunk_scores: Tuple[float, ...] = ()
+    
+    @classmethod
+    def from_document(cls, doc: Document) -> "RetrievedProfessor":
+        metadata = doc.metadata
+        return cls(
+            metadata["professor_id"],
+            float(metadata.get("score", 0.0)),
+            tuple(doc_id for doc_id in metadata.get("matched_chunks") or () if doc_id),
+            tuple(metadata.get("chunk_scores") or ()),
+        )
+
+
 @dataclass
 class ConversationHistory:
-    """대화 히스토리 관리 클래스"""
-    queries: List[str] = field(default_factory=list)
-    responses: List[str] = field(default_factory=list)
-    retrieved_docs: List[List[Document]] = field(default_factory=list)
+    """대화 히스토리 관리 클래스 (최근 max_turns 턴만 보관하는 링 버퍼)"""
+    max_turns: int = MAX_HISTORY_TURNS
+    queries: Deque[str] = field(init=False)
+    # 턴별 get_context 항목 ("Q: ...\nA: ...") - 추가할 때 한 번만 포맷
+    context_entries: Deque[str] = field(init=False)
+    # 검색 결과가 있었던 턴의 교수 ID/점수 (Document 사본 대신)
+    retrieved: Deque[Tuple[RetrievedProfessor, ...]] = field(init=False)
+    # 마지막 질문의 분류 결과 (스트리밍 UI 표시용)
+    last_classification: Dict[str, Any] = field(default_factory=dict)
+    # 마지막 질문의 계측 기록 (metrics.Trace, 디버그 패널 표시용)
+    last_trace: Any = None
+    
+    def __post_init__(self):
+        self.queries = deque(maxlen=self.max_turns)
+        self.context_entries = deque(maxlen=self.max_turns)
+        self.retrieved = deque(maxlen=self.max_turns)
+        self._context_cache: Dict[int, str] = {}
     
     def add_turn(self, query: str, response: str, docs: List[Document] = None):
         self.queries.append(query)
-        self.responses.append(response)
+        self.context_entries.append(f"Q: {query}\nA: {response[:CONTEXT_RESPONSE_CHARS]}...")  # 응답은 200자로 제한
         if docs:
-            self.retrieved_docs.append(docs)
+            self.retrieved.append(tuple(RetrievedProfessor.from_document(doc) for doc in docs))
+        self._context_cache.clear()
+    
+    @property
+    def last_retrieved(self) -> Tuple[RetrievedProfessor, ...]:
+        """마지막으로 검색된 교수 참조 (없으면 빈 tuple)"""
+        return self.retrieved[-1] if self.retrieved else ()
     
     def get_context(self, last_n: int = 3) -> str:
-        """최근 n개의 대화 컨텍스트 반환"""
-        context = []
-        start_idx = max(0, len(self.queries) - last_n)
-        
-        for i in range(start_idx, len(self.queries)):
-            context.append(f"Q: {self.queries[i]}")
-            if i < len(self.responses):
-                context.append(f"A: {self.responses[i][:200]}...")  # 응답은 200자로 제한
-        
-        return "\n".join(context)
+        """최근 n개의 대화 컨텍스트 반환 (턴이 추가될 때까지 캐시)"""
+        context = self._context_cache.get(last_n)
+        if context is None:
+            entries = list(self.context_entries)
+            context = self._context_cache[last_n] = "\n".join(entries[-last_n:] if last_n > 0 else [])
+        return context
+    
+    def memory_bytes(self) -> int:
+        """히스토리가 보관 중인 객체의 대략적인 크기 (bytes)"""
+        size = sum(sys.getsizeof(text) for text in self.queries)
+        size += sum(sys.getsizeof(text) for text in self.context_entries)
+        for refs in self.retrieved:
+            size += sys.getsizeof(refs)
+            for ref in refs:
+                size += sys.getsizeof(ref) + sys.getsizeof(ref.professor_id)
+                size += sys.getsizeof(ref.chunk_ids) + sum(sys.getsizeof(doc_id) for doc_id in ref.chunk_ids)
+                size += sys.getsizeof(ref.chunk_scores) + 24 * len(ref.chunk_scores)
+        return size
     
     def clear(self):
         """히스토리 초기화"""
         self.queries.clear()
-        self.responses.clear()
-        self.retrieved_docs.clear()
+        self.context_entries.clear()
+        self.retrieved.clear()
+        self._context_cache.clear()
+        self.last_classification = {}
+        self.last_trace = None
 
 class LabRecommenderRAG:
-    def __init__(self, data_path, vector_store_path="./vector_store"):
+    def __init__(self, data_path, vector_store_path="./vector_store", index_type="flat", index_params=None):
         self.data_path = data_path
         self.vector_store_path = vector_store_path
+        # FAISS 인덱스 백엔드 (flat / ivf / hnsw / ivfpq)와 생성 파라미터
+        self.index_type = index_type
+        self.index_params = index_params or {}
         
-        # Azure OpenAI 임베딩 모델 초기화
-        self.embeddings = AzureOpenAIEmbeddings(
-            model="text-embedding-3-small",
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_key=os.getenv("OPENAI_API_KEY"),
-            api_version=os.getenv("OPENAI_API_VERSION"),
-            dimensions=1536
+        # Azure OpenAI 임베딩 모델 초기화 (반복 쿼리/문서는 캐시에서 재사용)
+        self.embedding_cache = EmbeddingCache(model="text-embedding-3-small", dimension=1536)
+        self.embeddings = CachedEmbeddings(
+            AzureOpenAIEmbeddings(
+                model="text-embedding-3-small",
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                api_key=os.getenv("OPENAI_API_KEY"),
+                api_version=os.getenv("OPENAI_API_VERSION"),
+                dimensions=1536
+            ),
+            self.embedding_cache
         )
         
         # Azure OpenAI LLM 모델 초기화
@@ -65,23 +149,112 @@ class LabRecommenderRAG:
             azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
             api_key=os.getenv("OPENAI_API_KEY"),
             api_version=os.getenv("OPENAI_API_VERSION"),
-            temperature=0.3
+            temperature=0.3,
+            stream_usage=True  # 스트리밍 응답에도 토큰 사용량 포함 (계측용)
         )
         
         self.vector_store = None
         self.brief_qa_chain = None  # 간략한 추천용
         self.detail_qa_chain = None  # 상세 정보용
+        self.retriever = None
+        self.detail_retriever = None
+        self.brief_prompt = None
+        self.detail_prompt = None
+        # 정규화된 교수 저장소 (ID/이름 O(1) 조회, 전체 프로필 Document는 필요할 때 재구성)
+        self.professor_store = ProfessorStore()
+        # 교수명/연구실명/연구 용어 자동자 (분류 + 검색 필터, 색인할 때 코퍼스에서 구성)
+        self.entity_matcher = EntityMatcher()
+        # 임베딩 라우터 (오프라인 학습 파일이 있으면 사용, 없으면 규칙 기반 분류만)
+        self.query_router = self.load_query_router()
+        # 청크 BM25 역색인 (dense 검색과 RRF로 결합)
+        self.lexical_index = None
+        # 한→영 연구 용어 사전 (커버리지가 낮을 때만 LLM 번역) + 정규화 질문별 확장 결과 메모
+        self.term_dictionary = TermDictionary.load()
+        self.min_dictionary_coverage = 0.6
+        self.expansion_cache: "OrderedDict[str, str]" = OrderedDict()
+        self.max_expansion_cache = 1024
+        self._expansion_lock = threading.Lock()
+        # 의미 기반 답변 캐시 (유사 질문 + 같은 유형 + 같은 근거 교수 집합이면 생성 생략)
+        self.answer_cache = SemanticAnswerCache()
+        # 검색 근거가 없어 재사용 이득보다 질문 임베딩 호출 비용이 큰 유형은 캐시하지 않음
+        self.uncached_query_types = {"general_info"}
+        # 후속 질문 재채점 시 최고 점수 교수 대비 이 비율 미만인 이전 추천 교수는 컨텍스트에서 제외
+        self.refine_score_ratio = 0.8
+        # 기본 대화 히스토리 (CLI용). 여러 사용자가 엔진 하나를 공유할 때는 각 메서드에 history를 전달
         self.conversation_history = ConversationHistory()
         
+    def load_professors(self) -> Iterator[Dict[str, Any]]:
+        """교수진 원본 데이터를 한 명씩 스트리밍 로드 (파일 전체를 메모리에 올리지 않음)"""
+        return iter_professors(self.data_path)
+    
     def load_and_process_data(self):
         """교수 데이터를 로드하고 Document 객체로 변환"""
-        with open(self.data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        return [self.create_professor_document(professor) for professor in self.load_professors()]
+    
+    def load_and_chunk_data(self) -> List[Document]:
+        """교수 데이터를 필드별 청크 Document로 변환 (벡터 저장소 색인 단위)"""
+        return self.load_professor_data()[0]
+    
+    def load_professor_data(self, chunk: bool = True,
+                            indexed_ids: Optional[set] = None) -> Tuple[List[Document], Dict[str, str]]:
+        """교수 데이터를 스트리밍하며 교수 저장소/엔티티 자동자 재구성
         
-        documents = []
-        for professor in data['교수진']:
-            # 전체 교수 정보를 포함한 상세 텍스트 생성
-            prof_info = f"""
+        반환: (필드별 청크 - chunk=False면 빈 목록, 교수 ID → 콘텐츠 해시)
+        indexed_ids가 주어지면 엔티티 자동자에는 벡터 색인에 있는 교수만 등록한다.
+        """
+        chunks = []
+        hashes = {}
+        self.professor_store = ProfessorStore()
+        for professor in iter_professors(self.data_path, self.professor_store.metadata):
+            record = self.professor_store.add(professor)
+            doc = self.create_professor_document(professor)
+            hashes[record.professor_id] = doc.metadata["content_hash"]
+            if chunk:
+                chunks.extend(create_professor_chunks(professor, doc.metadata))
+        self.entity_matcher = EntityMatcher.from_store(self.professor_store, indexed_ids)
+        print(f"🔤 엔티티 자동자 구성: 패턴 {len(self.entity_matcher)}개")
+        return chunks, hashes
+    
+    def indexed_documents(self) -> List[Document]:
+        """벡터 저장소 docstore의 문서 (FAISS 위치 순서)"""
+        docstore = self.vector_store.docstore
+        return [docstore.search(doc_id) for _, doc_id in sorted(self.vector_store.index_to_docstore_id.items())]
+    
+    def check_data_against_manifest(self, hashes: Dict[str, str]) -> List[str]:
+        """현재 교수 데이터와 색인 당시 매니페스트 비교 (달라진 교수 ID 목록, 다르면 경고)"""
+        indexed = self.load_manifest().get("professors", {})
+        added = [pid for pid in hashes if pid not in indexed]
+        removed = [pid for pid in indexed if pid not in hashes]
+        changed = [pid for pid, value in hashes.items() if pid in indexed and indexed[pid]["hash"] != value]
+        if added or removed or changed:
+            print(f"⚠️ 교수 데이터가 색인 이후 변경되었습니다 (추가 {len(added)}명, 변경 {len(changed)}명, "
+                  f"삭제 {len(removed)}명). 검색은 색인된 내용 기준이며, --update로 색인을 갱신하세요.")
+        return added + removed + changed
+    
+    def rehydrate_documents(self, refs: Tuple[RetrievedProfessor, ...]) -> List[Document]:
+        """히스토리의 교수 참조를 검색 당시와 같은 Document로 재구성 (청크가 없으면 전체 프로필)"""
+        docs = []
+        for ref in refs:
+            chunks = [self.vector_store.docstore.search(doc_id) for doc_id in ref.chunk_ids] if self.vector_store else []
+            if chunks and all(isinstance(chunk, Document) for chunk in chunks):
+                docs.append(ProfessorRetriever.compose_document(chunks, ref.score, list(ref.chunk_scores)))
+                continue
+            # 색인이 갱신되어 청크가 사라졌으면 교수 저장소에서 전체 프로필 사용
+            doc = self.get_professor_document(ref.professor_id)
+            if doc is not None:
+                doc.metadata["score"] = ref.score
+                docs.append(doc)
+        return docs
+    
+    def get_professor_document(self, pid: str) -> Optional[Document]:
+        """교수 ID의 전체 프로필 Document (저장소 레코드에서 재구성)"""
+        record = self.professor_store.get(pid)
+        return None if record is None else self.create_professor_document(record.to_dict())
+    
+    def create_professor_document(self, professor: Dict[str, Any]) -> Document:
+        """교수 한 명의 전체 프로필 Document 생성"""
+        # 전체 교수 정보를 포함한 상세 텍스트 생성
+        prof_info = f"""
 === 기본 정보 ===
 교수명: {professor['기본정보']['교수이름']}
 대학명: {professor['기본정보'].get('대학명', '')}
@@ -112,70 +285,245 @@ class LabRecommenderRAG:
 
 학생 진로:
 {professor['학생지도'].get('진로', '정보 없음')}
-            """.strip()
-            
-            # 메타데이터 설정
-            metadata = {
-                "professor_name": professor['기본정보']['교수이름'],
-                "university": professor['기본정보'].get('대학명', ''),
-                "department": professor['기본정보'].get('학과명', ''),
-                "lab_name": professor['연구실']['연구실명'],
-                "email": professor['기본정보']['이메일'],
-                "phone": professor['기본정보']['전화번호'],
-                "keywords": professor['연구분야']['키워드']
-            }
-            
-            documents.append(Document(
-                page_content=prof_info,
-                metadata=metadata
-            ))
+        """.strip()
+        
+        # 메타데이터 설정
+        metadata = {
+            "professor_id": professor_id(professor),
+            "professor_name": professor['기본정보']['교수이름'],
+            "university": professor['기본정보'].get('대학명', ''),
+            "department": professor['기본정보'].get('학과명', ''),
+            "lab_name": professor['연구실']['연구실명'],
+            "email": professor['기본정보']['이메일'],
+            "phone": professor['기본정보']['전화번호'],
+            "keywords": professor['연구분야']['키워드']
+        }
+        # 증분 인덱싱용 콘텐츠 해시
+        metadata["content_hash"] = content_hash(prof_info, metadata)
         
-        return documents
+        return Document(
+            page_content=prof_info,
+            metadata=metadata
+        )
+    
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.vector_store_path, "manifest.json")
+    
+    def load_manifest(self) -> Dict[str, Any]:
+        """벡터 저장소 매니페스트 로드 (교수 ID → 콘텐츠 해시 / 문서 ID)"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def save_manifest(self, professors: Dict[str, Dict[str, Any]]):
+        """벡터 저장소 매니페스트 저장"""
+        manifest = {
+            "embedding_model": "text-embedding-3-small",
+            "dimension": 1536,
+            "index_type": self.index_type,
+            "index_params": self.index_params,
+            "chunking": "field",
+            "professors": professors
+        }
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        self.refresh_index_version()
+    
+    def refresh_index_version(self):
+        """매니페스트 내용으로 벡터 저장소 버전을 계산해 답변 캐시에 반영 (재생성/갱신되면 캐시 무효화)"""
+        manifest = self.load_manifest()
+        self.answer_cache.set_version(content_hash(json.dumps(manifest, sort_keys=True)))
+    
+    @staticmethod
+    def group_by_professor(documents: List[Document]) -> Dict[str, Dict[str, Any]]:
+        """문서를 교수 ID별로 묶어 해시와 문서 ID 목록 생성"""
+        groups = {}
+        for doc in documents:
+            pid = doc.metadata["professor_id"]
+            group = groups.setdefault(pid, {"hash": doc.metadata["content_hash"], "doc_ids": [], "documents": []})
+            group["doc_ids"].append(doc.metadata.get("doc_id", pid))
+            group["documents"].append(doc)
+        return groups
+    
+    def build_vector_store(self, documents: List[Document], ids: List[str], vectors) -> FAISS:
+        """임베딩 벡터로 선택한 타입의 인덱스를 만들어 LangChain FAISS 저장소 구성"""
+        index = build_index(np.asarray(vectors, dtype=np.float32), self.index_type, **self.index_params)
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore(dict(zip(ids, documents))),
+            index_to_docstore_id=dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
     
-    def create_vector_store(self):
-        """벡터 저장소 생성"""
-        print("교수 데이터를 로드하고 있습니다...")
-        documents = self.load_and_process_data()
+    def create_vector_store(self, documents: Optional[List[Document]] = None):
+        """벡터 저장소 전체 생성 (documents: 이미 만든 청크, 없으면 교수 데이터에서 생성)"""
+        if documents is None:
+            print("교수 데이터를 로드하고 있습니다...")
+            documents = self.load_and_chunk_data()
+        groups = self.group_by_professor(documents)
         
         print("벡터 임베딩을 생성하고 있습니다...")
-        self.vector_store = FAISS.from_documents(
-            documents=documents,
-            embedding=self.embeddings
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        
+        print(f"FAISS 인덱스({self.index_type})를 구성하고 있습니다...")
+        self.vector_store = self.build_vector_store(
+            documents,
+            [doc_id for group in groups.values() for doc_id in group["doc_ids"]],
+            vectors
         )
-        # FAISS 인덱스 저장
+        self.lexical_index = BM25Index.from_documents(documents)
+        
+        # FAISS 인덱스 + 매니페스트 저장
         self.vector_store.save_local(self.vector_store_path)
+        self.save_manifest({pid: {"hash": g["hash"], "doc_ids": g["doc_ids"]} for pid, g in groups.items()})
         print(f"벡터 저장소가 {self.vector_store_path}에 저장되었습니다.")
     
-    def load_vector_store(self):
-        """기존 벡터 저장소 로드"""
+    def update_vector_store(self):
+        """변경된 교수만 다시 임베딩하는 증분 갱신 (매니페스트가 없으면 전체 생성)"""
+        manifest = self.load_manifest()
+        # 코퍼스는 한 번만 청킹 (교수 저장소/엔티티 자동자/BM25/전체 재생성 모두 이 청크 사용)
+        chunks = self.load_and_chunk_data()
+        if not manifest.get("professors") or not self.load_vector_store(chunks):
+            print("매니페스트 또는 기존 벡터 저장소가 없어 전체 생성합니다.")
+            self.create_vector_store(chunks)
+            return
+        
+        if manifest.get("index_type", "flat") != self.index_type:
+            print(f"인덱스 타입이 변경되어({manifest.get('index_type', 'flat')} → {self.index_type}) 전체 생성합니다.")
+            self.create_vector_store(chunks)
+            return
+        
+        if manifest.get("chunking") != "field":
+            print("교수 단위 저장소를 필드별 청크 저장소로 전환하기 위해 전체 생성합니다.")
+            self.create_vector_store(chunks)
+            return
+        
+        previous = manifest["professors"]
+        self.lexical_index = BM25Index.from_documents(chunks)
+        current = self.group_by_professor(chunks)
+        
+        added = [pid for pid in current if pid not in previous]
+        removed = [pid for pid in previous if pid not in current]
+        changed = [pid for pid in current if pid in previous and previous[pid]["hash"] != current[pid]["hash"]]
+        print(f"🔄 증분 갱신: 추가 {len(added)}명, 변경 {len(changed)}명, 삭제 {len(removed)}명")
+        
+        if not (added or removed or changed):
+            print("변경 사항이 없습니다.")
+            return
+        
+        # 삭제/변경된 교수의 기존 벡터 제거 (삭제를 지원하지 않는 ANN 인덱스는 전체 재생성)
+        stale_ids = [doc_id for pid in removed + changed for doc_id in previous[pid]["doc_ids"]]
+        if stale_ids and not supports_removal(self.vector_store.index):
+            print(f"{self.index_type} 인덱스는 벡터 삭제를 지원하지 않아 전체 생성합니다.")
+            self.create_vector_store(chunks)
+            return
+        if stale_ids:
+            self.vector_store.delete(stale_ids)
+        
+        # 추가/변경된 교수만 임베딩
+        new_docs, new_ids = [], []
+        for pid in added + changed:
+            new_docs.extend(current[pid]["documents"])
+            new_ids.extend(current[pid]["doc_ids"])
+        if new_docs:
+            # add_documents는 정규화하지 않으므로 build_index와 같이 단위 벡터로 맞춰 추가 (내적 = 코사인 유지)
+            texts = [doc.page_content for doc in new_docs]
+            vectors = normalize_rows(self.embeddings.embed_documents(texts))
+            self.vector_store.add_embeddings(zip(texts, vectors.tolist()),
+                                             metadatas=[doc.metadata for doc in new_docs], ids=new_ids)
+            enable_reconstruct(self.vector_store.index)
+        
+        self.vector_store.save_local(self.vector_store_path)
+        self.save_manifest({pid: {"hash": g["hash"], "doc_ids": g["doc_ids"]} for pid, g in current.items()})
+        print(f"벡터 저장소가 {self.vector_store_path}에 갱신되었습니다.")
+    
+    def load_vector_store(self, chunks: Optional[List[Document]] = None):
+        """기존 벡터 저장소 로드 (chunks: 증분 갱신 중 이미 만든 현재 청크 - 주어지면 보조 색인은 호출자가 구성)"""
         try:
             self.vector_store = FAISS.load_local(
                 self.vector_store_path,
                 embeddings=self.embeddings,
                 allow_dangerous_deserialization=True
             )
-            print("기존 벡터 저장소를 로드했습니다.")
+            enable_reconstruct(self.vector_store.index)
+            if chunks is None:
+                # 어휘 색인은 FAISS와 같은 문서 ID를 갖도록 저장된 docstore에서 재구성
+                documents = self.indexed_documents()
+                self.lexical_index = BM25Index.from_documents(documents)
+                # 교수 저장소(전체 프로필)는 원본 데이터에서 재구성하되 색인 당시 매니페스트와 비교하고,
+                # 엔티티 자동자에는 색인에 있는 교수만 등록 (색인에 없는 교수로 분류/필터하지 않도록)
+                _, hashes = self.load_professor_data(chunk=False, indexed_ids={
+                    doc.metadata.get("professor_id") for doc in documents})
+                self.check_data_against_manifest(hashes)
+            self.refresh_index_version()
+            print(f"기존 벡터 저장소를 로드했습니다. {describe_index(self.vector_store.index)}")
             return True
         except Exception as e:
             print(f"벡터 저장소 로드 실패: {e}")
             return False
     
-    def contains_professor_name(self, query: str) -> bool:
-        """질문에 교수명이 포함되어 있는지 확인"""
-        professor_names = [
-            "강건욱", "강홍기", "구자록", "김동현", "김명환", "김성준", "김종일", "김현제", "김현진",
-            "박상민", "박성준", "박수경", "박정규", "방예지", "서인석", "성지혜", "신현무", "여선주",
-            "이민재", "이용석", "이지연", "이진구", "이창한", "이철환", "조성엽", "조주연", "최경호",
-            "최민호", "최은영", "최형진", "신정환"
-        ]
-        for name in professor_names:
-            if name in query:
-                return True
-        return False
-    
-    def can_answer_with_previous(self, query: str) -> bool:
+    def match_entities(self, query: str) -> List[Entity]:
+        """질문의 교수명/연구실명/연구 용어 엔티티 (자동자 한 번 스캔)"""
+        with stage("entity_match"):
+            return self.entity_matcher.match(query)
+    
+    def contains_professor_name(self, query: str, entities: Optional[List[Entity]] = None) -> bool:
+        """질문에 교수명(연구실명/이메일, 한 글자 오타 포함)이 포함되어 있는지 확인"""
+        return bool(self.entity_matcher.find_mentions(query, entities))
+    
+    def resolve_named_professors(self, query: str) -> Optional[List[str]]:
+        """질문에 언급된 교수 ID를 이름 색인으로 확정 (언급이 없거나 동명이인 등 모호하면 None)"""
+        with stage("name_lookup"):
+            mentions = self.entity_matcher.find_mentions(query)
+        if not mentions or any(len(positions) != 1 for _, positions in mentions):
+            return None
+        return list(dict.fromkeys(self.professor_store[positions[0]].professor_id for _, positions in mentions))
+    
+    def named_professors(self, query_type: str, query: str) -> Optional[List[str]]:
+        """상세 질문에서 이름으로 확정되는 교수 ID (다른 유형이거나 모호하면 None)
+        
+        질문당 한 번만 호출하고 결과를 needs_retrieval / prepare_strategy에 전달한다.
+        """
+        if query_type != "professor_detail":
+            return None
+        pids = self.resolve_named_professors(query)
+        record_cache("name_lookup", pids is not None)
+        return pids
+    
+    @staticmethod
+    def needs_retrieval(query_type: str, named_pids: Optional[List[str]] = None) -> bool:
+        """검색(쿼리 확장 포함)이 필요한 전략인지 - 이름으로 교수가 확정된(named_pids) 상세 질문은 불필요"""
+        if query_type == "professor_detail":
+            return named_pids is None
+        return query_type == "new_search"
+    
+    def direct_professor_documents(self, pids: List[str]) -> List[Document]:
+        """이름이 확정된 교수의 전체 프로필 Document (번역/임베딩/검색 생략)"""
+        docs = [self.get_professor_document(pid) for pid in pids]
+        for doc in docs:
+            doc.metadata["score"] = 1.0
+        set_attribute("direct_lookup", len(docs))
+        return docs
+    
+    def professor_filter(self, query: str) -> Optional[frozenset]:
+        """질문의 연구 키워드/기술 용어를 가진 교수 ID 집합 (검색 우선순위 필터, 용어가 없으면 None)"""
+        positions = EntityMatcher.term_filter(self.match_entities(query))
+        if positions is None:
+            return None
+        set_attribute("professor_filter", len(positions))
+        return frozenset(self.professor_store[i].professor_id for i in positions)
+    
+    def resolve_history(self, history: Optional[ConversationHistory]) -> ConversationHistory:
+        """호출자가 넘긴 사용자별 히스토리, 없으면 엔진 기본 히스토리"""
+        return history if history is not None else self.conversation_history
+    
+    def can_answer_with_previous(self, query: str, history: ConversationHistory = None) -> bool:
         """이전 검색 결과로 답변 가능한지 확인"""
-        if not self.conversation_history.retrieved_docs:
+        if not self.resolve_history(history).retrieved:
             return False
         
         # 단순한 후속 질문 패턴 확인
@@ -186,14 +534,59 @@ class LabRecommenderRAG:
         """텍스트에 한국어가 포함되어 있는지 확인"""
         return any('\uAC00' <= char <= '\uD7A3' for char in text)
     
+    def expand_with_dictionary(self, query: str) -> Optional[str]:
+        """메모된 확장 결과 또는 용어 사전으로 확장 (사전 커버리지가 낮아 LLM 번역이 필요하면 None)"""
+        key = normalize_text(query)
+        with self._expansion_lock:
+            memoized = self.expansion_cache.get(key)
+            if memoized is not None:
+                self.expansion_cache.move_to_end(key)
+        record_cache("expansion", memoized is not None)
+        if memoized is not None:
+            return memoized
+        
+        keywords, coverage = self.term_dictionary.expand(query)
+        if coverage < self.min_dictionary_coverage:
+            return None
+        
+        enhanced = f"{query} {' '.join(keywords)}" if keywords else query
+        print(f"📖 사전 확장 (커버리지 {coverage:.0%}): {query} → {enhanced}")
+        self.remember_expansion(query, enhanced)
+        return enhanced
+    
+    def remember_expansion(self, query: str, enhanced: str):
+        """정규화 질문별 확장 결과 메모 (LRU, 번역 실패 시에는 호출하지 않음)"""
+        with self._expansion_lock:
+            self.expansion_cache[normalize_text(query)] = enhanced
+            if len(self.expansion_cache) > self.max_expansion_cache:
+                self.expansion_cache.popitem(last=False)
+    
     def enhance_query_with_translation(self, query: str) -> str:
-        """한국어 질문을 한영 혼합으로 확장"""
+        """한국어 질문을 한영 혼합으로 확장 (용어 사전 우선, 커버리지가 낮으면 LLM 번역)"""
         if not self.contains_korean(query):
             return query
-            
-        try:
-            # 연구 키워드만 간단히 번역
-            translation_prompt = f"""다음 한국어 연구 관련 질문에서 핵심 영어 키워드만 추출해주세요:
+        
+        with stage("expansion"):
+            enhanced = self.expand_with_dictionary(query)
+            if enhanced is None:
+                enhanced = self.translate_query_with_llm(query)
+        return enhanced
+    
+    async def aenhance_query_with_translation(self, query: str) -> str:
+        """enhance_query_with_translation의 비동기 버전"""
+        if not self.contains_korean(query):
+            return query
+        
+        with stage("expansion"):
+            enhanced = self.expand_with_dictionary(query)
+            if enhanced is None:
+                enhanced = await self.atranslate_query_with_llm(query)
+        return enhanced
+    
+    @staticmethod
+    def translation_prompt(query: str) -> str:
+        """연구 키워드 영어 추출 프롬프트"""
+        return f"""다음 한국어 연구 관련 질문에서 핵심 영어 키워드만 추출해주세요:
             
 질문: {query}
 
@@ -203,59 +596,146 @@ class LabRecommenderRAG:
 - 예: "AI machine learning cancer treatment"
 
 영어 키워드:"""
-            
-            response = self.llm.invoke(translation_prompt)
-            english_keywords = response.content.strip()
-            
-            # 한국어 + 영어 키워드 결합
-            enhanced = f"{query} {english_keywords}"
-            print(f"🔍 쿼리 확장: {query} → {enhanced}")
-            return enhanced
-            
+    
+    def translate_query_with_llm(self, query: str) -> str:
+        """LLM으로 핵심 영어 키워드를 추출해 확장 (사전 커버리지가 낮을 때의 대체 경로)"""
+        try:
+            with stage("translation"):
+                response = self.llm.invoke(self.translation_prompt(query))
+        except Exception as e:
+            print(f"⚠️ 번역 실패, 원본 쿼리 사용: {e}")
+            return query
+        self.record_usage(response, self.translation_prompt(query), response.content)
+        return self.combine_translation(query, response.content)
+    
+    async def atranslate_query_with_llm(self, query: str) -> str:
+        """translate_query_with_llm의 비동기 버전"""
+        try:
+            with stage("translation"):
+                response = await self.llm.ainvoke(self.translation_prompt(query))
         except Exception as e:
             print(f"⚠️ 번역 실패, 원본 쿼리 사용: {e}")
             return query
+        self.record_usage(response, self.translation_prompt(query), response.content)
+        return self.combine_translation(query, response.content)
     
-    def is_research_related(self, query: str) -> bool:
-        """연구분야 관련 질문인지 확인"""
-        research_keywords = [
-            "연구", "AI", "인공지능", "머신러닝", "바이오", "의료", "생명과학", "분자", "세포",
-            "유전", "면역", "영상", "신경", "뇌", "암", "종양", "치료", "진단", "약물",
-            "실험실", "연구실", "교수", "추천", "관심", "하고싶다", "배우고싶다"
-        ]
-        return any(keyword in query for keyword in research_keywords)
+    def combine_translation(self, query: str, english_keywords: str) -> str:
+        """한국어 + 영어 키워드 결합 후 메모"""
+        enhanced = f"{query} {english_keywords.strip()}"
+        print(f"🔍 쿼리 확장: {query} → {enhanced}")
+        self.remember_expansion(query, enhanced)
+        return enhanced
     
-    def classify_query(self, new_query: str) -> Dict[str, Any]:
+    def is_research_related(self, query: str, entities: Optional[List[Entity]] = None) -> bool:
+        """연구분야 관련 질문인지 확인 (코퍼스 키워드/기술 용어 또는 연구 관련 단서)"""
+        if entities is None:
+            entities = self.match_entities(query)
+        return EntityMatcher.is_research_related(entities)
+    
+    def classify_query(self, new_query: str, history: ConversationHistory = None,
+                       query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
         """개선된 질문 분류 시스템"""
+        with stage("classify"):
+            classification = self.classify_query_rules(new_query, history, query_embedding)
+        set_attribute("query_type", classification["type"])
+        return classification
+    
+    def load_query_router(self, path: Optional[str] = None) -> Optional[QueryRouter]:
+        """저장된 임베딩 라우터 로드 (없거나 현재 임베딩 모델/차원과 맞지 않으면 None → 규칙 기반 분류)"""
+        try:
+            router = QueryRouter.load(path) if path is not None else QueryRouter.load()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ 질문 라우터 로드 실패, 규칙 기반 분류 사용: {e}")
+            return None
+        if router is not None and not self.router_compatible(router, self.embedding_cache.dimension):
+            return None
+        return router
+    
+    def router_compatible(self, router: QueryRouter, dimension: int) -> bool:
+        """라우터가 현재 임베딩 모델/차원으로 학습되었는지 확인 (불일치는 로그로 남김)"""
+        error = router.compatibility_error(getattr(self.embeddings.embeddings, "model", None), dimension)
+        if error:
+            print(f"⚠️ 질문 라우터 사용 중지, 규칙 기반 분류 사용: {error}")
+        return error is None
+    
+    def route_query(self, query: str, history: ConversationHistory = None,
+                    query_embedding: Optional[List[float]] = None) -> Optional[Dict[str, Any]]:
+        """임베딩 라우터 분류 (라우터가 없거나 확신이 낮으면 None)
+        
+        답변 캐시와 dense 검색이 쓰는 원본 질문 임베딩을 그대로 사용하므로 추가 API 호출 없이 내적 한 번.
+        """
+        if self.query_router is None:
+            return None
+        if query_embedding is None:
+            query_embedding = self.embeddings.embed_query(query)
+        # 색인 이후 임베딩 설정이 바뀌었으면(차원 축소 등) 라우터를 끄고 규칙으로
+        if not self.router_compatible(self.query_router, len(query_embedding)):
+            self.query_router = None
+            return None
+        # 이전 결과가 없으면 후속 질문 유형은 후보에서 제외
+        exclude = () if self.resolve_history(history).retrieved else ("refine_previous",)
+        with stage("route"):
+            decision = self.query_router.route(query_embedding, exclude)
+        if decision is None:
+            return None
+        set_attribute("route_margin", round(decision.margin, 4))
+        return {"type": decision.query_type,
+                "reason": f"임베딩 라우터 (유사도 {decision.score:.2f}, 차이 {decision.margin:.2f})"}
+    
+    def classify_query_rules(self, new_query: str, history: ConversationHistory = None,
+                             query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
+        """규칙 기반 분류 (교수명 → 임베딩 라우터 → 이전 결과 → 연구분야 → 일반)"""
+        entities = self.match_entities(new_query)
+        
         # 1. 교수명 언급 체크
-        if self.contains_professor_name(new_query):
+        if self.contains_professor_name(new_query, entities):
             return {"type": "professor_detail", "reason": "특정 교수 언급"}
         
-        # 2. 이전 결과로 답변 가능한지 체크
-        if self.can_answer_with_previous(new_query):
+        # 2. 학습된 라우터가 있으면 질문 임베딩으로 분류 (확신이 낮으면 아래 규칙으로)
+        routed = self.route_query(new_query, history, query_embedding)
+        if routed is not None:
+            return routed
+        
+        # 3. 이전 결과로 답변 가능한지 체크
+        if self.can_answer_with_previous(new_query, history):
             return {"type": "refine_previous", "reason": "이전 결과 활용 가능"}
         
-        # 3. 연구분야 관련 질문인지 체크
-        if self.is_research_related(new_query):
+        # 4. 연구분야 관련 질문인지 체크
+        if self.is_research_related(new_query, entities):
             return {"type": "new_search", "reason": "새로운 연구분야 검색"}
         
-        # 4. 나머지는 일반 질문
+        # 5. 나머지는 일반 질문
         return {"type": "general_info", "reason": "대학원 일반 정보"}
     
-    def setup_qa_chains(self, k=5):
-        """brief용과 detail용 QA 체인 분리 설정"""
+    def setup_qa_chains(self, k=5, fetch_k=100, lambda_mult=0.5, nprobe=None, ef_search=None):
+        """brief용과 detail용 QA 체인 분리 설정 (nprobe/ef_search: ANN 인덱스 검색 파라미터)"""
         if self.vector_store is None:
             raise ValueError("벡터 저장소가 초기화되지 않았습니다.")
         
-        # MMR 검색기 설정 (Maximum Marginal Relevance)
-        retriever = self.vector_store.as_retriever(
-            search_type="mmr",
-            search_kwargs={
-                "k": k,
-                "fetch_k": k*2,  # MMR을 위해 더 많은 후보를 가져옴
-                "lambda_mult": 0.5  # 다양성과 관련성의 균형 조절 (0~1)
-            }
+        # ANN 인덱스 정확도/속도 조절 (flat 인덱스에는 영향 없음)
+        set_search_params(self.vector_store.index, nprobe=nprobe, ef_search=ef_search)
+        
+        # MMR 검색기 설정 (Maximum Marginal Relevance, 후보 벡터 행렬 위에서 직접 계산)
+        # 청크 단위로 검색한 뒤 교수별로 점수를 모아 교수당 관련 청크만 컨텍스트로 전달
+        retriever = ProfessorRetriever(
+            vector_store=self.vector_store,
+            k=k,
+            fetch_k=max(fetch_k, k),  # 넓은 후보 풀에서 다양성 확보
+            lambda_mult=lambda_mult,  # 다양성과 관련성의 균형 조절 (0~1)
+            max_chunks_per_professor=3,
+            lexical_index=self.lexical_index
         )
+        # 상세 정보용은 교수당 더 많은 청크(논문, 경력 등)를 포함
+        detail_retriever = ProfessorRetriever(
+            vector_store=self.vector_store,
+            k=k,
+            fetch_k=max(fetch_k, k),
+            lambda_mult=lambda_mult,
+            max_chunks_per_professor=8,
+            lexical_index=self.lexical_index
+        )
+        self.retriever = retriever
+        self.detail_retriever = detail_retriever
         
         # 간략한 추천용 프롬프트 템플릿
         brief_prompt_template = """다음은 대학원 교수진의 상세 정보입니다. 학생의 관심 분야에 맞는 연구실을 추천해주세요.
@@ -326,6 +806,8 @@ class LabRecommenderRAG:
             template=detail_prompt_template,
             input_variables=["context", "question"]
         )
+        self.brief_prompt = BRIEF_PROMPT
+        self.detail_prompt = DETAIL_PROMPT
         
         # Brief QA 체인 생성 (연구분야 추천용)
         self.brief_qa_chain = RetrievalQA.from_chain_type(
@@ -340,7 +822,7 @@ class LabRecommenderRAG:
         self.detail_qa_chain = RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
-            retriever=retriever,
+            retriever=detail_retriever,
             chain_type_kwargs={"prompt": DETAIL_PROMPT},
             return_source_documents=True
         )
@@ -365,25 +847,43 @@ class LabRecommenderRAG:
         """구버전 호환용 - setup_qa_chains 호출"""
         self.setup_qa_chains(k)
     
-    def process_new_search(self, user_query: str, enhanced_query: str = None) -> Dict[str, Any]:
-        """새로운 검색 처리 - 간략한 추천 모드 (쿼리 확장 적용)"""
+    @staticmethod
+    def format_context(docs: List[Document]) -> str:
+        """검색된 문서를 프롬프트 컨텍스트로 결합 ("stuff" 체인과 동일한 형식)"""
+        return "\n\n".join(doc.page_content for doc in docs)
+    
+    def retrieve_documents(self, retriever: ProfessorRetriever, user_query: str, query_text: str) -> List[Document]:
+        """원본 질문 임베딩으로 dense 검색, 확장 쿼리로 어휘 검색 (aretrieve와 같은 방식)
+        
+        라우터/답변 캐시와 같은 원본 질문 벡터라 확장 쿼리를 다시 임베딩하지 않는다.
+        """
+        query_embedding = self.embeddings.embed_query(user_query)
+        return retriever.search_by_vector(query_embedding, query_text, self.professor_filter(user_query))
+    
+    def prepare_new_search(self, user_query: str, enhanced_query: str = None,
+                           docs: List[Document] = None) -> Tuple[str, List[Document]]:
+        """새로운 검색 - 간략한 추천 프롬프트와 검색 문서 (쿼리 확장 적용, docs가 있으면 검색 생략)"""
         print("\n🔍 새로운 검색을 시작합니다...")
         # 이미 확장된 쿼리가 있으면 사용, 없으면 원본 사용
         query_to_use = enhanced_query if enhanced_query else user_query
-        result = self.brief_qa_chain.invoke({"query": query_to_use})
-        return result
+        if docs is None:
+            docs = self.retrieve_documents(self.retriever, user_query, query_to_use)
+        with stage("prompt"):
+            prompt = self.brief_prompt.format(context=self.format_context(docs), question=query_to_use)
+        return prompt, docs
     
-    def process_refine_previous(self, user_query: str) -> Dict[str, Any]:
-        """이전 결과 내에서 재검색"""
-        if not self.conversation_history.retrieved_docs:
+    def prepare_refine_previous(self, user_query: str, history: ConversationHistory = None) -> Tuple[str, List[Document]]:
+        """이전 결과 내에서 재검색 - 이전 추천 교수 정보만 컨텍스트로 사용"""
+        history = self.resolve_history(history)
+        if not history.retrieved:
             # 이전 결과가 없으면 새 검색
-            return self.process_new_search(user_query)
+            return self.prepare_new_search(user_query)
         
         print("\n🔄 이전 추천 결과를 바탕으로 답변합니다...")
         
-        # 이전 추천 교수 정보만 컨텍스트로 사용
-        previous_docs = self.conversation_history.retrieved_docs[-1]
-        context_text = "\n\n".join([doc.page_content for doc in previous_docs[:5]])
+        # 이전 추천 교수 중 후속 질문과 관련된 교수/섹션만 컨텍스트로 사용
+        previous_docs = self.rerank_previous(user_query, history.last_retrieved)
+        context_text = "\n\n".join([doc.page_content for doc in previous_docs])
         
         refined_prompt = f"""
 이전에 추천한 교수진 정보:
@@ -393,20 +893,47 @@ class LabRecommenderRAG:
 
 위 교수진 정보를 바탕으로 추가 질문에 답변해주세요.
 """
+        return refined_prompt, previous_docs
+    
+    def rerank_previous(self, user_query: str, refs: Tuple[RetrievedProfessor, ...]) -> List[Document]:
+        """이전 추천 교수들의 모든 청크를 후속 질문 임베딩으로 로컬 재채점 (번역/인덱스 검색 없음)
         
-        response = self.llm.invoke(refined_prompt)
-        return {"result": response.content, "source_documents": previous_docs}
+        질문 임베딩은 답변 캐시와 같은 원본 질문 벡터라 추가 API 호출이 없다.
+        벡터 저장소가 없거나 청크를 찾지 못하면 이전 문서를 그대로 사용한다.
+        """
+        if self.vector_store is None or self.retriever is None:
+            return self.rehydrate_documents(refs)[:5]
+        query_embedding = self.embeddings.embed_query(user_query)
+        with stage("rerank"):
+            docs = self.retriever.rescore_professors(query_embedding, [ref.professor_id for ref in refs],
+                                                     self.refine_score_ratio)
+        if not docs:
+            return self.rehydrate_documents(refs)[:5]
+        set_attribute("refine_professors", f"{len(docs)}/{len(refs)}")
+        return docs
     
-    def process_professor_detail(self, user_query: str, enhanced_query: str = None) -> Dict[str, Any]:
-        """특정 교수 상세 정보 처리 (쿼리 확장 적용)"""
+    def prepare_professor_detail(self, user_query: str, enhanced_query: str = None, docs: List[Document] = None,
+                                 named_pids: Optional[List[str]] = None) -> Tuple[str, List[Document]]:
+        """특정 교수 상세 정보 프롬프트와 검색 문서 (쿼리 확장 적용, docs가 있으면 검색 생략)
+        
+        named_pids: named_professors로 확정된 교수 ID (있으면 검색 없이 해당 프로필 사용)
+        """
         print("\n👨‍🏫 특정 교수님에 대한 상세 정보를 검색합니다...")
         # 이미 확장된 쿼리가 있으면 사용, 없으면 원본 사용
         query_to_use = enhanced_query if enhanced_query else user_query
-        result = self.detail_qa_chain.invoke({"query": query_to_use})
-        return result
+        if docs is None:
+            # 이름으로 교수가 확정되면 검색 없이 해당 프로필 사용, 모호할 때만 검색
+            if named_pids is not None:
+                docs = self.direct_professor_documents(named_pids)
+                print(f"📇 교수 이름으로 직접 조회: {', '.join(doc.metadata['professor_name'] for doc in docs)}")
+            else:
+                docs = self.retrieve_documents(self.detail_retriever, user_query, query_to_use)
+        with stage("prompt"):
+            prompt = self.detail_prompt.format(context=self.format_context(docs), question=query_to_use)
+        return prompt, docs
     
-    def process_general_info(self, user_query: str) -> Dict[str, Any]:
-        """일반 정보 처리 (RAG 없이)"""
+    def prepare_general_info(self, user_query: str) -> Tuple[str, List[Document]]:
+        """일반 정보 프롬프트 (RAG 없이)"""
         print("\n💬 대학원 일반 정보에 답변합니다...")
         
         general_prompt = f"""
@@ -420,51 +947,332 @@ class LabRecommenderRAG:
 
 친근하고 도움이 되는 톤으로 답변해주세요.
 """
+        return general_prompt, []
+    
+    def prepare_strategy(self, query_type: str, user_query: str, enhanced_query: str = None,
+                         docs: List[Document] = None, history: ConversationHistory = None,
+                         named_pids: Optional[List[str]] = None) -> Tuple[str, List[Document]]:
+        """분류 결과에 맞는 처리 전략으로 프롬프트와 근거 문서 준비 (named_pids: named_professors 결과)"""
+        if query_type == "refine_previous":
+            return self.prepare_refine_previous(user_query, history)
+        if query_type == "professor_detail":
+            return self.prepare_professor_detail(user_query, enhanced_query, docs, named_pids)
+        if query_type == "general_info":
+            return self.prepare_general_info(user_query)
+        return self.prepare_new_search(user_query, enhanced_query, docs)
+    
+    def process_new_search(self, user_query: str, enhanced_query: str = None) -> Dict[str, Any]:
+        """새로운 검색 처리 - 간략한 추천 모드 (쿼리 확장 적용)"""
+        prompt, docs = self.prepare_new_search(user_query, enhanced_query)
+        return {"result": self.generate_answer(user_query, "new_search", prompt, docs), "source_documents": docs}
+    
+    def process_refine_previous(self, user_query: str, history: ConversationHistory = None) -> Dict[str, Any]:
+        """이전 결과 내에서 재검색"""
+        history = self.resolve_history(history)
+        # 이전 결과가 없으면 새 검색으로 처리되므로 캐시 키도 new_search
+        query_type = "refine_previous" if history.retrieved else "new_search"
+        prompt, docs = self.prepare_refine_previous(user_query, history)
+        return {"result": self.generate_answer(user_query, query_type, prompt, docs), "source_documents": docs}
+    
+    def process_professor_detail(self, user_query: str, enhanced_query: str = None) -> Dict[str, Any]:
+        """특정 교수 상세 정보 처리 (쿼리 확장 적용)"""
+        named_pids = self.named_professors("professor_detail", user_query)
+        prompt, docs = self.prepare_professor_detail(user_query, enhanced_query, named_pids=named_pids)
+        return {"result": self.generate_answer(user_query, "professor_detail", prompt, docs), "source_documents": docs}
+    
+    def process_general_info(self, user_query: str) -> Dict[str, Any]:
+        """일반 정보 처리 (RAG 없이)"""
+        prompt, docs = self.prepare_general_info(user_query)
+        return {"result": self.generate_answer(user_query, "general_info", prompt, docs), "source_documents": docs}
+    
+    def answer_cache_key(self, user_query: str, query_type: str,
+                         docs: List[Document]) -> Optional[Tuple[List[float], str, frozenset]]:
+        """답변 캐시 키 (원본 질문 임베딩, 질문 유형, 근거 교수 ID 집합)
         
-        response = self.llm.invoke(general_prompt)
-        return {"result": response.content, "source_documents": []}
+        캐시하지 않는 유형(general_info)은 임베딩 호출 없이 None 반환
+        """
+        if query_type in self.uncached_query_types:
+            return None
+        return (self.embeddings.embed_query(user_query), query_type,
+                SemanticAnswerCache.professor_ids_of(docs))
     
-    def process_query(self, user_query: str) -> str:
-        """질문 분류 후 적절한 처리"""
-        # 질문 분류
-        classification = self.classify_query(user_query)
+    @staticmethod
+    def record_usage(message, prompt: str, answer: str):
+        """LLM 응답의 토큰 사용량 기록 (usage_metadata가 없으면 문자 수로 추정)"""
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            record_tokens(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        else:
+            record_tokens(EmbeddingGenerator.estimate_tokens(prompt), EmbeddingGenerator.estimate_tokens(answer))
+    
+    def lookup_answer_cache(self, cache_key: Optional[Tuple[List[float], str, frozenset]]):
+        """답변 캐시 조회 (적중/미스 계측 포함, 키가 없으면 조회 생략)"""
+        if cache_key is None:
+            return None
+        cached = self.answer_cache.get(*cache_key)
+        record_cache("answer", cached is not None)
+        if cached:
+            print(f"⚡ 답변 캐시 적중: {cached.query}")
+        return cached
+    
+    def store_answer(self, cache_key: Optional[Tuple[List[float], str, frozenset]], user_query: str, answer: str):
+        """생성된 답변을 캐시에 저장 (키가 없으면 저장하지 않음)"""
+        if cache_key is not None:
+            embedding, query_type, professor_ids = cache_key
+            self.answer_cache.put(embedding, user_query, query_type, answer, professor_ids)
+    
+    def generate_answer(self, user_query: str, query_type: str, prompt: str, docs: List[Document]) -> str:
+        """답변 캐시를 먼저 확인하고, 없으면 LLM으로 생성해 캐시에 저장"""
+        cache_key = self.answer_cache_key(user_query, query_type, docs)
+        cached = self.lookup_answer_cache(cache_key)
+        if cached:
+            return cached.answer
+        
+        with stage("generation"):
+            response = self.llm.invoke(prompt)
+        answer = response.content
+        self.record_usage(response, prompt, answer)
+        self.store_answer(cache_key, user_query, answer)
+        return answer
+    
+    def generate_answer_stream(self, user_query: str, query_type: str, prompt: str, docs: List[Document]) -> Iterator[str]:
+        """generate_answer의 스트리밍 버전 (캐시 적중 시 전체 답변을 한 번에 반환)"""
+        cache_key = self.answer_cache_key(user_query, query_type, docs)
+        cached = self.lookup_answer_cache(cache_key)
+        if cached:
+            yield cached.answer
+            return
+        
+        parts, usage_chunk = [], None
+        with stage("generation"):
+            for chunk in self.llm.stream(prompt):
+                if chunk.usage_metadata:
+                    usage_chunk = chunk
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        self.record_usage(usage_chunk, prompt, "".join(parts))
+        # 끝까지 생성된 답변만 캐시
+        self.store_answer(cache_key, user_query, "".join(parts))
+    
+    async def agenerate_answer_stream(self, user_query: str, query_type: str, prompt: str,
+                                      docs: List[Document]) -> AsyncIterator[str]:
+        """generate_answer_stream의 비동기 버전"""
+        cache_key = None
+        if query_type not in self.uncached_query_types:
+            cache_key = (await self.embeddings.aembed_query(user_query), query_type,
+                         SemanticAnswerCache.professor_ids_of(docs))
+        cached = self.lookup_answer_cache(cache_key)
+        if cached:
+            yield cached.answer
+            return
+        
+        parts, usage_chunk = [], None
+        with stage("generation"):
+            async for chunk in self.llm.astream(prompt):
+                if chunk.usage_metadata:
+                    usage_chunk = chunk
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        self.record_usage(usage_chunk, prompt, "".join(parts))
+        self.store_answer(cache_key, user_query, "".join(parts))
+    
+    def classify_and_enhance(self, user_query: str, history: ConversationHistory = None) -> Dict[str, Any]:
+        """질문 분류 + (필요 시) 쿼리 확장"""
+        classification = self.classify_query(user_query, history)
         query_type = classification.get("type", "new_search")
-        reason = classification.get("reason", "")
         
         print(f"\n🤖 질문 분류: {query_type}")
-        print(f"   이유: {reason}")
+        print(f"   이유: {classification.get('reason', '')}")
         
         # 쿼리 확장 정보 저장 (스트림릿에서 표시용)
-        enhanced_query = ""
-        if query_type in ["new_search", "professor_detail"] and self.contains_korean(user_query):
-            enhanced_query = self.enhance_query_with_translation(user_query)
-            classification["enhanced_query"] = enhanced_query
-        
-        # 분류에 따른 처리
-        if query_type == "new_search":
-            result = self.process_new_search(user_query, enhanced_query)
-        elif query_type == "refine_previous":
-            result = self.process_refine_previous(user_query)
-        elif query_type == "professor_detail":
-            result = self.process_professor_detail(user_query, enhanced_query)
-        elif query_type == "general_info":
-            result = self.process_general_info(user_query)
-        else:
-            result = self.process_new_search(user_query, enhanced_query)
+        classification["enhanced_query"] = ""
+        # 이름으로 교수가 확정되는 상세 질문은 검색하지 않으므로 번역도 생략 (확정된 ID는 전략 준비에 재사용)
+        classification["named_professors"] = self.named_professors(query_type, user_query)
+        if self.needs_retrieval(query_type, classification["named_professors"]) and self.contains_korean(user_query):
+            classification["enhanced_query"] = self.enhance_query_with_translation(user_query)
+        
+        self.resolve_history(history).last_classification = classification
+        return classification
+    
+    def process_query(self, user_query: str, history: ConversationHistory = None) -> str:
+        """질문 분류 후 적절한 처리 (history: 사용자별 대화 히스토리, 없으면 엔진 기본 히스토리)"""
+        history = self.resolve_history(history)
+        with start_trace("process_query", query=user_query) as trace:
+            classification = self.classify_and_enhance(user_query, history)
+            query_type = classification.get("type", "new_search")
+            enhanced_query = classification["enhanced_query"]
+            
+            # 분류에 따른 처리 (유사 질문의 답변이 캐시에 있으면 생성 생략)
+            prompt, source_docs = self.prepare_strategy(query_type, user_query, enhanced_query, history=history,
+                                                        named_pids=classification["named_professors"])
+            response_text = self.generate_answer(user_query, query_type, prompt, source_docs)
         
         # 히스토리에 저장
-        response_text = result["result"]
-        source_docs = result.get("source_documents", [])
-        self.conversation_history.add_turn(user_query, response_text, source_docs)
+        history.add_turn(user_query, response_text, source_docs)
+        history.last_trace = trace
         
         return response_text
+    
+    def process_query_stream(self, user_query: str, history: ConversationHistory = None) -> Iterator[str]:
+        """process_query의 스트리밍 버전 - 분류/검색 후 LLM 응답 토큰을 생성되는 대로 반환"""
+        history = self.resolve_history(history)
+        # 제너레이터이므로 Trace는 분류/검색과 각 토큰 생성 동안만 활성화 (yield 사이에 소비자 쪽으로 새지 않게)
+        with open_trace("process_query_stream", query=user_query) as trace:
+            with activate_trace(trace):
+                classification = self.classify_and_enhance(user_query, history)
+                prompt, docs = self.prepare_strategy(classification["type"], user_query,
+                                                     classification["enhanced_query"], history=history,
+                                                     named_pids=classification["named_professors"])
+            
+            parts = []
+            tokens = self.generate_answer_stream(user_query, classification["type"], prompt, docs)
+            for token in iterate_in_trace(trace, tokens):
+                parts.append(token)
+                yield token
+        
+        # 응답이 끝까지 생성된 뒤 히스토리에 저장
+        history.add_turn(user_query, "".join(parts), docs)
+        history.last_trace = trace
+    
+    async def aretrieve(self, retriever: ProfessorRetriever, user_query: str,
+                        timings: Dict[str, float]) -> Tuple[str, List[Document]]:
+        """원본 질문 임베딩(dense 검색용)과 쿼리 확장을 동시에 실행한 뒤, 확장 쿼리의 어휘 검색과 결합"""
+        async def timed(stage, coroutine):
+            start = time.perf_counter()
+            result = await coroutine
+            timings[stage] = (time.perf_counter() - start) * 1000
+            return result
+        
+        start = time.perf_counter()
+        enhanced_query, query_embedding = await asyncio.gather(
+            timed("expansion", self.aenhance_query_with_translation(user_query)),
+            timed("embedding", self.embeddings.aembed_query(user_query)),
+        )
+        timings["expansion_embedding_wall"] = (time.perf_counter() - start) * 1000
+        
+        # 벡터 검색 + BM25(확장 쿼리) + MMR은 CPU 작업이므로 스레드에서 실행 (질문 용어를 가진 교수 우선)
+        start = time.perf_counter()
+        docs = await asyncio.to_thread(retriever.search_by_vector, query_embedding, enhanced_query,
+                                       self.professor_filter(user_query))
+        timings["retrieval"] = (time.perf_counter() - start) * 1000
+        return enhanced_query, docs
+    
+    async def aprepare_strategy(self, user_query: str, timings: Dict[str, float],
+                                history: ConversationHistory) -> Tuple[Dict[str, Any], str, List[Document]]:
+        """비동기 분류 → (검색이 필요한 전략이면) 병렬 확장/검색 → 프롬프트 구성"""
+        start = time.perf_counter()
+        # 라우터가 있으면 원본 질문 임베딩을 먼저 비동기로 구해 분류에 사용 (이후 검색/답변 캐시는 캐시 적중)
+        query_embedding = await self.embeddings.aembed_query(user_query) if self.query_router is not None else None
+        # 규칙/LLM 분류는 동기 코드이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        classification = await asyncio.to_thread(self.classify_query, user_query, history, query_embedding)
+        query_type = classification.get("type", "new_search")
+        timings["classify"] = (time.perf_counter() - start) * 1000
+        
+        print(f"\n🤖 질문 분류: {query_type}")
+        print(f"   이유: {classification.get('reason', '')}")
+        
+        # 이전 결과가 없는 후속 질문은 새 검색으로 처리
+        if query_type == "refine_previous" and not history.retrieved:
+            query_type = "new_search"
+            classification["type"] = query_type
+            set_attribute("query_type", query_type)
+        
+        classification["enhanced_query"] = ""
+        classification["named_professors"] = named_pids = self.named_professors(query_type, user_query)
+        if self.needs_retrieval(query_type, named_pids):
+            retriever = self.detail_retriever if query_type == "professor_detail" else self.retriever
+            enhanced_query, docs = await self.aretrieve(retriever, user_query, timings)
+            if enhanced_query != user_query:
+                classification["enhanced_query"] = enhanced_query
+            prompt, docs = await asyncio.to_thread(self.prepare_strategy, query_type, user_query, enhanced_query, docs)
+        else:
+            if query_type == "refine_previous" and query_embedding is None:
+                # 재채점용 질문 임베딩을 비동기로 미리 구함 (이후 동기 재채점/답변 캐시는 캐시 적중)
+                await self.embeddings.aembed_query(user_query)
+            # 상세 문서 구성/이전 결과 재채점도 동기 코드이므로 스레드에서 실행
+            prompt, docs = await asyncio.to_thread(self.prepare_strategy, query_type, user_query,
+                                                   history=history, named_pids=named_pids)
+        
+        history.last_classification = classification
+        return classification, prompt, docs
+    
+    @staticmethod
+    def format_timings(timings: Dict[str, float]) -> str:
+        """단계별 지연시간 요약 (병렬 구간은 절약된 시간 포함)"""
+        summary = ", ".join(f"{stage} {ms:.0f}ms" for stage, ms in timings.items())
+        if "expansion_embedding_wall" in timings:
+            saved = max(timings["expansion"] + timings["embedding"] - timings["expansion_embedding_wall"], 0.0)
+            summary += f" (병렬 실행으로 {saved:.0f}ms 절약)"
+        return summary
+    
+    async def aprocess_query(self, user_query: str, history: ConversationHistory = None) -> Dict[str, Any]:
+        """process_query의 asyncio 버전
+        
+        원본 질문의 dense 검색(임베딩)과 쿼리 확장을 동시에 실행하고 비동기 LLM/임베딩 클라이언트를 사용한다.
+        반환: {"result", "source_documents", "classification", "timings"(단계별 ms)}
+        """
+        history = self.resolve_history(history)
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        with start_trace("aprocess_query", query=user_query) as trace:
+            classification, prompt, docs = await self.aprepare_strategy(user_query, timings, history)
+            
+            generation_start = time.perf_counter()
+            answer = "".join([token async for token in
+                              self.agenerate_answer_stream(user_query, classification["type"], prompt, docs)])
+            timings["generation"] = (time.perf_counter() - generation_start) * 1000
+        timings["total"] = (time.perf_counter() - start) * 1000
+        
+        history.add_turn(user_query, answer, docs)
+        history.last_trace = trace
+        print(f"⏱️ 단계별 지연시간: {self.format_timings(timings)}")
+        return {
+            "result": answer,
+            "source_documents": docs,
+            "classification": classification,
+            "timings": timings,
+        }
+    
+    async def aprocess_query_stream(self, user_query: str, history: ConversationHistory = None) -> AsyncIterator[str]:
+        """process_query_stream의 비동기 버전 (aprocess_query와 같은 병렬 검색 후 비동기 스트림 생성)"""
+        history = self.resolve_history(history)
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+        with open_trace("aprocess_query_stream", query=user_query) as trace:
+            with activate_trace(trace):
+                classification, prompt, docs = await self.aprepare_strategy(user_query, timings, history)
+            
+            parts = []
+            tokens = self.agenerate_answer_stream(user_query, classification["type"], prompt, docs)
+            async for token in aiterate_in_trace(trace, tokens):
+                if not parts:
+                    timings["first_token"] = (time.perf_counter() - start) * 1000
+                parts.append(token)
+                yield token
+        timings["total"] = (time.perf_counter() - start) * 1000
+        
+        history.add_turn(user_query, "".join(parts), docs)
+        history.last_trace = trace
+        print(f"⏱️ 단계별 지연시간: {self.format_timings(timings)}")
 
 def main():
     parser = argparse.ArgumentParser(description='대학원 연구실 추천 AI')
     parser.add_argument('--rebuild', action='store_true', 
-                       help='벡터 저장소를 새로 생성합니다')
+                       help='변경된 교수만 다시 임베딩하여 벡터 저장소를 갱신합니다')
+    parser.add_argument('--full-rebuild', action='store_true',
+                       help='벡터 저장소를 처음부터 새로 생성합니다')
     parser.add_argument('--k', type=int, default=5,
                        help='검색할 연구실 수 (기본값: 5)')
+    parser.add_argument('--fetch-k', type=int, default=100,
+                       help='MMR 후보 수 (기본값: 100)')
+    parser.add_argument('--index-type', default='flat', choices=INDEX_TYPES,
+                       help='벡터 인덱스 타입 (기본값: flat, 정확 검색)')
+    parser.add_argument('--nprobe', type=int, default=None,
+                       help='IVF 인덱스 검색 시 탐색할 클러스터 수')
+    parser.add_argument('--ef-search', type=int, default=None,
+                       help='HNSW 인덱스 검색 시 후보 리스트 크기')
     
     args = parser.parse_args()
     
@@ -472,14 +1280,18 @@ def main():
     data_path = "professors_final_complete.json"
     
     # RAG 시스템 초기화
-    rag_system = LabRecommenderRAG(data_path)
+    rag_system = LabRecommenderRAG(data_path, index_type=args.index_type)
     
     # 벡터 저장소 설정
-    if args.rebuild or not rag_system.load_vector_store():
+    if args.full_rebuild:
+        rag_system.create_vector_store()
+    elif args.rebuild:
+        rag_system.update_vector_store()
+    elif not rag_system.load_vector_store():
         rag_system.create_vector_store()
     
     # QA 체인 설정
-    rag_system.setup_qa_chains(k=args.k)
+    rag_system.setup_qa_chains(k=args.k, fetch_k=args.fetch_k, nprobe=args.nprobe, ef_search=args.ef_search)
     
     print("\n🎓 대학원 연구실 추천 AI에 오신 것을 환영합니다!")
     print("관심있는 연구 분야나 주제를 자유롭게 입력해주세요.")
@@ -513,12 +1325,11 @@ def main():
                 print("❗ 질문을 입력해주세요.")
                 continue
             
-            # 질문 처리 및 응답
+            # 질문 처리 및 응답 (생성되는 대로 출력)
+            print("\n" + "="*60)
+            for token in rag_system.process_query_stream(user_input):
+                print(token, end="", flush=True)
             print("\n" + "="*60)
-            response = rag_system.process_query(user_input)
-            print("="*60)
-            print(response)
-            print("="*60)
             
             is_first_question = False
             
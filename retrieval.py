@@ -0,0 +1,248 @@
+"""
+교수 문서 검색기
+FAISS 청크 후보 검색(+ BM25 어휘 검색 RRF 결합) → 교수별 점수 집계 → 후보 벡터 행렬 위의 자체 MMR 재순위화
+교수 필터(질문 용어를 가진 교수 ID)가 주어지면 해당 교수를 MMR 순위에서 우선 (결과를 비우지 않는 소프트 필터)
+"""
+
+from typing import AbstractSet, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from chunking import chunk_body, chunk_professor_id, professor_header
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from metrics import stage
+from vector_engine import mmr_select
+
+
+class ProfessorRetriever(BaseRetriever):
+    """FAISS 청크 후보(fetch_k)를 교수별로 집계하고 벡터화된 MMR로 교수 k명을 고르는 검색기"""
+
+    vector_store: FAISS
+    k: int = 5
+    fetch_k: int = 100
+    lambda_mult: float = 0.5
+    max_chunks_per_professor: int = 3
+    chunk_bonus: float = 0.1
+    # 어휘 검색 (없으면 dense 검색만 사용)
+    lexical_index: Optional[BM25Index] = None
+    rrf_k: int = 60
+    # 교수 필터에 포함된 교수의 MMR 관련도 가산점 (관련도 최댓값 이상이면 필터 교수가 항상 먼저 선택됨)
+    filter_bonus: float = 1.0
+
+    _positions: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _professor_positions: Dict[str, List[int]] = PrivateAttr(default_factory=dict)
+    _positions_source: int = PrivateAttr(default=0)
+
+    def refresh_positions(self):
+        """문서 ID → FAISS 위치, 교수 ID → 청크 위치 역매핑 (저장소가 갱신되면 재구성)"""
+        mapping = self.vector_store.index_to_docstore_id
+        if self._positions_source != id(mapping) or len(self._positions) != len(mapping):
+            self._positions = {doc: position for position, doc in mapping.items()}
+            self._professor_positions = {}
+            for position, doc in sorted(mapping.items()):
+                self._professor_positions.setdefault(chunk_professor_id(doc), []).append(position)
+            self._positions_source = id(mapping)
+
+    def position_of(self, doc_id: str) -> Optional[int]:
+        """문서 ID의 FAISS 인덱스 위치"""
+        self.refresh_positions()
+        return self._positions.get(doc_id)
+
+    def professor_positions(self, pid: str) -> List[int]:
+        """교수 한 명의 모든 청크 FAISS 위치 (색인에 없으면 빈 목록)"""
+        self.refresh_positions()
+        return self._professor_positions.get(pid, [])
+
+    def fetch_candidates(self, query_embedding: Sequence[float]) -> Tuple[List[str], np.ndarray]:
+        """인덱스에서 fetch_k개 후보의 문서 ID와 (복원된) 벡터 행렬 반환"""
+        return self.fetch_candidates_batch([query_embedding])[0]
+
+    def fetch_candidates_batch(self, query_embeddings: Sequence[Sequence[float]]) -> List[Tuple[List[str], np.ndarray]]:
+        """여러 쿼리의 후보를 인덱스 검색 한 번(쿼리 행렬)으로 가져옴"""
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        with stage("vector_search"):
+            _, batch_positions = self.vector_store.index.search(queries, self.fetch_k)
+
+        results = []
+        for row in batch_positions:
+            positions = row[row >= 0]
+            if len(positions) == 0:
+                results.append(([], np.zeros((0, queries.shape[1]), dtype=np.float32)))
+                continue
+            doc_ids = [self.vector_store.index_to_docstore_id[int(p)] for p in positions]
+            results.append((doc_ids, self.vector_store.index.reconstruct_batch(positions)))
+        return results
+
+    def fuse_lexical(self, query: np.ndarray, query_text: str, doc_ids: List[str], vectors: np.ndarray,
+                     relevance: np.ndarray) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """BM25 결과를 dense 후보와 RRF로 결합해 후보 fetch_k개를 고름
+
+        RRF는 어떤 청크가 후보에 남을지(순서)만 정하고, 이후 교수 점수/MMR/문서 점수에 쓰는 관련도는
+        어휘 검색 결과 유무와 무관하게 항상 코사인 유사도로 유지한다.
+        """
+        lexical_ids = [doc_id for doc_id, _ in self.lexical_index.search(query_text, self.fetch_k)
+                       if self.position_of(doc_id) is not None]
+        if not lexical_ids:
+            return doc_ids, vectors, relevance
+
+        dense_ranking = [doc_ids[i] for i in np.argsort(-relevance, kind="stable")]
+        fused = reciprocal_rank_fusion([dense_ranking, lexical_ids], self.rrf_k)
+
+        # 어휘 검색에서만 나온 청크는 벡터를 복원하고 코사인 관련도를 계산해 후보에 추가
+        known = set(doc_ids)
+        extra_ids = [doc_id for doc_id in lexical_ids if doc_id not in known]
+        if extra_ids:
+            positions = np.array([self.position_of(doc_id) for doc_id in extra_ids], dtype=np.int64)
+            extra_vectors = self.vector_store.index.reconstruct_batch(positions)
+            extra_relevance = extra_vectors @ query / np.maximum(np.linalg.norm(extra_vectors, axis=1), 1e-12)
+            vectors = np.vstack([vectors, extra_vectors])
+            relevance = np.concatenate([relevance, extra_relevance])
+            doc_ids = doc_ids + extra_ids
+
+        # 결합 순위 상위 fetch_k개만 후보로 유지
+        fused_scores = np.array([fused[doc_id] for doc_id in doc_ids], dtype=np.float32)
+        keep = np.argsort(-fused_scores, kind="stable")[:self.fetch_k]
+        return [doc_ids[i] for i in keep], vectors[keep], relevance[keep]
+
+    def search_by_vector(self, query_embedding: Sequence[float], query_text: str = None,
+                         professor_filter: Optional[AbstractSet[str]] = None) -> List[Document]:
+        """쿼리 벡터로 청크 후보 검색 → (어휘 검색 결합) → 교수별 점수 집계 → 교수 단위 MMR 선택"""
+        doc_ids, vectors = self.fetch_candidates(query_embedding)
+        return self.rank_candidates(query_embedding, query_text, doc_ids, vectors, professor_filter)
+
+    def search_by_vectors(self, query_embeddings: Sequence[Sequence[float]],
+                          query_texts: Sequence[str] = None,
+                          professor_filters: Sequence[Optional[AbstractSet[str]]] = None) -> List[List[Document]]:
+        """여러 쿼리를 한 번의 행렬 검색으로 처리 (마이크로 배치 서빙용)"""
+        if len(query_embeddings) == 0:
+            return []
+        query_texts = query_texts or [None] * len(query_embeddings)
+        professor_filters = professor_filters or [None] * len(query_embeddings)
+        return [
+            self.rank_candidates(query_embedding, query_text, doc_ids, vectors, professor_filter)
+            for query_embedding, query_text, professor_filter, (doc_ids, vectors)
+            in zip(query_embeddings, query_texts, professor_filters, self.fetch_candidates_batch(query_embeddings))
+        ]
+
+    def rank_candidates(self, query_embedding: Sequence[float], query_text: Optional[str],
+                        doc_ids: List[str], vectors: np.ndarray,
+                        professor_filter: Optional[AbstractSet[str]] = None) -> List[Document]:
+        """후보 청크 → (어휘 검색 결합) → 교수별 점수 집계 → 교수 단위 MMR 선택"""
+        if not doc_ids:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        relevance = vectors @ query / np.maximum(np.linalg.norm(vectors, axis=1), 1e-12)
+
+        if self.lexical_index is not None and query_text:
+            with stage("lexical_search"):
+                doc_ids, vectors, relevance = self.fuse_lexical(query, query_text, doc_ids, vectors, relevance)
+
+        with stage("mmr"):
+            return self.select_professors(query, doc_ids, vectors, relevance, professor_filter)
+
+    def select_professors(self, query: np.ndarray, doc_ids: List[str], vectors: np.ndarray,
+                          relevance: np.ndarray,
+                          professor_filter: Optional[AbstractSet[str]] = None) -> List[Document]:
+        """교수별 점수 집계 → 대표 청크 벡터 위의 MMR로 교수 k명 선택 (필터 교수 우선)"""
+        # 교수별로 청크를 관련도 순으로 묶음
+        groups: Dict[str, List[int]] = {}
+        chunks = [self.vector_store.docstore.search(doc_id) for doc_id in doc_ids]
+        for i in np.argsort(-relevance, kind="stable"):
+            pid = chunks[i].metadata.get("professor_id", doc_ids[i])
+            groups.setdefault(pid, []).append(int(i))
+
+        professor_ids = list(groups)
+        scores = np.array([self.professor_score(relevance[groups[pid]]) for pid in professor_ids], dtype=np.float32)
+        representatives = vectors[[groups[pid][0] for pid in professor_ids]]
+
+        # 필터 교수는 MMR 순위에서만 가산 (문서 점수는 원래 관련도 유지, 나머지 교수로 k명을 채움)
+        ranking = scores
+        if professor_filter:
+            in_filter = np.fromiter((pid in professor_filter for pid in professor_ids), dtype=bool,
+                                    count=len(professor_ids))
+            ranking = scores + self.filter_bonus * in_filter
+
+        documents = []
+        for p in mmr_select(query, representatives, self.k, self.lambda_mult, relevance=ranking):
+            matched = groups[professor_ids[p]][:self.max_chunks_per_professor]
+            documents.append(self.compose_document([chunks[i] for i in matched], float(scores[p]),
+                                                   [float(relevance[i]) for i in matched]))
+        return documents
+
+    def professor_score(self, ranked_relevance: np.ndarray) -> float:
+        """교수 점수 = 최고 청크 점수 + 추가로 매칭된 청크 보너스 (청크 관련도는 내림차순)"""
+        return float(ranked_relevance[0]
+                     + self.chunk_bonus * ranked_relevance[1:self.max_chunks_per_professor].clip(min=0).sum())
+
+    def rescore_professors(self, query_embedding: Sequence[float], professor_ids: Sequence[str],
+                           min_score_ratio: float = 0.8) -> List[Document]:
+        """주어진 교수들의 모든 청크를 쿼리 벡터로 재채점 (인덱스 검색 없이 저장된 벡터만 사용)
+
+        최고 점수의 min_score_ratio 미만인 교수는 제외하고, 교수마다 관련도가 높은 청크
+        max_chunks_per_professor개만 남겨 점수순으로 반환한다. 색인에 청크가 없는 교수는 빠진다.
+        """
+        groups = [(pid, self.professor_positions(pid)) for pid in dict.fromkeys(professor_ids)]
+        groups = [(pid, positions) for pid, positions in groups if positions]
+        if not groups:
+            return []
+
+        positions = np.array([position for _, group in groups for position in group], dtype=np.int64)
+        vectors = self.vector_store.index.reconstruct_batch(positions)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        relevance = vectors @ query / np.maximum(np.linalg.norm(vectors, axis=1), 1e-12)
+
+        scored = []
+        offset = 0
+        for pid, group in groups:
+            chunk_relevance = relevance[offset:offset + len(group)]
+            order = np.argsort(-chunk_relevance, kind="stable")
+            scored.append((self.professor_score(chunk_relevance[order]), pid,
+                           [(group[i], float(chunk_relevance[i])) for i in order[:self.max_chunks_per_professor]]))
+            offset += len(group)
+
+        best = max(score for score, _, _ in scored)
+        threshold = best * min_score_ratio if best > 0 else -np.inf
+        documents = []
+        for score, _, matched in sorted(scored, key=lambda item: -item[0]):
+            if score < threshold:
+                break
+            chunks = [self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[position])
+                      for position, _ in matched]
+            documents.append(self.compose_document(chunks, score, [chunk_score for _, chunk_score in matched]))
+        return documents
+
+    @staticmethod
+    def compose_document(chunks: List[Document], score: float, chunk_scores: List[float]) -> Document:
+        """교수 기본 정보 + 매칭된 청크 본문만으로 프롬프트용 Document 구성"""
+        metadata = {key: value for key, value in chunks[0].metadata.items()
+                    if key not in ("chunk_type", "doc_id")}
+        metadata.update(
+            score=score,
+            matched_chunks=[chunk.metadata.get("doc_id") for chunk in chunks],
+            chunk_scores=chunk_scores,
+        )
+
+        # 청크 분할 이전(교수 단위) 저장소는 전체 프로필을 그대로 사용
+        if "chunk_type" not in chunks[0].metadata:
+            return Document(page_content=chunks[0].page_content, metadata=metadata)
+
+        sections = [professor_header(metadata)] + [chunk_body(chunk) for chunk in chunks]
+        return Document(page_content="\n".join(sections), metadata=metadata)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                professor_filter: Optional[AbstractSet[str]] = None) -> List[Document]:
+        query_embedding = self.vector_store.embeddings.embed_query(query)
+        return self.search_by_vector(query_embedding, query, professor_filter)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager=None,
+                                       professor_filter: Optional[AbstractSet[str]] = None) -> List[Document]:
+        query_embedding = await self.vector_store.embeddings.aembed_query(query)
+        return self.search_by_vector(query_embedding, query, professor_filter)
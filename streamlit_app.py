@@ -8,6 +8,7 @@ import time
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from rag_lab_recommender import LabRecommenderRAG, ConversationHistory
+import metrics
 
 # Streamlit 페이지 설정
 st.set_page_config(
@@ -88,6 +89,23 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner='🔄 RAG 시스템을 초기화하고 있습니다...')
+def load_shared_rag_system(data_path: str) -> LabRecommenderRAG:
+    """프로세스 전체가 공유하는 RAG 엔진 (벡터 저장소, QA 체인, LLM/임베딩 클라이언트)
+    
+    엔진은 읽기 전용으로만 사용하고, 세션별 상태는 ConversationHistory로 분리한다.
+    """
+    rag_system = LabRecommenderRAG(data_path)
+    
+    # 벡터 저장소 로드
+    if not rag_system.load_vector_store():
+        print("⚠️ 기존 벡터 저장소를 찾을 수 없습니다. 새로 생성합니다...")
+        rag_system.create_vector_store()
+    
+    # QA 체인 설정
+    rag_system.setup_qa_chains(k=5)
+    return rag_system
+
 class StreamlitRAGApp:
     def __init__(self):
         self.data_path = "professors_final_complete.json"
@@ -95,28 +113,20 @@ class StreamlitRAGApp:
         self.init_rag_system()
     
     def init_rag_system(self):
-        """RAG 시스템 초기화"""
-        if 'rag_system' not in st.session_state:
-            with st.spinner('🔄 RAG 시스템을 초기화하고 있습니다...'):
-                try:
-                    rag_system = LabRecommenderRAG(self.data_path)
-                    
-                    # 벡터 저장소 로드
-                    if not rag_system.load_vector_store():
-                        st.warning("⚠️ 기존 벡터 저장소를 찾을 수 없습니다. 새로 생성합니다...")
-                        rag_system.create_vector_store()
-                    
-                    # QA 체인 설정
-                    rag_system.setup_qa_chains(k=5)
-                    
-                    st.session_state.rag_system = rag_system
-                    st.success("✅ RAG 시스템이 성공적으로 초기화되었습니다!")
-                    
-                except Exception as e:
-                    st.error(f"❌ RAG 시스템 초기화 실패: {str(e)}")
-                    st.stop()
+        """공유 RAG 엔진 연결 + 세션별 대화 히스토리 초기화"""
+        try:
+            self.rag_system = load_shared_rag_system(self.data_path)
+        except Exception as e:
+            st.error(f"❌ RAG 시스템 초기화 실패: {str(e)}")
+            st.stop()
         
-        self.rag_system = st.session_state.rag_system
+        if 'conversation_history' not in st.session_state:
+            st.session_state.conversation_history = ConversationHistory()
+    
+    @property
+    def history(self) -> ConversationHistory:
+        """현재 브라우저 세션의 대화 히스토리"""
+        return st.session_state.conversation_history
     
     def init_session_state(self):
         """세션 상태 초기화"""
@@ -162,27 +172,24 @@ class StreamlitRAGApp:
             "timestamp": time.time()
         })
         
-        # RAG 시스템으로 처리
-        with st.spinner('🔍 답변을 생성하고 있습니다...'):
-            try:
-                # 분류 정보 가져오기
-                classification = self.rag_system.classify_query(user_input)
-                
-                # 응답 생성
-                response = self.rag_system.process_query(user_input)
-                
-                # 응답 저장
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": response,
-                    "classification": classification,
-                    "timestamp": time.time()
-                })
-                
-                st.session_state.conversation_count += 1
-                
-            except Exception as e:
-                st.error(f"❌ 오류가 발생했습니다: {str(e)}")
+        # 방금 입력한 질문을 먼저 표시하고, 답변은 토큰이 생성되는 대로 렌더링
+        self.render_chat_message("user", user_input)
+        try:
+            with st.chat_message("assistant", avatar="🤖"):
+                response = st.write_stream(self.rag_system.process_query_stream(user_input, self.history))
+            
+            # 응답 저장 (분류 정보는 스트리밍 중 확정된 값 사용)
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": response,
+                "classification": dict(self.history.last_classification),
+                "timestamp": time.time()
+            })
+            
+            st.session_state.conversation_count += 1
+            
+        except Exception as e:
+            st.error(f"❌ 오류가 발생했습니다: {str(e)}")
     
     def render_sidebar(self):
         """사이드바 렌더링"""
@@ -198,9 +205,21 @@ class StreamlitRAGApp:
             </div>
             """, unsafe_allow_html=True)
             
+            # 답변 캐시 통계 (프로세스 전체 공유)
+            cache_stats = self.rag_system.answer_cache.stats()
+            st.markdown(f"""
+            <div class="sidebar-info">
+                <strong>⚡ 답변 캐시</strong><br>
+                • 적중률: {cache_stats['hit_rate']:.1%} ({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})<br>
+                • 저장된 답변: {cache_stats['entries']}개
+            </div>
+            """, unsafe_allow_html=True)
+            
+            self.render_debug_panel()
+            
             # 대화 초기화 버튼
             if st.button("🔄 대화 초기화", use_container_width=True):
-                self.rag_system.conversation_history.clear()
+                self.history.clear()
                 st.session_state.messages = []
                 st.session_state.conversation_count = 0
                 st.success("대화가 초기화되었습니다!")
@@ -230,6 +249,25 @@ class StreamlitRAGApp:
             - **마지막 업데이트**: 2025-07-23
             """)
     
+    def render_debug_panel(self):
+        """마지막 질문의 단계별 지연시간 / 토큰 / 캐시 적중 + 프로세스 누적 지표"""
+        with st.expander("🛠️ 디버그 (파이프라인 계측)"):
+            trace = self.history.last_trace
+            if trace is None:
+                st.caption("질문을 입력하면 단계별 계측 결과가 표시됩니다.")
+            else:
+                st.markdown(f"**전체 {trace.duration_ms:.0f}ms** · `{trace.attributes.get('query_type', '-')}`")
+                st.bar_chart({"ms": trace.stage_totals()})
+                st.markdown(
+                    f"• 토큰: 프롬프트 {trace.tokens['prompt']} / 완성 {trace.tokens['completion']}<br>"
+                    + "".join(f"• {cache} 캐시: 적중 {counts['hit']} / 미스 {counts['miss']}<br>"
+                              for cache, counts in trace.cache.items()),
+                    unsafe_allow_html=True,
+                )
+            
+            if st.checkbox("누적 지표 (Prometheus 형식)"):
+                st.code(metrics.render_prometheus(), language="text")
+    
     def run(self):
         """메인 앱 실행"""
         # 세션 상태 초기화
@@ -269,7 +307,7 @@ class StreamlitRAGApp:
         if user_input:
             # 특수 명령어 처리
             if user_input.lower() in ['clear', 'reset', '초기화', '새로시작']:
-                self.rag_system.conversation_history.clear()
+                self.history.clear()
                 st.session_state.messages = []
                 st.session_state.conversation_count = 0
                 st.success("🔄 대화가 초기화되었습니다!")
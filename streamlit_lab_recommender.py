@@ -4,38 +4,43 @@
 """
 
 import streamlit as st
-import json
-import numpy as np
 import os
-import pickle
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from openai import AzureOpenAI
 import time
 
-# 페이지 설정
-st.set_page_config(
-    page_title="🔬 서울대 의대 연구실 추천",
-    page_icon="🔬",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+from vector_engine import VectorSearchEngine
+from embedding_cache import EmbeddingCache
+from embedding_store import (DEFAULT_EMBEDDING_PATH, load_embedding_matrix, load_embedding_row_field, convert_pickle,
+                             ids_digest)
+from professor_store import ProfessorStore, ProfessorRecord
+from answer_cache import SemanticAnswerCache
+from generate_embeddings import EmbeddingGenerator
 
 class LabRecommendationSystem:
     def __init__(self):
-        self.professors_data = []
+        # 정수 인덱스 = 임베딩 행 순서 (__slots__ 레코드, ID/이름 O(1) 조회)
+        self.professor_store = ProfessorStore()
         self.professor_embeddings = []
+        # 교수별 추천 프롬프트 요약 (임베딩 행별 목록에 미리 계산되어 저장, 인덱스 = 레코드 인덱스)
+        # 첫 추천 때 로드 (prompt_snippets 속성)
+        self._prompt_snippets: Optional[List[str]] = None
+        self.embedding_header: Optional[Dict[str, Any]] = None
+        self.search_engine = VectorSearchEngine()
         self.client = None
         self.embedding_model = "text-embedding-3-small"
-        
+        # 쿼리 임베딩 캐시 (예시 쿼리 등 반복 쿼리는 API 호출 생략)
+        self.embedding_cache = EmbeddingCache(model=self.embedding_model, dimension=1536)
+        # 유사 질문 + 같은 매칭 교수 집합이면 GPT 추천 생성 생략
+        self.answer_cache = SemanticAnswerCache()
+
     @st.cache_data
     def load_professor_data(_self):
         """교수진 데이터 로드 (캐시됨)"""
         try:
-            with open('professors_final_complete.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            _self.professors_data = data["교수진"]
-            return True, f"{len(_self.professors_data)}명 교수 데이터 로드 완료"
+            # 파일 전체를 dict로 올리지 않고 스트리밍으로 레코드 저장소 구성
+            _self.professor_store = ProfessorStore.load('professors_final_complete.json')
+            return True, f"{len(_self.professor_store)}명 교수 데이터 로드 완료"
         except FileNotFoundError:
             return False, "professors_final_complete.json 파일을 찾을 수 없습니다."
         except Exception as e:
@@ -43,15 +48,30 @@ class LabRecommendationSystem:
     
     @st.cache_data
     def load_embeddings(_self):
-        """저장된 임베딩 벡터 로드 (캐시됨)"""
+        """저장된 임베딩 벡터 로드 (memmap, 캐시됨)"""
         try:
-            with open('professor_embeddings.pkl', 'rb') as f:
-                embedding_data = pickle.load(f)
+            # 기존 pickle 파일만 있으면 한 번 변환
+            if not os.path.exists(DEFAULT_EMBEDDING_PATH) and os.path.exists('professor_embeddings.pkl'):
+                convert_pickle('professor_embeddings.pkl', 'professors_final_complete.json', DEFAULT_EMBEDDING_PATH)
+            
+            matrix, header = load_embedding_matrix(DEFAULT_EMBEDDING_PATH)
             
-            _self.professor_embeddings = embedding_data["embeddings"]
-            return True, f"{len(_self.professor_embeddings)}개 임베딩 벡터 로드 완료"
+            # 교수 데이터와 임베딩 순서가 어긋나면 잘못된 교수가 매칭되므로 거부 (ID 목록 요약값만 비교)
+            if header["ids_digest"] != ids_digest(_self.professor_store.professor_ids):
+                return False, "임베딩과 교수 데이터가 일치하지 않습니다. 임베딩을 다시 생성해주세요."
+            
+            # 프롬프트 요약은 첫 추천 때 행별 목록 파일에서 로드
+            _self.embedding_header = header
+            _self._prompt_snippets = None
+            
+            # 정규화된 memmap 행렬을 복사 없이 검색 엔진에 연결 (워커 간 페이지 캐시 공유)
+            _self.professor_embeddings = matrix
+            _self.search_engine.set_matrix(matrix)
+            # 임베딩이 다시 생성되면 이전 추천 답변은 무효화
+            _self.answer_cache.set_version(header["content_digest"])
+            return True, f"{header['count']}개 임베딩 벡터 로드 완료"
         except FileNotFoundError:
-            return False, "professor_embeddings.pkl 파일이 없습니다. 임베딩을 생성해주세요."
+            return False, f"{DEFAULT_EMBEDDING_PATH} 파일이 없습니다. 임베딩을 생성해주세요."
         except Exception as e:
             return False, f"임베딩 로드 실패: {str(e)}"
     
@@ -74,71 +94,45 @@ class LabRecommendationSystem:
         except Exception as e:
             return False, f"OpenAI 클라이언트 초기화 실패: {str(e)}"
     
-    def create_professor_text_for_embedding(self, professor: Dict) -> str:
-        """교수 정보를 임베딩용 텍스트로 변환"""
-        parts = []
-        
-        # 기본정보
-        name = professor["기본정보"]["교수이름"]
-        degree = professor["기본정보"]["학위"]
-        parts.append(f"교수명: {name}, 학위: {degree}")
-        
-        # 연구실
-        if professor["연구실"]["연구실명"]:
-            parts.append(f"연구실: {professor['연구실']['연구실명']}")
-        
-        # 연구분야 (가장 중요!)
-        if professor["연구분야"]["키워드"]:
-            parts.append(f"연구분야: {professor['연구분야']['키워드']}")
-        
-        if professor["연구분야"]["설명"]:
-            description = professor["연구분야"]["설명"][:200]
-            parts.append(f"연구설명: {description}")
-        
-        # 연구주제
-        if professor["연구주제"]:
-            topics = " | ".join(professor["연구주제"][:5])
-            parts.append(f"연구주제: {topics}")
-        
-        # 기술방법
-        if professor["기술및방법"]:
-            methods = " | ".join(professor["기술및방법"][:5])
-            parts.append(f"기술방법: {methods}")
-        
-        # 논문 (최신 3편만)
-        if professor["논문"]:
-            papers = " | ".join([paper[:100] for paper in professor["논문"][:3]])
-            parts.append(f"최근논문: {papers}")
-        
-        return " / ".join(parts)
-    
     def get_query_embedding(self, query: str) -> List[float]:
         """사용자 쿼리의 임베딩 벡터 생성"""
+        cached = self.embedding_cache.get(query)
+        if cached is not None:
+            return cached
         try:
             response = self.client.embeddings.create(
                 model=self.embedding_model,
                 input=query
             )
-            return response.data[0].embedding
+            embedding = response.data[0].embedding
+            self.embedding_cache.put(query, embedding)
+            return embedding
         except Exception as e:
             st.error(f"임베딩 생성 실패: {e}")
             return [0.0] * 1536
     
-    def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """코사인 유사도 계산"""
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        return float(dot_product / (norm1 * norm2))
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """여러 쿼리의 임베딩을 한 번의 API 호출로 생성 (캐시에 없는 쿼리만 요청)"""
+        embeddings = [self.embedding_cache.get(query) for query in queries]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+        try:
+            response = self.client.embeddings.create(
+                model=self.embedding_model,
+                input=[queries[i] for i in missing]
+            )
+            # 응답 순서가 입력 순서와 다를 수 있으므로 index 기준 정렬
+            new_embeddings = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            self.embedding_cache.put_many([queries[i] for i in missing], new_embeddings)
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+            return embeddings
+        except Exception as e:
+            st.error(f"임베딩 생성 실패: {e}")
+            return [[0.0] * 1536 for _ in queries]
     
-    def find_similar_professors(self, query: str, top_k: int = 5) -> List[Tuple[Dict, float]]:
+    def find_similar_professors(self, query: str, top_k: int = 5) -> List[Tuple[ProfessorRecord, float]]:
         """쿼리와 유사한 교수들 찾기"""
         if not self.client:
             st.error("OpenAI 클라이언트가 초기화되지 않았습니다.")
@@ -147,43 +141,57 @@ class LabRecommendationSystem:
         # 쿼리 임베딩
         query_embedding = self.get_query_embedding(query)
         
-        # 모든 교수와 유사도 계산
-        similarities = []
-        for i, prof_embedding in enumerate(self.professor_embeddings):
-            similarity = self.cosine_similarity(query_embedding, prof_embedding)
-            similarities.append((self.professors_data[i], similarity))
-        
-        # 유사도 순으로 정렬
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        return similarities[:top_k]
+        # 정규화 행렬과 한 번의 행렬곱으로 유사도 계산 후 상위 k개만 선택
+        matches = self.search_engine.search(query_embedding, top_k)
+        return [(self.professor_store[i], similarity) for i, similarity in matches]
     
-    def generate_recommendation_with_gpt(self, query: str, similar_professors: List[Tuple[Dict, float]]) -> str:
-        """GPT-4o-mini로 최종 추천 생성"""
+    def find_similar_professors_batch(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[ProfessorRecord, float]]]:
+        """여러 쿼리를 일괄 검색 (평가/벤치마크용)"""
         if not self.client:
-            return "OpenAI 클라이언트가 초기화되지 않았습니다."
+            st.error("OpenAI 클라이언트가 초기화되지 않았습니다.")
+            return [[] for _ in queries]
+        if not queries:
+            return []
         
-        # 상위 매칭된 교수들만 GPT에게 전송
-        top_professors = []
-        for prof, similarity in similar_professors:
-            prof_summary = {
-                "이름": prof["기본정보"]["교수이름"],
-                "연구실": prof["연구실"]["연구실명"],
-                "키워드": prof["연구분야"]["키워드"][:150],  # 토큰 절약
-                "연구주제": prof["연구주제"][:3],
-                "기술방법": prof["기술및방법"][:3],
-                "이메일": prof["기본정보"]["이메일"],
-                "논문수": len(prof["논문"]),
-                "유사도": f"{similarity:.3f}"
-            }
-            top_professors.append(prof_summary)
+        query_embeddings = self.get_query_embeddings(queries)
+        batch_matches = self.search_engine.search_batch(query_embeddings, top_k)
+        return [
+            [(self.professor_store[i], similarity) for i, similarity in matches]
+            for matches in batch_matches
+        ]
+    
+    @property
+    def prompt_snippets(self) -> List[str]:
+        """추천 프롬프트 요약 (처음 사용할 때 행별 목록 파일에서 로드, 없으면 레코드에서 한 번만 계산)"""
+        if self._prompt_snippets is None:
+            snippets = None
+            if self.embedding_header is not None:
+                snippets = load_embedding_row_field(DEFAULT_EMBEDDING_PATH, self.embedding_header, "prompt_snippets")
+            self._prompt_snippets = snippets if snippets is not None else self.build_prompt_snippets()
+        return self._prompt_snippets
+    
+    @prompt_snippets.setter
+    def prompt_snippets(self, snippets: List[str]):
+        self._prompt_snippets = snippets
+    
+    def build_prompt_snippets(self) -> List[str]:
+        """저장소 레코드에서 추천 프롬프트 요약 계산 (행별 목록에 요약이 없을 때)"""
+        return [EmbeddingGenerator.create_professor_prompt_snippet(record.to_dict()) for record in self.professor_store]
+    
+    def build_recommendation_messages(self, query: str, similar_professors: List[Tuple[ProfessorRecord, float]]) -> List[Dict[str, str]]:
+        """추천 생성용 채팅 메시지 구성"""
+        # 상위 매칭된 교수들만 GPT에게 전송 (미리 계산한 요약 + 유사도만 이어 붙임, 들여쓴 JSON보다 토큰 절약)
+        top_professors = "\n".join(
+            f"{rank}. {self.prompt_snippets[prof.index]} | 유사도: {similarity:.3f}"
+            for rank, (prof, similarity) in enumerate(similar_professors, 1)
+        )
         
         prompt = f"""## 서울대학교 의과대학 연구실 추천
 
 **학생 질문:** {query}
 
 **벡터 임베딩으로 매칭된 상위 교수진:**
-{json.dumps(top_professors, ensure_ascii=False, indent=2)}
+{top_professors}
 
 **요청사항:**
 위 학생의 질문을 바탕으로 가장 적합한 연구실을 순위별로 추천해주세요.
@@ -209,29 +217,65 @@ class LabRecommendationSystem:
 
 **💡 추가 조언:** [해당 분야 연구를 위한 실용적인 조언]"""
         
+        return [
+            {
+                "role": "system",
+                "content": "당신은 서울대학교 의과대학 연구실 추천 전문가입니다. 벡터 임베딩으로 매칭된 결과를 바탕으로 학생에게 최적의 연구실을 추천해주세요. 추천 이유는 구체적이고 실용적으로 작성해주세요."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def generate_recommendation_with_gpt(self, query: str, similar_professors: List[Tuple[ProfessorRecord, float]]) -> str:
+        """GPT-4o-mini로 최종 추천 생성"""
+        return "".join(self.stream_recommendation_with_gpt(query, similar_professors))
+    
+    def stream_recommendation_with_gpt(self, query: str, similar_professors: List[Tuple[ProfessorRecord, float]]) -> Iterator[str]:
+        """GPT-4o-mini 추천을 토큰이 생성되는 대로 반환 (스트리밍)"""
+        if not self.client:
+            yield "OpenAI 클라이언트가 초기화되지 않았습니다."
+            return
+        
         try:
-            response = self.client.chat.completions.create(
+            # 답변 캐시 키: 질문 임베딩 + 매칭된 교수 집합
+            query_embedding = self.get_query_embedding(query)
+            professor_ids = frozenset(prof.professor_id for prof, _ in similar_professors)
+            cached = self.answer_cache.get(query_embedding, "recommendation", professor_ids)
+            if cached:
+                yield cached.answer
+                return
+            
+            stream = self.client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "당신은 서울대학교 의과대학 연구실 추천 전문가입니다. 벡터 임베딩으로 매칭된 결과를 바탕으로 학생에게 최적의 연구실을 추천해주세요. 추천 이유는 구체적이고 실용적으로 작성해주세요."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self.build_recommendation_messages(query, similar_professors),
                 temperature=0.7,
-                max_tokens=1200
+                max_tokens=1200,
+                stream=True
             )
             
-            return response.choices[0].message.content
+            parts = []
+            for chunk in stream:
+                # Azure는 콘텐츠 필터 결과만 담긴 빈 choices 청크를 먼저 보낼 수 있음
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            
+            self.answer_cache.put(query_embedding, query, "recommendation", "".join(parts), professor_ids)
             
         except Exception as e:
-            return f"추천 생성 중 오류 발생: {str(e)}"
+            yield f"추천 생성 중 오류 발생: {str(e)}"
 
 def main():
+    # 페이지 설정 (모듈 import 시에는 호출하지 않아 벤치마크 등에서 LabRecommendationSystem 재사용 가능)
+    st.set_page_config(
+        page_title="🔬 서울대 의대 연구실 추천",
+        page_icon="🔬",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
     # 헤더
     st.title("🔬 서울대학교 의과대학 연구실 추천 시스템")
     st.markdown("**벡터 임베딩 + GPT-4o-mini 기반 맞춤형 연구실 추천**")
@@ -274,9 +318,21 @@ def main():
         
         st.markdown("---")
         st.markdown("### 📊 시스템 정보")
-        st.markdown(f"- **교수 수**: {len(recommender.professors_data)}명")
+        st.markdown(f"- **교수 수**: {len(recommender.professor_store)}명")
         st.markdown(f"- **임베딩 모델**: text-embedding-3-small")
         st.markdown(f"- **추천 모델**: GPT-4o-mini")
+
+        # 임베딩 캐시 통계 (캐시 크기 튜닝용)
+        cache_stats = recommender.embedding_cache.stats()
+        st.markdown("### 🗄️ 임베딩 캐시")
+        st.markdown(f"- **적중률**: {cache_stats['hit_rate']:.1%}")
+        st.markdown(f"- **메모리/디스크 적중**: {cache_stats['memory_hits']} / {cache_stats['disk_hits']}")
+        st.markdown(f"- **미스/제거**: {cache_stats['misses']} / {cache_stats['evictions']}")
+        
+        answer_stats = recommender.answer_cache.stats()
+        st.markdown("### ⚡ 답변 캐시")
+        st.markdown(f"- **적중률**: {answer_stats['hit_rate']:.1%} ({answer_stats['hits']}회)")
+        st.markdown(f"- **저장된 답변**: {answer_stats['entries']}개")
     
     # 메인 컨텐츠
     col1, col2 = st.columns([2, 3])
@@ -325,32 +381,29 @@ def main():
                 with st.spinner("🔍 벡터 유사도 계산 중..."):
                     # 벡터 매칭
                     similar_professors = recommender.find_similar_professors(user_query, top_k)
+                
+                if similar_professors:
+                    # 매칭 결과 미리보기
+                    st.markdown("### 🎯 벡터 매칭 결과")
+                    match_df_data = []
+                    for i, (prof, similarity) in enumerate(similar_professors, 1):
+                        match_df_data.append({
+                            "순위": i,
+                            "교수명": prof.name,
+                            "유사도": f"{similarity:.3f}",
+                            "연구분야": prof.keywords[:50] + "..." if len(prof.keywords) > 50 else prof.keywords
+                        })
+                    
+                    st.dataframe(match_df_data, use_container_width=True)
                     
-                    if similar_professors:
-                        # 매칭 결과 미리보기
-                        st.markdown("### 🎯 벡터 매칭 결과")
-                        match_df_data = []
-                        for i, (prof, similarity) in enumerate(similar_professors, 1):
-                            match_df_data.append({
-                                "순위": i,
-                                "교수명": prof["기본정보"]["교수이름"],
-                                "유사도": f"{similarity:.3f}",
-                                "연구분야": prof["연구분야"]["키워드"][:50] + "..." if len(prof["연구분야"]["키워드"]) > 50 else prof["연구분야"]["키워드"]
-                            })
-                        
-                        st.dataframe(match_df_data, use_container_width=True)
-                        
-                        # GPT 추천 생성
-                        if recommender.client:
-                            with st.spinner("🤖 GPT-4o-mini가 상세 추천 생성 중..."):
-                                recommendation = recommender.generate_recommendation_with_gpt(user_query, similar_professors)
-                                
-                                st.markdown("### 🎓 AI 추천 결과")
-                                st.markdown(recommendation)
-                        else:
-                            st.warning("OpenAI API가 설정되지 않아 벡터 매칭 결과만 표시됩니다.")
+                    # GPT 추천 생성 (토큰 스트리밍)
+                    if recommender.client:
+                        st.markdown("### 🎓 AI 추천 결과")
+                        st.write_stream(recommender.stream_recommendation_with_gpt(user_query, similar_professors))
                     else:
-                        st.error("매칭된 연구실을 찾을 수 없습니다.")
+                        st.warning("OpenAI API가 설정되지 않아 벡터 매칭 결과만 표시됩니다.")
+                else:
+                    st.error("매칭된 연구실을 찾을 수 없습니다.")
         
         elif recommend_button:
             st.warning("연구 관심분야를 입력해주세요.")
@@ -0,0 +1,297 @@
+"""
+합성 교수진 코퍼스 생성기 (규모 테스트용)
+실제 데이터 파일에서 필드별 길이/개수 분포와 텍스트 조각을 추출해, 같은 스키마의 교수 프로필을
+원하는 규모로 결정적으로 생성하고 가짜 서버와 같은 의사 임베딩(.npy 저장 포맷)을 함께 기록
+
+사용법:
+    python synthetic_corpus.py --count 10000 --output synthetic_10k.json
+    python synthetic_corpus.py --count 100000 --output synthetic_100k.json --embeddings synthetic_100k_embeddings.npy
+    python synthetic_corpus.py --count 1000 --output /tmp/s.json --stats    # 원본과 분포 비교
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from corpus_utils import professor_id, content_hash
+
+# 스키마 (교수 프로필 최상위 키 → 하위 문자열 필드 또는 리스트)
+DICT_FIELDS = {
+    "기본정보": ["교수이름", "영문이름", "학위", "직급", "대학명", "학과명", "이메일", "전화번호"],
+    "연구실": ["연구실명", "연구실웹사이트", "위치"],
+    "연구분야": ["키워드", "설명"],
+    "학생지도": ["특징", "진로"],
+}
+LIST_FIELDS = ["연구주제", "기술및방법", "학력경력", "논문"]
+# 그대로 표본 추출하는 범주형 필드 (나머지 텍스트 필드는 조각을 조합해 길이 분포를 맞춤)
+CATEGORICAL_FIELDS = ["기본정보.영문이름", "기본정보.학위", "기본정보.직급", "기본정보.대학명", "기본정보.학과명",
+                      "연구실.연구실웹사이트", "연구실.위치", "학생지도.특징", "학생지도.진로"]
+PAPER_NUMBER = re.compile(r"^\s*\d+\.\s*")
+CLAUSE_SPLIT = re.compile(r"[,.]\s*")
+
+
+@dataclass
+class CorpusProfile:
+    """실제 코퍼스에서 추출한 필드별 분포와 텍스트 조각"""
+    lengths: Dict[str, List[int]] = field(default_factory=dict)        # 텍스트 필드 글자 수
+    counts: Dict[str, List[int]] = field(default_factory=dict)         # 리스트 필드 항목 수
+    categorical: Dict[str, List[str]] = field(default_factory=dict)    # 범주형 필드 값
+    fragments: List[Dict[str, List[str]]] = field(default_factory=list)  # 교수별 텍스트 조각 (주제 일관성용)
+    pooled: Dict[str, List[str]] = field(default_factory=dict)         # 전체 텍스트 조각
+    surnames: List[str] = field(default_factory=list)
+    given_syllables: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_professors(cls, professors: List[Dict[str, Any]]) -> "CorpusProfile":
+        profile = cls()
+        for professor in professors:
+            name = professor["기본정보"]["교수이름"]
+            if len(name) >= 2:
+                profile.surnames.append(name[0])
+                profile.given_syllables.extend(name[1:])
+
+            for key in CATEGORICAL_FIELDS:
+                section, sub = key.split(".")
+                profile.categorical.setdefault(key, []).append(professor[section][sub])
+
+            for key in ("연구실.연구실명", "연구분야.키워드", "연구분야.설명"):
+                section, sub = key.split(".")
+                profile.lengths.setdefault(key, []).append(len(professor[section][sub]))
+            for key in LIST_FIELDS:
+                profile.counts.setdefault(key, []).append(len(professor[key]))
+
+            keywords = [term.strip() for term in professor["연구분야"]["키워드"].split(",") if term.strip()]
+            fragments = {
+                "키워드": keywords,
+                "설명": [clause for clause in CLAUSE_SPLIT.split(professor["연구분야"]["설명"]) if clause],
+                "연구실명": keywords + [topic[:20] for topic in professor["연구주제"]],
+                "연구주제": list(professor["연구주제"]),
+                "기술및방법": list(professor["기술및방법"]),
+                "학력경력": list(professor["학력경력"]),
+                "논문": [PAPER_NUMBER.sub("", paper) for paper in professor["논문"]],
+            }
+            profile.fragments.append(fragments)
+            for key, values in fragments.items():
+                profile.pooled.setdefault(key, []).extend(values)
+        return profile
+
+
+class SyntheticCorpusGenerator:
+    """실제 교수 한 명을 주제 템플릿으로 삼아(coherence 확률로 템플릿 조각, 나머지는 전체 조각)
+    원본 분포와 같은 길이/개수의 프로필을 생성. index별 난수로 만들어 순서/병렬과 무관하게 결정적이다.
+    """
+
+    def __init__(self, source_professors: List[Dict[str, Any]], seed: int = 0, coherence: float = 0.7,
+                 include_source: bool = True):
+        self.source = source_professors
+        self.profile = CorpusProfile.from_professors(source_professors)
+        self.seed = seed
+        self.coherence = coherence
+        self.include_source = include_source
+
+    def pick_fragment(self, rng: random.Random, template: Dict[str, List[str]], key: str) -> Optional[str]:
+        """템플릿 교수의 조각을 우선 사용하고, 없으면 전체 조각에서 선택"""
+        pool = template.get(key) if rng.random() < self.coherence else None
+        pool = pool or self.profile.pooled.get(key)
+        return rng.choice(pool) if pool else None
+
+    def compose(self, rng: random.Random, template: Dict[str, List[str]], key: str, length: int,
+                separator: str) -> str:
+        """목표 글자 수에 도달할 때까지 조각을 이어 붙인 뒤 길이에 맞춰 자름"""
+        if length <= 0:
+            return ""
+        parts, total = [], 0
+        while total < length:
+            fragment = self.pick_fragment(rng, template, key)
+            if not fragment:
+                break
+            parts.append(fragment)
+            total += len(fragment) + len(separator)
+        return separator.join(parts)[:length].rstrip(" ,")
+
+    def professor(self, index: int) -> Dict[str, Any]:
+        """index번째 합성 교수 (include_source면 앞쪽은 원본 교수 그대로)"""
+        if self.include_source and index < len(self.source):
+            return self.source[index]
+
+        rng = random.Random(f"{self.seed}:{index}")
+        profile = self.profile
+        template = profile.fragments[rng.randrange(len(profile.fragments))]
+
+        def categorical(key: str) -> str:
+            return rng.choice(profile.categorical[key])
+
+        name = rng.choice(profile.surnames) + "".join(rng.choices(profile.given_syllables, k=2))
+        items = {}
+        for key in LIST_FIELDS:
+            picked = (self.pick_fragment(rng, template, key) for _ in range(rng.choice(profile.counts[key])))
+            items[key] = [item for item in picked if item]
+        items["논문"] = [f"{i}. {paper}" for i, paper in enumerate(items["논문"], 1)]
+
+        return {
+            "기본정보": {
+                "교수이름": name,
+                "영문이름": categorical("기본정보.영문이름"),
+                "학위": categorical("기본정보.학위"),
+                "직급": categorical("기본정보.직급"),
+                "대학명": categorical("기본정보.대학명"),
+                "학과명": categorical("기본정보.학과명"),
+                "이메일": f"prof{index:07d}@synthetic.example.ac.kr",
+                "전화번호": f"02-{rng.randint(2000, 2999)}-{rng.randint(1000, 9999)}",
+            },
+            "연구실": {
+                "연구실명": self.compose(rng, template, "연구실명", rng.choice(profile.lengths["연구실.연구실명"]), " 및 "),
+                "연구실웹사이트": categorical("연구실.연구실웹사이트"),
+                "위치": categorical("연구실.위치"),
+            },
+            "연구분야": {
+                "키워드": self.compose(rng, template, "키워드", rng.choice(profile.lengths["연구분야.키워드"]), ", "),
+                "설명": self.compose(rng, template, "설명", rng.choice(profile.lengths["연구분야.설명"]), ", "),
+            },
+            **items,
+            "학생지도": {
+                "특징": categorical("학생지도.특징"),
+                "진로": categorical("학생지도.진로"),
+            },
+        }
+
+    def generate(self, count: int) -> Iterator[Dict[str, Any]]:
+        for index in range(count):
+            yield self.professor(index)
+
+
+def validate_professor(professor: Dict[str, Any]) -> List[str]:
+    """스키마 검사 (누락 키 / 잘못된 타입 목록, 비어 있으면 정상)"""
+    problems = []
+    for section, keys in DICT_FIELDS.items():
+        if not isinstance(professor.get(section), dict):
+            problems.append(f"{section}: dict 아님")
+            continue
+        problems.extend(f"{section}.{key}: 문자열 아님" for key in keys
+                        if not isinstance(professor[section].get(key), str))
+    problems.extend(f"{key}: 리스트 아님" for key in LIST_FIELDS if not isinstance(professor.get(key), list))
+    return problems
+
+
+def write_corpus(path: str, professors: Iterator[Dict[str, Any]], metadata: Dict[str, Any],
+                 usage: Dict[str, Any] = None, on_professor=None) -> int:
+    """교수 목록을 한 명씩 직렬화해 데이터 파일 형식({"메타데이터", "사용법", "교수진"})으로 저장
+
+    전체 목록을 메모리에 두지 않으므로 메타데이터의 개수 필드는 호출 측에서 미리 채운다.
+    on_professor(index, professor)가 있으면 각 교수를 기록한 직후 호출한다.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"메타데이터": ' + json.dumps(metadata, ensure_ascii=False))
+        f.write(', "사용법": ' + json.dumps(usage or {}, ensure_ascii=False))
+        f.write(', "교수진": [\n')
+        for professor in professors:
+            if count:
+                f.write(",\n")
+            f.write(json.dumps(professor, ensure_ascii=False))
+            if on_professor:
+                on_professor(count, professor)
+            count += 1
+        f.write("\n]}\n")
+    return count
+
+
+def field_statistics(professors: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """필드별 평균/중앙값 길이(리스트는 항목 수)와 빈 값 비율"""
+    stats = {}
+    for key in ("연구실.연구실명", "연구분야.키워드", "연구분야.설명", *LIST_FIELDS):
+        if "." in key:
+            section, sub = key.split(".")
+            values = [len(professor[section][sub]) for professor in professors]
+        else:
+            values = [len(professor[key]) for professor in professors]
+        stats[key] = {
+            "mean": round(float(np.mean(values)), 1),
+            "median": float(np.median(values)),
+            "empty_rate": round(sum(1 for value in values if value == 0) / len(values), 3),
+        }
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='합성 교수진 코퍼스 생성기')
+    parser.add_argument('--source', default='professors_final_complete.json', help='분포를 추출할 원본 데이터')
+    parser.add_argument('--count', type=int, required=True, help='생성할 교수 수 (원본 포함)')
+    parser.add_argument('--output', required=True, help='출력 데이터 JSON 경로')
+    parser.add_argument('--embeddings', default=None, help='의사 임베딩 행렬(.npy) 경로 (헤더는 같은 이름의 .json)')
+    parser.add_argument('--dimension', type=int, default=1536, help='의사 임베딩 차원')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--coherence', type=float, default=0.7, help='템플릿 교수 조각을 사용할 확률')
+    parser.add_argument('--no-source', action='store_true', help='원본 교수를 포함하지 않고 전부 합성')
+    parser.add_argument('--stats', action='store_true', help='원본과 합성 코퍼스의 필드 분포 비교 출력')
+    args = parser.parse_args()
+
+    if args.embeddings:
+        from embedding_store import header_path_for
+        if os.path.abspath(header_path_for(args.embeddings)) == os.path.abspath(args.output):
+            parser.error("임베딩 헤더(.json)가 코퍼스 출력 파일과 같은 경로입니다. 다른 이름을 사용하세요.")
+
+    with open(args.source, "r", encoding="utf-8") as f:
+        source_data = json.load(f)
+    generator = SyntheticCorpusGenerator(source_data["교수진"], seed=args.seed, coherence=args.coherence,
+                                         include_source=not args.no_source)
+
+    # 논문 수/완성도 통계는 합성 코퍼스에 맞지 않으므로 제외
+    metadata = {key: value for key, value in source_data.get("메타데이터", {}).items()
+                if key not in ("총_논문_수", "완전한_논문_수", "논문_완성도")}
+    metadata.update({"버전": "synthetic", "총_교수_수": args.count, "합성_원본": args.source, "합성_시드": args.seed})
+
+    # 의사 임베딩은 memmap 행렬에 한 행씩 기록 (가짜 서버/벤치마크와 같은 fake_embedding)
+    matrix, ids, hashes, snippets = None, [], [], []
+    if args.embeddings:
+        from embedding_store import write_embedding_header
+        from fake_openai_server import fake_embedding
+        from generate_embeddings import EmbeddingGenerator
+
+        matrix = np.lib.format.open_memmap(args.embeddings, mode="w+", dtype=np.float32,
+                                           shape=(args.count, args.dimension))
+
+    samples: List[Dict[str, Any]] = []
+
+    def on_professor(index: int, professor: Dict[str, Any]):
+        if matrix is not None:
+            text = EmbeddingGenerator.create_professor_text_for_embedding(professor)
+            matrix[index] = fake_embedding(text, args.dimension)
+            ids.append(professor_id(professor))
+            hashes.append(content_hash(text))
+            snippets.append(EmbeddingGenerator.create_professor_prompt_snippet(professor))
+        if args.stats and len(samples) < 10000:
+            samples.append(professor)
+        if (index + 1) % 10000 == 0:
+            print(f"   {index + 1}/{args.count}명 생성")
+
+    count = write_corpus(args.output, generator.generate(args.count), metadata,
+                         source_data.get("사용법"), on_professor)
+    print(f"💾 합성 코퍼스 저장: {args.output} ({count}명)")
+
+    if matrix is not None:
+        matrix.flush()
+        del matrix
+        write_embedding_header(args.embeddings, "fake-embedding", args.dimension, ids, hashes,
+                               extra={"synthetic": True, "seed": args.seed}, rows={"prompt_snippets": snippets})
+        print(f"💾 의사 임베딩 저장: {args.embeddings} ({count}개 x {args.dimension}차원)")
+
+    if args.stats:
+        problems = [problem for professor in samples for problem in validate_professor(professor)]
+        print(f"🔎 스키마 검사: {'정상' if not problems else f'{len(problems)}건 오류'}")
+        source_stats = field_statistics(source_data["교수진"])
+        synthetic_stats = field_statistics(samples)
+        print(f"{'필드':<12} {'원본 평균/빈값':>16} {'합성 평균/빈값':>16}")
+        for key, stats in source_stats.items():
+            other = synthetic_stats[key]
+            print(f"{key:<12} {stats['mean']:>9} / {stats['empty_rate']:<5} {other['mean']:>9} / {other['empty_rate']:<5}")
+
+
+if __name__ == "__main__":
+    main()
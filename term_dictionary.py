@@ -0,0 +1,239 @@
+"""
+한→영 연구 용어 사전
+교수 데이터(연구분야 키워드 / 기술및방법 / 연구주제 / 논문)에서 오프라인으로 추출한 한국어 용어와
+영어 대역어를 JSON으로 저장해 두고, 질문 확장 시 LLM 호출 없이 최장 일치로 영어 키워드를 붙인다.
+
+사용법:
+    python term_dictionary.py --data professors_final_complete.json            # 기본 사전 + 괄호 병기 추출
+    python term_dictionary.py --data professors_final_complete.json --translate  # 남은 용어를 LLM으로 일괄 번역
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_DICTIONARY_PATH = os.getenv("TERM_DICTIONARY_PATH", "term_dictionary.json")
+
+# 데이터 분야(의생명과학)에서 자주 쓰이는 기본 용어 (추출 결과가 없어도 바로 사용)
+SEED_TERMS: Dict[str, str] = {
+    "인공지능": "artificial intelligence AI", "머신러닝": "machine learning", "기계학습": "machine learning",
+    "딥러닝": "deep learning", "심층학습": "deep learning", "빅데이터": "big data", "데이터": "data",
+    "데이터과학": "data science", "생물정보학": "bioinformatics", "시뮬레이션": "simulation",
+    "바이오": "bio biology", "생명과학": "life science biology", "의료": "medical healthcare",
+    "의학": "medicine", "임상": "clinical", "분자": "molecular", "세포": "cell", "단일세포": "single-cell",
+    "유전": "genetic", "유전자": "gene", "유전체": "genome genomics", "후성유전": "epigenetics",
+    "전사체": "transcriptome transcriptomics", "단백질": "protein", "단백체": "proteome proteomics",
+    "대사체": "metabolome metabolomics", "대사": "metabolism", "에너지대사": "energy metabolism",
+    "다중오믹스": "multiomics", "오믹스": "omics", "면역": "immune immunology", "면역치료": "immunotherapy",
+    "면역관문": "immune checkpoint", "항암": "anticancer", "암": "cancer", "종양": "tumor oncology",
+    "종양미세환경": "tumor microenvironment", "전이": "metastasis", "항암제": "anticancer drug",
+    "내성": "resistance", "약물": "drug", "약물스크리닝": "drug screening", "신약": "drug discovery",
+    "약리": "pharmacology", "약물역학": "pharmacoepidemiology", "역학": "epidemiology",
+    "치료": "therapy treatment", "진단": "diagnosis", "영상": "imaging", "의료영상": "medical imaging",
+    "분자영상": "molecular imaging", "핵의학": "nuclear medicine", "방사성의약품": "radiopharmaceutical",
+    "방사성": "radioactive", "핵종": "radionuclide", "방사선": "radiation", "나노입자": "nanoparticle",
+    "나노": "nano", "표적": "targeted", "광학영상": "optical imaging", "자기공명": "magnetic resonance MRI",
+    "신경": "neuro neural", "신경과학": "neuroscience", "뇌": "brain", "뇌중추": "central nervous system",
+    "신경회로": "neural circuit", "신경인터페이스": "neural interface", "생체신호": "biosignal",
+    "근전도": "electromyography EMG", "뇌파": "electroencephalography EEG", "전자": "electronics",
+    "줄기세포": "stem cell", "조혈": "hematopoietic", "분화": "differentiation", "오가노이드": "organoid",
+    "세포주": "cell line", "배양": "culture", "이식": "transplantation", "거부반응": "rejection",
+    "이식거부반응": "transplant rejection", "감염": "infection", "미생물": "microbiology microbe",
+    "미생물군집": "microbiota microbiome", "바이러스": "virus", "세균": "bacteria", "기생충": "parasite",
+    "염증": "inflammation", "염증조절복합체": "inflammasome", "대식세포": "macrophage", "T세포": "T cell",
+    "B세포": "B cell", "항체": "antibody", "백신": "vaccine", "알레르기": "allergy", "아토피": "atopic",
+    "피부": "skin dermatology", "노화": "aging", "심장": "heart cardiac", "심혈관": "cardiovascular",
+    "부정맥": "arrhythmia", "폐": "lung pulmonary", "폐동맥고혈압": "pulmonary arterial hypertension",
+    "고혈압": "hypertension", "이온통로": "ion channel", "간질환": "liver disease hepatic", "신장": "kidney renal",
+    "당뇨": "diabetes", "비만": "obesity", "근육": "muscle", "뼈": "bone", "혈액": "blood hematology",
+    "유방암": "breast cancer", "폐암": "lung cancer", "간암": "liver cancer", "대장암": "colorectal cancer",
+    "위암": "gastric cancer", "췌장암": "pancreatic cancer", "뇌종양": "brain tumor",
+    "유전자편집": "gene editing CRISPR", "유전자발현": "gene expression", "돌연변이": "mutation",
+    "동물모델": "animal model", "마우스": "mouse", "생쥐": "mouse", "생체": "in vivo",
+    "바이오뱅킹": "biobanking", "바이오마커": "biomarker", "정밀의료": "precision medicine",
+    "맞춤치료": "personalized therapy", "역분화": "induced pluripotent iPSC", "엑소좀": "exosome",
+    "시퀀싱": "sequencing", "서열분석": "sequencing", "질량분석": "mass spectrometry",
+    "현미경": "microscopy", "공초점": "confocal", "유세포분석": "flow cytometry",
+    "웨스턴블롯": "western blot", "중합효소연쇄반응": "PCR", "클로닝": "cloning", "구조생물학": "structural biology",
+    "계산": "computational", "통계": "statistics", "보건": "public health", "예방의학": "preventive medicine",
+}
+
+# 확장 커버리지 계산에서 제외하는 질문 상투어 (어간 기준 접두어 매칭)
+STOPWORD_STEMS = (
+    "연구", "교수", "추천", "관심", "분야", "알려", "소개", "찾고", "찾아", "하고", "하는", "있는", "있어",
+    "싶", "해주", "대해", "관련", "어떤", "무엇", "누구", "어디", "정보", "실험실", "랩", "학생", "대학원",
+    "진학", "공부", "배우", "좀", "그", "이", "저", "제가", "저는", "요즘", "주로", "분", "곳",
+)
+
+# 용어 뒤에 붙는 조사/어미 (사전 추출 시 제거)
+PARTICLE_SUFFIXES = ("으로", "에서", "에게", "과의", "와의", "을", "를", "의", "과", "와", "은", "는", "이", "가", "에", "로", "및")
+
+HANGUL_WORD = re.compile(r"[가-힣A-Za-z0-9]*[가-힣][가-힣A-Za-z0-9]*")
+PAREN_PAIR = re.compile(r"([가-힣]{2,})\s*\(([A-Za-z][A-Za-z0-9 \-/]{1,40})\)")
+
+
+def strip_particle(word: str) -> str:
+    """용어 끝의 조사 제거"""
+    for suffix in PARTICLE_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+            return word[:-len(suffix)]
+    return word
+
+
+class TermDictionary:
+    """최장 일치 기반 한→영 용어 사전"""
+
+    def __init__(self, terms: Dict[str, str] = None):
+        self.terms: Dict[str, str] = {}
+        self.max_length = 1
+        self.update(SEED_TERMS if terms is None else terms)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_DICTIONARY_PATH) -> "TermDictionary":
+        """기본 용어 + 오프라인 추출 사전(JSON, 있으면) 로드"""
+        dictionary = cls()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                dictionary.update(json.load(f)["terms"])
+        return dictionary
+
+    def save(self, path: str, source: str = None):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"source": source, "count": len(self.terms), "terms": self.terms},
+                      f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def update(self, terms: Dict[str, str]):
+        for korean, english in terms.items():
+            key = korean.replace(" ", "")
+            if key and english:
+                self.terms[key] = english
+                self.max_length = max(self.max_length, len(key))
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def match_word(self, word: str) -> List[str]:
+        """한 어절 안에서 왼쪽부터 최장 일치하는 용어의 영어 대역어 목록"""
+        matches = []
+        i = 0
+        while i < len(word):
+            for length in range(min(self.max_length, len(word) - i), 0, -1):
+                english = self.terms.get(word[i:i + length])
+                if english:
+                    matches.append(english)
+                    i += length
+                    break
+            else:
+                i += 1
+        return matches
+
+    def expand(self, query: str) -> Tuple[List[str], float]:
+        """질문의 영어 키워드 목록과 내용어 커버리지(0~1) 반환"""
+        keywords: List[str] = []
+        content_words = covered = 0
+
+        for word in HANGUL_WORD.findall(query):
+            matches = self.match_word(word)
+            if not matches and word.startswith(STOPWORD_STEMS):
+                continue
+            content_words += 1
+            if matches:
+                covered += 1
+                keywords.extend(english for english in matches if english not in keywords)
+
+        coverage = covered / content_words if content_words else 1.0
+        return keywords, coverage
+
+
+def extract_candidate_terms(professors: Iterable[Dict]) -> Counter:
+    """연구분야 키워드 / 기술및방법 / 연구주제에서 한국어 용어 후보와 빈도 추출"""
+    candidates = Counter()
+    for professor in professors:
+        texts = [professor['연구분야']['키워드']] + professor['기술및방법'] + professor['연구주제']
+        for text in texts:
+            for phrase in re.split(r"[,/·\n()]|\s및\s", text or ""):
+                for word in HANGUL_WORD.findall(phrase):
+                    word = strip_particle(word)
+                    if 2 <= len(word) <= 12 and not word.startswith(STOPWORD_STEMS):
+                        candidates[word] += 1
+    return candidates
+
+
+def extract_parenthesized_pairs(professors: Iterable[Dict]) -> Dict[str, str]:
+    """'미생물군집(microbiota)'처럼 본문에 영어가 병기된 용어 쌍 추출"""
+    pairs = {}
+    for professor in professors:
+        texts = ([professor['연구분야']['키워드'], professor['연구분야']['설명']]
+                 + professor['기술및방법'] + professor['연구주제'] + professor['논문'])
+        for text in texts:
+            for korean, english in PAREN_PAIR.findall(text or ""):
+                pairs[strip_particle(korean)] = english.strip()
+    return pairs
+
+
+def translate_terms(terms: List[str], batch_size: int = 40) -> Dict[str, str]:
+    """사전에 없는 용어를 LLM으로 일괄 번역 (오프라인 1회성 작업)"""
+    from dotenv import load_dotenv
+    from langchain_openai import AzureChatOpenAI
+
+    load_dotenv()
+    llm = AzureChatOpenAI(
+        model="gpt-4o-mini",
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_key=os.getenv("OPENAI_API_KEY"),
+        api_version=os.getenv("OPENAI_API_VERSION"),
+        temperature=0
+    )
+
+    translations = {}
+    for start in range(0, len(terms), batch_size):
+        batch = terms[start:start + batch_size]
+        prompt = ("다음 한국어 의생명과학 연구 용어를 논문에서 쓰는 영어 용어로 번역해주세요.\n"
+                  "각 줄을 '한국어 => English' 형식으로만 출력하세요.\n\n" + "\n".join(batch))
+        try:
+            response = llm.invoke(prompt)
+        except Exception as e:
+            print(f"⚠️ 번역 실패 ({start}~{start + len(batch)}): {e}")
+            continue
+        for line in response.content.splitlines():
+            if "=>" in line:
+                korean, english = (part.strip() for part in line.split("=>", 1))
+                if korean in batch and english:
+                    translations[korean] = english
+        print(f"  번역 진행: {min(start + batch_size, len(terms))}/{len(terms)}")
+    return translations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='교수 데이터에서 한→영 연구 용어 사전 생성')
+    parser.add_argument('--data', default='professors_final_complete.json', help='교수 데이터 JSON 경로')
+    parser.add_argument('--output', default=DEFAULT_DICTIONARY_PATH, help='사전 JSON 경로')
+    parser.add_argument('--translate', action='store_true',
+                        help='사전으로 커버되지 않는 용어를 LLM으로 일괄 번역')
+    parser.add_argument('--min-count', type=int, default=1, help='번역 대상 용어의 최소 출현 빈도')
+    args = parser.parse_args()
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        professors = json.load(f)['교수진']
+
+    dictionary = TermDictionary()
+    pairs = extract_parenthesized_pairs(professors)
+    dictionary.update(pairs)
+
+    candidates = extract_candidate_terms(professors)
+    uncovered = [term for term, count in candidates.most_common()
+                 if count >= args.min_count and not dictionary.match_word(term)]
+    print(f"📚 용어 후보 {len(candidates)}개, 병기 쌍 {len(pairs)}개, 미등록 {len(uncovered)}개")
+
+    if args.translate and uncovered:
+        dictionary.update(translate_terms(uncovered))
+
+    dictionary.save(args.output, source=args.data)
+    print(f"💾 사전 저장: {args.output} ({len(dictionary)}개 용어)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+의미 기반 답변 캐시 테스트 (유사도 임계값 / TTL / LRU / 버전 무효화)
+"""
+import answer_cache
+from answer_cache import SemanticAnswerCache
+from langchain_core.documents import Document
+
+PIDS = frozenset({"p1", "p2"})
+
+
+def test_hit_requires_similarity_type_and_professor_ids():
+    cache = SemanticAnswerCache(threshold=0.9)
+    cache.put([1.0, 0.0], "딥러닝 교수", "new_search", "답변", PIDS)
+
+    hit = cache.get([0.99, 0.05], "new_search", PIDS)
+    assert hit is not None and hit.answer == "답변" and hit.query == "딥러닝 교수"
+    assert cache.get([0.0, 1.0], "new_search", PIDS) is None
+    assert cache.get([1.0, 0.0], "professor_detail", PIDS) is None
+    assert cache.get([1.0, 0.0], "new_search", frozenset({"p1"})) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "time", lambda: now[0])
+    cache = SemanticAnswerCache(ttl_seconds=60)
+    cache.put([1.0, 0.0], "q", "new_search", "답변", PIDS)
+
+    now[0] += 59
+    assert cache.get([1.0, 0.0], "new_search", PIDS) is not None
+    now[0] += 2
+    assert cache.get([1.0, 0.0], "new_search", PIDS) is None
+    assert cache.counters["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticAnswerCache(max_entries=2)
+    cache.put([1.0, 0.0, 0.0], "a", "new_search", "A")
+    cache.put([0.0, 1.0, 0.0], "b", "new_search", "B")
+    # a를 다시 사용하면 가장 오래 사용되지 않은 항목은 b
+    assert cache.get([1.0, 0.0, 0.0], "new_search") is not None
+    cache.put([0.0, 0.0, 1.0], "c", "new_search", "C")
+
+    assert cache.counters["evictions"] == 1
+    assert cache.get([0.0, 1.0, 0.0], "new_search") is None
+    assert cache.get([1.0, 0.0, 0.0], "new_search").answer == "A"
+    assert cache.get([0.0, 0.0, 1.0], "new_search").answer == "C"
+
+
+def test_version_change_invalidates_all_entries():
+    cache = SemanticAnswerCache()
+    cache.set_version("v1")
+    cache.put([1.0, 0.0], "q", "new_search", "답변")
+
+    cache.set_version("v1")
+    assert len(cache) == 1
+    cache.set_version("v2")
+    assert len(cache) == 0
+    assert cache.counters["invalidations"] == 1
+    assert cache.get([1.0, 0.0], "new_search") is None
+
+
+def test_dimension_change_resets_matrix():
+    cache = SemanticAnswerCache()
+    cache.put([1.0, 0.0], "q", "new_search", "답변")
+    assert cache.get([1.0, 0.0, 0.0], "new_search") is None
+
+    cache.put([1.0, 0.0, 0.0], "q", "new_search", "새 답변")
+    assert len(cache) == 1
+    assert cache.get([1.0, 0.0, 0.0], "new_search").answer == "새 답변"
+
+
+def test_professor_ids_of_documents():
+    documents = [
+        Document(page_content="", metadata={"professor_id": "p1"}),
+        Document(page_content="", metadata={"professor_id": "p1"}),
+        Document(page_content="", metadata={}),
+    ]
+    assert SemanticAnswerCache.professor_ids_of(documents) == frozenset({"p1"})
+    assert SemanticAnswerCache.professor_ids_of(None) == frozenset()
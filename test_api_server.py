@@ -0,0 +1,207 @@
+"""
+API 서버 동시성 테스트 (마이크로 배치 / 세션 LRU·만료 / 세션별 직렬 처리)
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.documents import Document
+
+import api_server
+from api_server import MicroBatcher, RecommendationService, SessionStore
+from rag_lab_recommender import LabRecommenderRAG
+
+
+class RecordingEmbeddings:
+    """embed_documents 호출마다 입력 텍스트 목록을 기록"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding failed")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class RecordingRetriever:
+    """쿼리 행렬 검색 호출을 기록하고 (벡터, 어휘 쿼리)를 그대로 담은 문서 반환"""
+
+    def __init__(self):
+        self.calls = []
+
+    def search_by_vectors(self, vectors, texts, filters):
+        self.calls.append(list(texts))
+        return [[Document(page_content=text, metadata={"professor_id": text, "vector": vector})]
+                for vector, text in zip(vectors, texts)]
+
+
+def test_concurrent_submissions_share_one_embedding_call():
+    embeddings, retriever = RecordingEmbeddings(), RecordingRetriever()
+    batcher = MicroBatcher(embeddings, max_batch=8, max_wait_ms=300)
+    queries = ["면역", "딥러닝", "면역", "오가노이드", "뇌영상"]
+
+    with ThreadPoolExecutor(len(queries)) as pool:
+        results = list(pool.map(lambda query: batcher.search(query, query + " en", retriever), queries))
+
+    assert len(embeddings.calls) == 1
+    assert sorted(embeddings.calls[0]) == sorted(set(queries))
+    assert len(retriever.calls) == 1
+    assert [docs[0].page_content for docs in results] == [query + " en" for query in queries]
+    assert [docs[0].metadata["vector"][0] for docs in results] == [float(len(query)) for query in queries]
+    assert batcher.stats == {"requests": 5, "batches": 1, "max_batch_seen": 5}
+
+
+def test_batches_are_grouped_by_retriever_and_capped():
+    embeddings = RecordingEmbeddings()
+    brief, detail = RecordingRetriever(), RecordingRetriever()
+    batcher = MicroBatcher(embeddings, max_batch=3, max_wait_ms=300)
+
+    futures = [batcher.submit(f"q{i}", f"q{i}", brief if i % 2 else detail) for i in range(4)]
+    assert [future.result(timeout=5)[0].page_content for future in futures] == ["q0", "q1", "q2", "q3"]
+
+    assert [len(texts) for texts in embeddings.calls] == [3, 1]
+    assert sorted(map(sorted, brief.calls + detail.calls)) == [["q0", "q2"], ["q1"], ["q3"]]
+
+
+def test_batch_failure_is_raised_to_every_request():
+    batcher = MicroBatcher(RecordingEmbeddings(fail=True), max_wait_ms=50)
+    futures = [batcher.submit(f"q{i}", f"q{i}", RecordingRetriever()) for i in range(3)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(api_server.time, "time", lambda: now[0])
+    return now
+
+
+def test_sessions_expire_after_ttl(clock):
+    sessions = SessionStore(ttl_seconds=60)
+    session_id, history = sessions.get(None)
+    other_id, _ = sessions.get("other")
+
+    clock[0] += 30
+    assert sessions.get(session_id)[1] is history
+
+    # other는 60초 넘게 사용되지 않아 다른 세션에 접근할 때 함께 제거
+    clock[0] += 40
+    sessions.get(session_id)
+    assert len(sessions) == 1
+
+    clock[0] += 61
+    assert sessions.get(session_id)[1] is not history
+    assert sessions.get(other_id)[1] is not None and len(sessions) == 2
+
+
+def test_least_recently_used_session_is_evicted(clock):
+    sessions = SessionStore(max_sessions=2)
+    _, first = sessions.get("a")
+    _, second = sessions.get("b")
+    sessions.get("a")
+    sessions.get("c")
+
+    assert len(sessions) == 2
+    assert sessions.get("a")[1] is first
+    assert sessions.get("b")[1] is not second
+
+
+def test_same_session_is_locked_and_other_sessions_are_not():
+    sessions = SessionStore()
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        with sessions.acquire("a"):
+            entered.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    entered.wait(5)
+
+    def enter(session_id):
+        with sessions.acquire(session_id) as (session_id, _):
+            return session_id
+
+    with ThreadPoolExecutor(1) as pool:
+        same = pool.submit(enter, "a")
+        with sessions.acquire("b"):
+            pass
+        time.sleep(0.05)
+        assert not same.done()
+        release.set()
+        assert same.result(timeout=5) == "a"
+    holder.join()
+
+
+class StubRAG:
+    """RecommendationService.handle이 사용하는 LabRecommenderRAG 인터페이스의 최소 구현"""
+
+    needs_retrieval = staticmethod(LabRecommenderRAG.needs_retrieval)
+
+    def __init__(self):
+        self.embeddings = RecordingEmbeddings()
+        self.retriever = RecordingRetriever()
+        self.detail_retriever = RecordingRetriever()
+        self.classified = []
+        self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def classify_query(self, query, history):
+        self.classified.append(query)
+        return {"type": "new_search"}
+
+    def named_professors(self, query_type, query):
+        return None
+
+    def enhance_query_with_translation(self, query):
+        return query
+
+    def professor_filter(self, query):
+        return None
+
+    def prepare_strategy(self, query_type, query, enhanced_query, docs, history, named_pids):
+        return f"{len(history.queries)}|{query}", docs or []
+
+    def generate_answer(self, query, query_type, prompt, docs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return prompt
+
+
+def test_requests_in_one_session_run_one_at_a_time():
+    rag = StubRAG()
+    service = RecommendationService(rag, max_wait_ms=1)
+    session_id = service.handle("시작")["session_id"]
+
+    with ThreadPoolExecutor(4) as pool:
+        answers = list(pool.map(lambda i: service.handle(f"질문 {i}", session_id=session_id)["answer"], range(4)))
+
+    assert rag.peak == 1
+    # 각 요청은 앞선 요청이 히스토리에 기록된 뒤 처리됨
+    assert sorted(int(answer.split("|")[0]) for answer in answers) == [1, 2, 3, 4]
+    assert len(service.sessions.get(session_id)[1].queries) == 5
+
+
+def test_requests_across_sessions_are_batched_and_typed_endpoints_skip_classification():
+    rag = StubRAG()
+    service = RecommendationService(rag, max_wait_ms=300)
+
+    with ThreadPoolExecutor(3) as pool:
+        responses = list(pool.map(lambda query: service.handle(query, "new_search"), ["면역", "딥러닝", "영상"]))
+
+    assert rag.classified == []
+    assert len(rag.embeddings.calls) == 1
+    assert len({response["session_id"] for response in responses}) == 3
+    assert [response["professors"][0]["professor_id"] for response in responses] == ["면역", "딥러닝", "영상"]
@@ -0,0 +1,52 @@
+"""
+asyncio 파이프라인 테스트 (가짜 Azure OpenAI 서버 대상 aprocess_query)
+"""
+import asyncio
+
+from rag_lab_recommender import ConversationHistory
+
+
+def professor_ids(docs):
+    return [doc.metadata["professor_id"] for doc in docs]
+
+
+def test_aprocess_query_overlaps_expansion_and_retrieval(fake_rag):
+    history = ConversationHistory()
+    response = asyncio.run(fake_rag.aprocess_query("면역 세포 연구하는 교수님 추천해줘", history))
+
+    assert response["result"]
+    assert response["classification"]["type"] == "new_search"
+    assert {"classify", "expansion", "embedding", "expansion_embedding_wall", "retrieval",
+            "generation", "total"} <= set(response["timings"])
+    assert response["source_documents"]
+    assert [ref.professor_id for ref in history.last_retrieved] == professor_ids(response["source_documents"])
+
+
+def test_async_and_sync_paths_recommend_the_same_professors(fake_rag):
+    query = "방사성의약품 개발 연구실 추천"
+    async_docs = asyncio.run(fake_rag.aprocess_query(query, ConversationHistory()))["source_documents"]
+
+    history = ConversationHistory()
+    fake_rag.process_query(query, history)
+    assert [ref.professor_id for ref in history.last_retrieved] == professor_ids(async_docs)
+
+
+def test_concurrent_queries_keep_separate_histories(fake_rag):
+    queries = ["종양미세환경 연구 교수님", "분자영상 연구실 추천", "단일세포 분석 교수님 추천"]
+    histories = [ConversationHistory() for _ in queries]
+
+    async def run():
+        return await asyncio.gather(*(fake_rag.aprocess_query(query, history)
+                                      for query, history in zip(queries, histories)))
+
+    responses = asyncio.run(run())
+    assert all(response["result"] for response in responses)
+    assert [list(history.queries) for history in histories] == [[query] for query in queries]
+
+
+def test_general_info_skips_retrieval(fake_rag):
+    response = asyncio.run(fake_rag.aprocess_query("대학원 입학 절차가 궁금해요", ConversationHistory()))
+
+    assert response["classification"]["type"] == "general_info"
+    assert response["source_documents"] == []
+    assert "retrieval" not in response["timings"]
@@ -0,0 +1,69 @@
+"""
+벤치마크 하네스 테스트 (대화 재생 집계 / 기준 리포트 회귀 검사 / 질문 파일 로드)
+"""
+import importlib
+import json
+
+import pytest
+
+
+@pytest.fixture
+def benchmark(monkeypatch):
+    # benchmark 모듈은 import 시 캐시/라우터 경로 환경변수를 비우므로 테스트 후 원래 값으로 복원
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", "")
+    monkeypatch.setenv("QUERY_ROUTER_PATH", "")
+    return importlib.import_module("benchmark")
+
+
+def fake_run(turns):
+    """질문 길이를 지연시간으로 쓰는 결정적 러너 ("실패"가 들어간 질문은 오류)"""
+    return [{"ok": "실패" not in query, "latency_ms": float(len(query)), "first_token_ms": 1.0,
+             "stages_ms": {"retrieval": 2.0}} for query in turns]
+
+
+def test_replay_cycles_conversations_up_to_query_count(benchmark):
+    calls = []
+
+    def run(turns):
+        calls.append(turns)
+        return fake_run(turns)
+
+    result = benchmark.replay(run, [["가", "나나"], ["실패"]], total_queries=5, concurrency=2)
+
+    assert sorted(calls) == sorted([["가", "나나"], ["실패"], ["가", "나나"]])
+    assert result["queries"] == 5 and result["errors"] == 1
+    assert result["p50_ms"] == 1.5
+    assert result["first_token_p50_ms"] == 1.0
+    assert result["stage_p50_ms"] == {"retrieval": 2.0}
+    assert result["throughput_qps"] > 0
+
+
+def test_percentile_of_empty_samples(benchmark):
+    assert benchmark.percentile([], 95) is None
+    assert benchmark.percentile([1.0, 2.0, 3.0], 50) == 2.0
+
+
+def test_compare_with_baseline_flags_regressions(benchmark, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": [
+        {"system": "rag", "professors": 31, "p95_ms": 100.0, "throughput_qps": 10.0},
+        {"system": "lab", "professors": 31, "p95_ms": 100.0, "throughput_qps": 10.0},
+    ]}), encoding="utf-8")
+    rows = [
+        {"system": "rag", "professors": 31, "p95_ms": 130.0, "throughput_qps": 7.0},
+        {"system": "lab", "professors": 31, "p95_ms": 110.0, "throughput_qps": 9.0},
+        {"system": "rag", "professors": 1000, "p95_ms": 500.0, "throughput_qps": 1.0},
+    ]
+
+    assert benchmark.compare_with_baseline(rows, str(baseline), max_regression=0.2) == [
+        "rag / 교수 31명: p95 100.0ms → 130.0ms",
+        "rag / 교수 31명: 처리량 10.0 → 7.0qps",
+    ]
+
+
+def test_load_conversations(benchmark, tmp_path):
+    assert benchmark.load_conversations(None) is benchmark.CONVERSATIONS
+
+    path = tmp_path / "queries.txt"
+    path.write_text("면역 연구실\n\n  뇌과학 교수님  \n", encoding="utf-8")
+    assert benchmark.load_conversations(str(path)) == [["면역 연구실"], ["뇌과학 교수님"]]
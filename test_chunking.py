@@ -0,0 +1,74 @@
+"""
+필드별 청크 분할 / 교수 단위 집계 테스트
+"""
+import numpy as np
+import pytest
+
+from chunking import chunk_body, chunk_prefix, chunk_professor_id, create_professor_chunks, professor_header
+from retrieval import ProfessorRetriever
+
+METADATA = {"professor_id": "p1", "professor_name": "김철수", "lab_name": "면역학 연구실",
+            "university": "서울대학교", "department": "의학과", "keywords": "면역, 암", "email": "kim@snu.ac.kr"}
+
+
+def make_professor(**overrides):
+    professor = {
+        "연구분야": {"키워드": "면역, 암", "설명": "T세포 연구"},
+        "연구주제": ["T세포 분화", "종양 면역"],
+        "기술및방법": ["유세포 분석"],
+        "논문": ["논문 A", "논문 B"],
+        "학력경력": ["2001 의학박사"],
+        "학생지도": {"특징": "주간 미팅", "진로": ""},
+    }
+    professor.update(overrides)
+    return professor
+
+
+def test_chunks_are_typed_and_numbered():
+    chunks = create_professor_chunks(make_professor(), METADATA)
+
+    assert [chunk.metadata["doc_id"] for chunk in chunks] == [f"p1:{n}" for n in range(7)]
+    assert [chunk.metadata["chunk_type"] for chunk in chunks] == [
+        "research", "topics", "methods", "paper", "paper", "career", "mentoring"]
+    assert all(chunk.metadata["professor_id"] == "p1" for chunk in chunks)
+    assert chunks[0].page_content == "[김철수 · 면역학 연구실] 연구분야: 면역, 암\nT세포 연구"
+    assert chunk_body(chunks[3]) == "논문: 논문 A"
+    assert chunk_body(chunks[6]) == "학생지도: 주간 미팅"
+    assert {chunk_professor_id(chunk.metadata["doc_id"]) for chunk in chunks} == {"p1"}
+
+
+def test_empty_professor_keeps_one_chunk():
+    empty = make_professor(연구분야={"키워드": "", "설명": ""}, 연구주제=[], 기술및방법=[], 논문=[], 학력경력=[],
+                           학생지도={})
+    chunks = create_professor_chunks(empty, {**METADATA, "lab_name": ""})
+
+    assert len(chunks) == 1
+    assert chunks[0].metadata["doc_id"] == "p1:0"
+    assert chunks[0].page_content == "[김철수 · 연구실 정보 없음] 연구분야: 정보 없음"
+
+
+def test_prefix_helpers():
+    assert chunk_prefix(METADATA) == "[김철수 · 면역학 연구실] "
+    assert chunk_professor_id("p1") == "p1"
+    assert professor_header(METADATA).splitlines() == [
+        "교수명: 김철수 (서울대학교 의학과)", "연구실: 면역학 연구실", "연구분야: 면역, 암", "이메일: kim@snu.ac.kr"]
+
+
+def test_professor_score_adds_bonus_for_extra_chunks():
+    retriever = ProfessorRetriever.model_construct(chunk_bonus=0.1, max_chunks_per_professor=3)
+
+    assert retriever.professor_score(np.array([0.9])) == pytest.approx(0.9)
+    # 상위 max_chunks_per_professor개까지만, 음수 관련도는 보너스 없음
+    assert retriever.professor_score(np.array([0.9, 0.5, 0.4, 0.3])) == pytest.approx(0.9 + 0.1 * 0.9)
+    assert retriever.professor_score(np.array([0.9, -0.2])) == pytest.approx(0.9)
+
+
+def test_matched_chunks_are_composed_under_one_header():
+    chunks = create_professor_chunks(make_professor(), METADATA)
+    doc = ProfessorRetriever.compose_document([chunks[3], chunks[1]], 0.95, [0.9, 0.5])
+
+    assert doc.page_content.splitlines() == professor_header(METADATA).splitlines() + [
+        "논문: 논문 A", "연구주제: T세포 분화", "종양 면역"]
+    assert doc.metadata["matched_chunks"] == ["p1:3", "p1:1"]
+    assert doc.metadata["score"] == 0.95 and doc.metadata["chunk_scores"] == [0.9, 0.5]
+    assert "chunk_type" not in doc.metadata and "doc_id" not in doc.metadata
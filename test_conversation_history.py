@@ -0,0 +1,69 @@
+"""
+대화 히스토리 링 버퍼 테스트 (최대 턴 수 / 컨텍스트 캐시 / 검색 결과 참조)
+"""
+from langchain_core.documents import Document
+
+from rag_lab_recommender import CONTEXT_RESPONSE_CHARS, ConversationHistory, RetrievedProfessor
+
+
+def make_document(pid, score=0.5):
+    return Document(page_content="본문", metadata={"professor_id": pid, "score": score,
+                                                  "matched_chunks": [f"{pid}:0", None],
+                                                  "chunk_scores": [score]})
+
+
+def test_turns_are_bounded_by_max_turns():
+    history = ConversationHistory(max_turns=3)
+    for i in range(5):
+        history.add_turn(f"질문 {i}", f"답변 {i}", [make_document(f"p{i}")])
+
+    assert list(history.queries) == ["질문 2", "질문 3", "질문 4"]
+    assert len(history.context_entries) == 3
+    assert [refs[0].professor_id for refs in history.retrieved] == ["p2", "p3", "p4"]
+
+
+def test_turns_without_documents_keep_last_retrieved():
+    history = ConversationHistory()
+    assert history.last_retrieved == ()
+
+    history.add_turn("추천해줘", "답변", [make_document("p1", 0.7)])
+    history.add_turn("입학 절차는?", "답변", [])
+
+    assert len(history.retrieved) == 1
+    assert history.last_retrieved == (RetrievedProfessor("p1", 0.7, ("p1:0",), (0.7,)),)
+
+
+def test_context_truncates_responses_and_is_cached_per_turn():
+    history = ConversationHistory()
+    history.add_turn("q1", "가" * (CONTEXT_RESPONSE_CHARS + 50))
+    history.add_turn("q2", "a2")
+
+    context = history.get_context(1)
+    assert context == "Q: q2\nA: a2..."
+    assert history.get_context(1) is context
+    assert history.get_context(2).startswith("Q: q1\nA: " + "가" * CONTEXT_RESPONSE_CHARS + "...")
+    assert history.get_context(0) == ""
+
+    history.add_turn("q3", "a3")
+    assert history.get_context(1) == "Q: q3\nA: a3..."
+
+
+def test_memory_stays_bounded():
+    history = ConversationHistory(max_turns=2)
+    history.add_turn("질문", "답변" * 500, [make_document("p0")])
+    bounded = history.memory_bytes()
+    for i in range(50):
+        history.add_turn("질문", "답변" * 500, [make_document("p0")])
+
+    assert history.memory_bytes() <= bounded * 2
+
+
+def test_clear_resets_everything():
+    history = ConversationHistory()
+    history.add_turn("q", "a", [make_document("p1")])
+    history.last_classification = {"type": "new_search"}
+    history.get_context()
+    history.clear()
+
+    assert not history.queries and not history.retrieved and history.get_context() == ""
+    assert history.last_classification == {} and history.last_trace is None
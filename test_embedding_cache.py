@@ -0,0 +1,91 @@
+"""
+임베딩 2단 캐시 테스트 (메모리 LRU → SQLite 승격 / 키 정규화 / 캐시 래퍼의 API 호출 절약)
+"""
+import asyncio
+import unicodedata
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import CachedEmbeddings, EmbeddingCache, normalize_text
+
+
+class CountingEmbeddings(Embeddings):
+    """호출된 텍스트를 기록하는 가짜 임베딩"""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_evicted_entries_are_promoted_from_sqlite(db_path):
+    cache = EmbeddingCache("m", 2, max_memory_entries=2, db_path=db_path)
+    cache.put("a", [1.0, 0.0])
+    cache.put("b", [0.0, 1.0])
+    cache.put("c", [1.0, 1.0])
+    assert cache.counters["evictions"] == 1
+
+    # a는 메모리에서 밀려났지만 디스크에서 찾아 메모리로 다시 올림
+    assert cache.get("a") == [1.0, 0.0]
+    assert cache.get("a") == [1.0, 0.0]
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+    assert stats["memory_entries"] == 2
+
+
+def test_sqlite_cache_survives_restart(db_path):
+    EmbeddingCache("m", 2, db_path=db_path).put_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+
+    cache = EmbeddingCache("m", 2, db_path=db_path)
+    assert cache.get("b") == [0.0, 1.0]
+    assert cache.counters["disk_hits"] == 1
+
+    # 모델/차원이 다르면 다른 키
+    assert EmbeddingCache("other", 2, db_path=db_path).get("b") is None
+    assert EmbeddingCache("m", 3, db_path=db_path).get("b") is None
+
+
+def test_memory_only_cache_and_clear(db_path):
+    cache = EmbeddingCache("m", 2, max_memory_entries=1, db_path=None)
+    cache.put("a", [1.0, 0.0])
+    cache.put("b", [0.0, 1.0])
+    assert cache.get("a") is None and cache.get("b") == [0.0, 1.0]
+
+    persistent = EmbeddingCache("m", 2, db_path=db_path)
+    persistent.put("a", [1.0, 0.0])
+    persistent.clear()
+    assert persistent.get("a") is None
+    assert EmbeddingCache("m", 2, db_path=db_path).get("a") is None
+
+
+def test_keys_ignore_whitespace_and_unicode_form():
+    cache = EmbeddingCache("m", 2, db_path=None)
+    cache.put("딥러닝  교수\n추천", [1.0, 0.0])
+
+    assert normalize_text(" 딥러닝 교수 추천 ") == "딥러닝 교수 추천"
+    # 자모 분리(NFD) 표기도 같은 키
+    assert cache.get(unicodedata.normalize("NFD", "딥러닝 교수 추천")) == [1.0, 0.0]
+
+
+def test_cached_embeddings_only_embed_missing_texts():
+    inner = CountingEmbeddings()
+    embeddings = CachedEmbeddings(inner, EmbeddingCache("m", 2, db_path=None))
+
+    assert embeddings.embed_documents(["a", "bb"]) == [[1.0, 1.0], [2.0, 1.0]]
+    assert embeddings.embed_documents(["bb", "ccc", "a"]) == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert embeddings.embed_query("ccc") == [3.0, 1.0]
+    assert asyncio.run(embeddings.aembed_query("dddd")) == [4.0, 1.0]
+    assert asyncio.run(embeddings.aembed_documents(["a", "dddd"])) == [[1.0, 1.0], [4.0, 1.0]]
+
+    assert inner.calls == [["a", "bb"], ["ccc"], ["dddd"]]
@@ -0,0 +1,133 @@
+"""
+임베딩 저장 포맷 테스트 (memmap 왕복 / 헤더 요약값 / 이전 포맷 호환 / 행별 목록 지연 로드 / pickle 변환)
+"""
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from corpus_utils import content_hash, professor_id
+from embedding_store import (FORMAT_VERSION, LEGACY_FORMAT_VERSION, convert_pickle, header_path_for, ids_digest,
+                             load_embedding_matrix, load_embedding_row_field, load_embedding_rows, rows_path_for,
+                             save_embedding_matrix)
+
+IDS = ["p1", "p2", "p3"]
+HASHES = ["h1", "h2", "h3"]
+EMBEDDINGS = [[3.0, 4.0, 0.0], [0.0, 2.0, 0.0], [1.0, 1.0, 1.0]]
+
+
+@pytest.fixture
+def matrix_path(tmp_path):
+    path = str(tmp_path / "embeddings.npy")
+    save_embedding_matrix(path, EMBEDDINGS, "test-embedding", IDS, HASHES,
+                          extra={"source": "test"}, rows={"prompt_snippets": ["a", "b", "c"]})
+    return path
+
+
+def read_header(matrix_path):
+    with open(header_path_for(matrix_path), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_header(matrix_path, header):
+    with open(header_path_for(matrix_path), "w", encoding="utf-8") as f:
+        json.dump(header, f)
+
+
+def test_round_trip_as_normalized_memmap(matrix_path):
+    matrix, header = load_embedding_matrix(matrix_path)
+
+    assert isinstance(matrix, np.memmap) and not matrix.flags.writeable
+    assert matrix.dtype == np.float32 and matrix.shape == (3, 3)
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_allclose(matrix[0], [0.6, 0.8, 0.0], rtol=1e-6)
+
+    assert header["format_version"] == FORMAT_VERSION and header["source"] == "test"
+    assert header["ids_digest"] == ids_digest(IDS)
+    assert header["content_digest"] == content_hash(json.dumps(HASHES))
+    # 헤더에는 행별 목록 대신 요약값만 저장
+    assert "professor_ids" not in header
+    assert header["row_fields"] == ["content_hashes", "professor_ids", "prompt_snippets"]
+
+
+def test_digest_depends_on_order():
+    assert ids_digest(IDS) != ids_digest(list(reversed(IDS)))
+
+
+def test_rows_are_loaded_lazily(matrix_path):
+    matrix, header = load_embedding_matrix(matrix_path)
+    assert load_embedding_rows(matrix_path, header)["professor_ids"] == IDS
+    assert load_embedding_row_field(matrix_path, header, "prompt_snippets") == ["a", "b", "c"]
+    assert load_embedding_row_field(matrix_path, header, "professor_names") is None
+
+    # 행렬/헤더 로드는 행별 목록 파일을 읽지 않음
+    os.remove(rows_path_for(matrix_path))
+    assert load_embedding_matrix(matrix_path)[1]["count"] == 3
+    with pytest.raises(FileNotFoundError):
+        load_embedding_rows(matrix_path, header)
+
+
+def test_legacy_header_is_still_readable(matrix_path):
+    header = read_header(matrix_path)
+    for field in ("ids_digest", "content_digest", "row_fields"):
+        del header[field]
+    header.update(format_version=LEGACY_FORMAT_VERSION, professor_ids=IDS, content_hashes=HASHES,
+                  prompt_snippets=["a", "b", "c"])
+    write_header(matrix_path, header)
+    os.remove(rows_path_for(matrix_path))
+
+    _, loaded = load_embedding_matrix(matrix_path)
+    assert loaded["ids_digest"] == ids_digest(IDS)
+    assert loaded["content_digest"] == content_hash(json.dumps(HASHES))
+    assert load_embedding_row_field(matrix_path, loaded, "prompt_snippets") == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("change", [{"count": 4}, {"dimension": 2}, {"format_version": 99}])
+def test_mismatched_header_is_rejected(matrix_path, change):
+    write_header(matrix_path, {**read_header(matrix_path), **change})
+    with pytest.raises(ValueError):
+        load_embedding_matrix(matrix_path)
+
+
+def test_rows_file_from_another_save_is_rejected(matrix_path):
+    _, header = load_embedding_matrix(matrix_path)
+    with open(rows_path_for(matrix_path), "w", encoding="utf-8") as f:
+        json.dump({"professor_ids": IDS[:2], "content_hashes": HASHES[:2]}, f)
+
+    with pytest.raises(ValueError):
+        load_embedding_rows(matrix_path, header)
+
+
+def test_save_rejects_length_mismatch(tmp_path):
+    path = str(tmp_path / "embeddings.npy")
+    with pytest.raises(ValueError):
+        save_embedding_matrix(path, EMBEDDINGS, "test-embedding", IDS[:2], HASHES[:2])
+    with pytest.raises(ValueError):
+        save_embedding_matrix(path, EMBEDDINGS, "test-embedding", IDS, HASHES, rows={"prompt_snippets": ["a"]})
+
+
+def test_convert_pickle(tmp_path):
+    data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "professors_final_complete.json")
+    with open(data_path, "r", encoding="utf-8") as f:
+        professors = json.load(f)["교수진"][:2]
+    small_data = tmp_path / "professors.json"
+    small_data.write_text(json.dumps({"교수진": professors}, ensure_ascii=False), encoding="utf-8")
+
+    pickle_path = tmp_path / "embeddings.pkl"
+    names = [professor["기본정보"]["교수이름"] for professor in professors]
+    with open(pickle_path, "wb") as f:
+        pickle.dump({"embeddings": [[1.0, 0.0], [0.0, 2.0]], "professor_names": names, "model": "m"}, f)
+
+    matrix_path = str(tmp_path / "converted.npy")
+    header = convert_pickle(str(pickle_path), str(small_data), matrix_path)
+    assert header["model"] == "m" and header["count"] == 2
+    rows = load_embedding_rows(matrix_path, header)
+    assert rows["professor_ids"] == [professor_id(professor) for professor in professors]
+    assert len(rows["prompt_snippets"]) == 2
+
+    with open(pickle_path, "wb") as f:
+        pickle.dump({"embeddings": [[1.0, 0.0], [0.0, 2.0]], "professor_names": names[::-1]}, f)
+    with pytest.raises(ValueError):
+        convert_pickle(str(pickle_path), str(small_data), matrix_path)
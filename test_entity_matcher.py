@@ -0,0 +1,116 @@
+"""
+질문 엔티티 매칭 테스트 (Aho-Corasick 자동자 / 교수 언급 / 이름 오타 보정 / 검색 필터)
+"""
+import random
+
+import pytest
+
+from entity_matcher import AhoCorasick, EntityMatcher, compact_text, deletion_variants, lab_keys, term_keys
+from professor_store import ProfessorStore
+
+
+def make_professor(name, email, lab="", keywords="면역", methods=(), english_name=""):
+    return {
+        "기본정보": {"교수이름": name, "영문이름": english_name, "대학명": "서울대학교", "학과명": "의학과",
+                 "이메일": email},
+        "연구실": {"연구실명": lab},
+        "연구분야": {"키워드": keywords},
+        "연구주제": [],
+        "기술및방법": list(methods),
+        "학력경력": [],
+        "논문": [],
+        "학생지도": {},
+    }
+
+
+@pytest.fixture(scope="module")
+def store():
+    return ProfessorStore.from_professors([
+        make_professor("강건욱", "kang@snu.ac.kr", "분자영상 및 치료 연구실", "면역, 나노입자, PET/CT",
+                       ["나노입자를 이용한 표적영상"]),
+        make_professor("김철수", "kim@snu.ac.kr", "면역학 연구실"),
+        make_professor("김철수", "kim2@snu.ac.kr", "유전체 연구실", "면역, 유전체"),
+        make_professor("이영희", "lee@snu.ac.kr", keywords="면역, 뇌영상", english_name="Younghee Lee"),
+    ])
+
+
+@pytest.fixture(scope="module")
+def matcher(store):
+    return EntityMatcher.from_store(store)
+
+
+def brute_force_matches(patterns, text):
+    return {(start, start + len(pattern), pattern_id)
+            for pattern_id, pattern in enumerate(patterns)
+            for start in range(len(text)) if text.startswith(pattern, start)}
+
+
+def test_automaton_reports_overlapping_matches():
+    automaton = AhoCorasick()
+    for pattern in ("he", "she", "his", "hers"):
+        automaton.add(pattern)
+    assert automaton.add("she") == 1
+    automaton.build()
+
+    assert set(automaton.iter_matches("ushers")) == {(1, 4, 1), (2, 4, 0), (2, 6, 3)}
+
+
+def test_automaton_matches_brute_force():
+    rng = random.Random(0)
+    patterns = list(dict.fromkeys("".join(rng.choice("가나다") for _ in range(rng.randint(1, 4)))
+                                  for _ in range(30)))
+    automaton = AhoCorasick()
+    for pattern in patterns:
+        automaton.add(pattern)
+    automaton.build()
+
+    for _ in range(20):
+        text = "".join(rng.choice("가나다라") for _ in range(40))
+        assert set(automaton.iter_matches(text)) == brute_force_matches(patterns, text)
+
+
+def test_pattern_helpers():
+    assert lab_keys("분자영상 및 치료 연구실 (101호), https://lab.snu.ac.kr") == ["분자영상및치료연구실"]
+    assert lab_keys("연구실명") == []
+    assert "나노입자" in term_keys("나노입자를 이용한 표적영상") and "이용한" not in term_keys("나노입자를 이용한 표적영상")
+    assert deletion_variants("강건욱") == ["건욱", "강욱", "강건"]
+    assert compact_text("PET/CT 연구") == ("petct연구", {0, 3, 5, 7})
+
+
+def test_find_mentions_by_name_lab_and_email(matcher):
+    assert matcher.find_mentions("강건욱 교수님 연구실 알려줘") == [("강건욱", [0])]
+    assert matcher.find_mentions("분자영상 및 치료 연구실 진로는?") == [("분자영상및치료연구실", [0])]
+    assert matcher.find_mentions("lee@snu.ac.kr 교수님") == [("leesnuackr", [3])]
+    assert matcher.find_mentions("younghee lee 교수님 논문") == [("youngheelee", [3])]
+
+
+def test_homonyms_are_ambiguous(matcher):
+    assert matcher.find_mentions("김철수 교수님 연구") == [("김철수", [1, 2])]
+
+
+def test_fuzzy_name_correction(matcher):
+    assert matcher.find_mentions("강건옥 교수님은 어떤 연구를 하시나요") == [("강건옥", [0])]
+    assert matcher.find_mentions("강건옥 교수님", fuzzy=False) == []
+    assert matcher.find_mentions("박민수 교수님") == []
+
+
+def test_english_terms_respect_word_boundaries(matcher):
+    assert not matcher.is_research_related(matcher.match("taiwan trip"))
+    assert matcher.is_research_related(matcher.match("AI 하고 싶어요"))
+    assert matcher.term_filter(matcher.match("PET/CT 장비")) == frozenset({0})
+
+
+def test_term_filter_excludes_common_terms(store):
+    matcher = EntityMatcher.from_store(store, max_filter_share=0.0, min_filter_size=1)
+    entities = matcher.match("면역 나노입자")
+
+    assert matcher.is_research_related(entities)
+    assert matcher.term_filter(entities) == frozenset({0})
+    assert matcher.term_filter(matcher.match("면역")) is None
+
+
+def test_from_store_limits_to_indexed_professors(store):
+    matcher = EntityMatcher.from_store(store, professor_ids={store[3].professor_id})
+
+    assert matcher.find_mentions("강건욱 교수님") == []
+    assert matcher.find_mentions("이영희 교수님") == [("이영희", [3])]
@@ -0,0 +1,97 @@
+"""
+교수 임베딩 배치 생성 테스트 (토큰 예산 / 최대 개수 배치 분할, 응답 순서 복원, 레이트 리밋 재시도)
+"""
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+import generate_embeddings
+from generate_embeddings import EmbeddingGenerator
+
+
+class FakeEmbeddingsAPI:
+    """client.embeddings.create 대역 - 응답 순서를 뒤집어 반환하고, 지정한 횟수만큼 429 발생"""
+
+    def __init__(self, rate_limits=0, retry_after=None, fail_on=None):
+        self.inputs = []
+        self.rate_limits = rate_limits
+        self.retry_after = retry_after
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def create(self, model, input):
+        with self._lock:
+            self.inputs.append(list(input))
+            if self.rate_limits:
+                self.rate_limits -= 1
+                headers = {"retry-after": self.retry_after} if self.retry_after else {}
+                response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "http://fake"))
+                raise RateLimitError("rate limited", response=response, body=None)
+        if self.fail_on is not None and self.fail_on in input:
+            raise ValueError("bad input")
+        data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+        return SimpleNamespace(data=data[::-1])
+
+
+def make_generator(api=None, **kwargs):
+    return EmbeddingGenerator(client=SimpleNamespace(embeddings=api or FakeEmbeddingsAPI()), **kwargs)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(generate_embeddings.time, "sleep", delays.append)
+    return delays
+
+
+def test_estimate_tokens():
+    assert EmbeddingGenerator.estimate_tokens("abcdefgh") == 3
+    assert EmbeddingGenerator.estimate_tokens("면역 세포") == 5
+
+
+def test_batches_respect_token_budget():
+    generator = make_generator(batch_token_budget=10)
+    texts = ["가" * 4, "가" * 4, "가", "가" * 8, "가" * 20, "가"]  # 추정 토큰 5, 5, 2, 9, 21, 2
+
+    # 예산과 같아질 때까지는 같은 배치, 예산을 넘는 텍스트 하나는 단독 배치
+    assert generator.pack_batches(texts) == [[0, 1], [2], [3], [4], [5]]
+    assert generator.pack_batches([]) == []
+
+
+def test_batches_respect_max_size():
+    generator = make_generator(batch_token_budget=1000, max_batch_size=3)
+    assert generator.pack_batches(["a"] * 7) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_embed_batch_restores_input_order():
+    assert make_generator().embed_batch(["a", "bbb", "cc"]) == [[1.0], [3.0], [2.0]]
+
+
+def test_rate_limit_retries_with_retry_after(sleeps):
+    api = FakeEmbeddingsAPI(rate_limits=2, retry_after="0.25")
+    assert make_generator(api).embed_batch(["ab"]) == [[2.0]]
+    assert len(api.inputs) == 3
+    assert sleeps == [0.25, 0.25]
+
+
+def test_rate_limit_gives_up_after_max_retries(sleeps):
+    api = FakeEmbeddingsAPI(rate_limits=5)
+    with pytest.raises(RateLimitError):
+        make_generator(api, max_retries=2).embed_batch(["ab"])
+    assert len(api.inputs) == 3
+    assert len(sleeps) == 2 and sleeps[0] < sleeps[1]
+
+
+def test_generate_all_embeddings_in_professor_order(monkeypatch):
+    api = FakeEmbeddingsAPI(fail_on="x" * 3)
+    generator = make_generator(api, batch_token_budget=1, max_workers=3)
+    texts = ["a", "bb", "xxx", "dddd"]
+    monkeypatch.setattr(generator, "create_professor_text_for_embedding", lambda professor: professor["text"])
+    generator.professors_data = [{"text": text, "기본정보": {"교수이름": text}} for text in texts]
+    generator.dimension = 2
+
+    assert generator.generate_all_embeddings() == [[1.0], [2.0], [0.0, 0.0], [4.0]]
+    assert sorted(map(len, api.inputs)) == [1, 1, 1, 1]
@@ -0,0 +1,62 @@
+"""
+BM25 역색인 / RRF 결합 테스트
+"""
+from langchain_core.documents import Document
+
+from lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_mixed_korean_and_latin():
+    """영문 복합 표기는 전체 + 구성 단어로, 한글은 음절 bigram으로 분리"""
+    tokens = tokenize("PET/CT 분자영상")
+    assert tokens[:3] == ["pet/ct", "pet", "ct"]
+    assert tokens[3:] == ["분자", "자영", "영상"]
+
+
+def test_tokenize_single_hangul_syllable():
+    assert tokenize("암") == ["암"]
+
+
+def test_search_ranks_matching_documents():
+    index = BM25Index()
+    index.build([
+        ("a:0", "오가노이드 배양 및 항암제 내성"),
+        ("b:0", "딥러닝 기반 의료 영상 분석"),
+        ("c:0", "오가노이드 유전체 분석"),
+    ])
+
+    results = index.search("오가노이드 배양")
+    assert [doc_id for doc_id, _ in results] == ["a:0", "c:0"]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_search_excludes_zero_scores_and_empty_index():
+    index = BM25Index()
+    assert index.search("딥러닝") == []
+
+    index.build([("a:0", "딥러닝"), ("b:0", "면역학")])
+    assert [doc_id for doc_id, _ in index.search("딥러닝")] == ["a:0"]
+    assert index.search("taiwan") == []
+
+
+def test_search_respects_top_k():
+    index = BM25Index()
+    index.build((f"p{i}:0", "면역 세포 연구") for i in range(10))
+    assert len(index.search("면역", top_k=3)) == 3
+
+
+def test_from_documents_uses_chunk_doc_id():
+    documents = [
+        Document(page_content="단백질 구조", metadata={"doc_id": "p1:0", "professor_id": "p1"}),
+        Document(page_content="단백질 기능", metadata={"professor_id": "p2"}),
+    ]
+    index = BM25Index.from_documents(documents)
+    assert len(index) == 2
+    assert index.doc_ids == ["p1:0", "p2"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a"]], rrf_k=60)
+    assert fused["a"] == fused["b"] == 1 / 61 + 1 / 62
+    assert fused["c"] == 1 / 63
+    assert max(fused, key=fused.get) in ("a", "b")
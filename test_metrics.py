@@ -0,0 +1,113 @@
+"""
+파이프라인 계측 테스트 (스트리밍 Trace 범위 / 단계·캐시·토큰 기록 / Prometheus 출력)
+"""
+import asyncio
+
+from metrics import (REGISTRY, activate_trace, aiterate_in_trace, current_trace, iterate_in_trace, open_trace,
+                     record_cache, record_tokens, recent_traces, set_attribute, stage, start_trace)
+
+
+def traced_stream(traces):
+    """process_query_stream과 같은 구조의 스트리밍 제너레이터"""
+    with open_trace("stream") as trace:
+        traces.append(trace)
+        with activate_trace(trace):
+            with stage("prepare"):
+                record_cache("answer", False)
+
+        def tokens():
+            for token in "abc":
+                with stage("generation"):
+                    record_cache("embedding", True)
+                yield token
+
+        yield from iterate_in_trace(trace, tokens())
+
+
+async def atraced_stream(traces):
+    with open_trace("astream") as trace:
+        traces.append(trace)
+
+        async def tokens():
+            for token in "abc":
+                with stage("generation"):
+                    record_cache("embedding", True)
+                await asyncio.sleep(0)
+                yield token
+
+        async for token in aiterate_in_trace(trace, tokens()):
+            yield token
+
+
+def consume(token):
+    """소비자 쪽 작업 - 스트림의 Trace에 기록되면 안 됨"""
+    with stage("consumer"):
+        record_cache("consumer", True)
+    set_attribute("consumer", token)
+
+
+def assert_stream_trace(trace):
+    assert [name for name, _ in trace.stages if name != "prepare"] == ["generation"] * 3
+    assert trace.cache["embedding"] == {"hit": 3, "miss": 0}
+    assert "consumer" not in trace.cache and "consumer" not in trace.attributes
+
+
+def test_stream_trace_is_inactive_between_items():
+    traces, tokens = [], []
+    for token in traced_stream(traces):
+        assert current_trace() is None
+        consume(token)
+        tokens.append(token)
+
+    assert tokens == ["a", "b", "c"]
+    trace = traces[0]
+    assert_stream_trace(trace)
+    assert trace.stages[0][0] == "prepare"
+    assert trace.cache["answer"] == {"hit": 0, "miss": 1}
+    assert recent_traces(1)[0]["trace_id"] == trace.trace_id
+
+
+def test_consumer_trace_is_restored_between_items():
+    traces = []
+    with start_trace("outer") as outer:
+        for token in traced_stream(traces):
+            assert current_trace() is outer
+            consume(token)
+
+    assert outer.cache == {"consumer": {"hit": 3, "miss": 0}}
+    assert [name for name, _ in outer.stages] == ["consumer"] * 3
+    assert_stream_trace(traces[0])
+
+
+def test_async_stream_trace_is_inactive_between_items():
+    traces = []
+
+    async def run():
+        async for token in atraced_stream(traces):
+            assert current_trace() is None
+            consume(token)
+
+    asyncio.run(run())
+    assert_stream_trace(traces[0])
+
+
+def test_start_trace_records_tokens_and_attributes():
+    with start_trace("query", query="q") as trace:
+        assert current_trace() is trace
+        record_tokens(10, 5)
+        record_tokens(1, 2)
+        set_attribute("query_type", "new_search")
+    assert current_trace() is None
+
+    data = trace.to_dict()
+    assert data["tokens"] == {"prompt": 11, "completion": 7}
+    assert data["query"] == "q" and data["query_type"] == "new_search"
+    assert trace.duration_ms >= 0
+
+
+def test_prometheus_output_includes_stage_histogram():
+    with stage("unit_test_stage"):
+        pass
+    text = REGISTRY.render_prometheus()
+    assert 'stage="unit_test_stage"' in text
+    assert "_bucket{" in text and 'le="+Inf"' in text
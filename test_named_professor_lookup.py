@@ -0,0 +1,100 @@
+"""
+교수 이름 직접 조회 테스트 (이름이 확정된 professor_detail 질문은 번역/벡터 검색 생략)
+"""
+import json
+import os
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import FakeListChatModel
+
+from fake_openai_server import fake_embedding
+from retrieval import ProfessorRetriever
+
+DIMENSION = 16
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "professors_final_complete.json")
+
+
+class CountingEmbeddings(Embeddings):
+    """임베딩한 텍스트를 기록하는 결정적 가짜 임베딩"""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [fake_embedding(text, DIMENSION) for text in texts]
+
+    def embed_query(self, text):
+        self.texts.append(text)
+        return fake_embedding(text, DIMENSION)
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "http://127.0.0.1:9")
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setenv("OPENAI_API_VERSION", "2024-02-01")
+    from rag_lab_recommender import LabRecommenderRAG
+
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        professors = json.load(f)["교수진"][:5]
+    data_path = tmp_path / "professors.json"
+    data_path.write_text(json.dumps({"교수진": professors}, ensure_ascii=False), encoding="utf-8")
+
+    rag = LabRecommenderRAG(str(data_path), str(tmp_path / "vector_store"))
+    rag.embeddings = CountingEmbeddings()
+    rag.create_vector_store()
+    rag.setup_qa_chains(k=3)
+    rag.llm = FakeListChatModel(responses=["답변"] * 10)
+    rag.embeddings.texts.clear()
+    return rag
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    calls = []
+    original = ProfessorRetriever.search_by_vector
+
+    def spy(self, *args, **kwargs):
+        calls.append(args)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(ProfessorRetriever, "search_by_vector", spy)
+    return calls
+
+
+def test_named_professor_detail_skips_vector_search(rag, searches):
+    professor = rag.professor_store[0]
+    query = f"{professor.name} 교수님 연구실 알려줘"
+
+    classification = rag.classify_and_enhance(query)
+    assert classification["type"] == "professor_detail"
+    assert classification["named_professors"] == [professor.professor_id]
+    assert classification["enhanced_query"] == ""
+
+    answer = rag.process_query(query)
+    assert answer == "답변"
+    assert searches == []
+    assert [ref.professor_id for ref in rag.conversation_history.last_retrieved] == [professor.professor_id]
+    # 답변 캐시 키용 원본 질문 임베딩 외에는 임베딩 호출 없음
+    assert set(rag.embeddings.texts) == {query}
+
+
+def test_direct_documents_hold_the_full_profile(rag):
+    professor = rag.professor_store[1]
+    pids = rag.named_professors("professor_detail", f"{professor.name} 교수님 논문")
+
+    _, docs = rag.prepare_strategy("professor_detail", "질문", named_pids=pids)
+    assert [doc.metadata["professor_id"] for doc in docs] == [professor.professor_id]
+    assert professor.name in docs[0].page_content and docs[0].metadata["score"] == 1.0
+
+
+def test_unresolved_names_fall_back_to_search(rag, searches):
+    assert rag.named_professors("professor_detail", "박민수 교수님 연구") is None
+    assert rag.named_professors("new_search", f"{rag.professor_store[0].name} 교수님") is None
+    assert rag.needs_retrieval("professor_detail", None)
+
+    _, docs = rag.prepare_strategy("professor_detail", "영상 연구하시는 교수님 알려줘")
+    assert len(searches) == 1 and docs
@@ -0,0 +1,76 @@
+"""
+벡터화 MMR 검색기 테스트 (교수 단위 저장소 / 관련도·다양성 균형 / fetch_k 후보 수 / 배치 검색)
+"""
+import numpy as np
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import FakeEmbeddings
+
+from ann_index import build_index
+from retrieval import ProfessorRetriever
+
+# 교수 단위(청크 분할 이전) 문서: b는 a와 거의 같은 방향, c는 관련도는 낮지만 다른 방향
+PROFESSORS = [
+    ("a", [1.0, 0.3, 0.0]),
+    ("b", [1.0, 0.25, 0.0]),
+    ("c", [0.3, 1.0, 0.0]),
+    ("d", [0.0, 0.0, 1.0]),
+]
+QUERY = [1.0, 0.5, 0.0]
+
+
+@pytest.fixture
+def vector_store():
+    ids = [pid for pid, _ in PROFESSORS]
+    documents = [Document(page_content=f"{pid} 프로필", metadata={"professor_id": pid}) for pid in ids]
+    return FAISS(
+        embedding_function=FakeEmbeddings(size=3),
+        index=build_index(np.asarray([vector for _, vector in PROFESSORS], dtype=np.float32), "flat"),
+        docstore=InMemoryDocstore(dict(zip(ids, documents))),
+        index_to_docstore_id=dict(enumerate(ids)),
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+    )
+
+
+def professor_ids(docs):
+    return [doc.metadata["professor_id"] for doc in docs]
+
+
+def test_lambda_one_returns_most_relevant(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, k=3, fetch_k=4, lambda_mult=1.0)
+    docs = retriever.search_by_vector(QUERY)
+
+    assert professor_ids(docs) == ["a", "b", "c"]
+    scores = [doc.metadata["score"] for doc in docs]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_diversity_skips_near_duplicates(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, k=2, fetch_k=4, lambda_mult=0.5)
+    assert professor_ids(retriever.search_by_vector(QUERY)) == ["a", "c"]
+
+
+def test_candidates_are_limited_to_fetch_k(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, k=2, fetch_k=2, lambda_mult=0.5)
+    assert professor_ids(retriever.search_by_vector(QUERY)) == ["a", "b"]
+
+
+def test_professor_level_documents_keep_full_profile(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, k=1, fetch_k=4)
+    doc = retriever.search_by_vector(QUERY)[0]
+
+    assert doc.page_content == "a 프로필"
+    assert doc.metadata["score"] == pytest.approx(doc.metadata["chunk_scores"][0])
+
+
+def test_batch_search_matches_single_searches(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, k=2, fetch_k=4)
+    queries = [QUERY, [0.0, 0.2, 1.0], [0.2, 1.0, 0.0]]
+
+    batched = retriever.search_by_vectors(queries)
+    assert [professor_ids(docs) for docs in batched] == [professor_ids(retriever.search_by_vector(query))
+                                                          for query in queries]
+    assert retriever.search_by_vectors([]) == []
@@ -0,0 +1,88 @@
+"""
+교수진 스트리밍 로더 / 정규화 교수 저장소 테스트
+"""
+import json
+
+import pytest
+
+from corpus_utils import professor_id
+from professor_store import ProfessorStore, iter_professors
+
+
+def make_professor(name, email, english_name="", lab="연구실", topics=()):
+    return {
+        "기본정보": {"교수이름": name, "영문이름": english_name, "대학명": "서울대학교", "학과명": "의학과",
+                 "이메일": email},
+        "연구실": {"연구실명": lab},
+        "연구분야": {"키워드": "면역, 암"},
+        "연구주제": list(topics),
+        "기술및방법": [],
+        "학력경력": [],
+        "논문": [{"제목": "논문 1"}],
+        "학생지도": {"진로": "교수"},
+    }
+
+
+PROFESSORS = [
+    make_professor("김철수", "kim@snu.ac.kr", "Chulsoo Kim", "면역학 연구실", ["T세포 분화"]),
+    make_professor("이영희", "lee@snu.ac.kr", lab="영상 연구실"),
+    make_professor("김철수", "kim2@snu.ac.kr", lab="유전체 연구실"),
+]
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "professors.json"
+    path.write_text(json.dumps({"메타데이터": {"버전": "test"}, "교수진": PROFESSORS, "사용법": "없음"},
+                               ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 16])
+def test_streaming_loader_matches_json_load(data_path, chunk_size):
+    """청크 경계가 값 중간에 걸려도 json.load와 같은 항목과 최상위 키를 반환"""
+    header = {}
+    assert list(iter_professors(data_path, header, chunk_size)) == PROFESSORS
+    assert header == {"메타데이터": {"버전": "test"}, "사용법": "없음"}
+
+
+def test_empty_corpus(tmp_path):
+    path = tmp_path / "empty.json"
+    path.write_text('{"교수진": []}', encoding="utf-8")
+    assert list(iter_professors(str(path))) == []
+
+
+def test_store_lookup_by_id_and_name(data_path):
+    store = ProfessorStore.load(data_path, chunk_size=16)
+
+    assert len(store) == 3
+    assert store.metadata["메타데이터"] == {"버전": "test"}
+    assert store.professor_ids == [professor_id(professor) for professor in PROFESSORS]
+
+    first = store.get(professor_id(PROFESSORS[0]))
+    assert first.index == 0 and first.lab_name == "면역학 연구실"
+    assert professor_id(PROFESSORS[1]) in store
+    assert store.get("missing") is None
+
+    # 동명이인은 모두 반환, 영문 이름은 대소문자/공백 무시
+    assert [record.index for record in store.find_by_name("김철수")] == [0, 2]
+    assert [record.index for record in store.find_by_name("chulsoo kim")] == [0]
+    assert store.find_by_name("박민수") == []
+
+
+def test_record_round_trips_to_source_schema():
+    record = ProfessorStore.from_professors(PROFESSORS)[0]
+    professor = record.to_dict()
+
+    assert professor["기본정보"]["교수이름"] == "김철수"
+    assert professor["연구주제"] == ["T세포 분화"]
+    assert record.paper_count == 1
+    assert professor_id(professor) == record.professor_id
+
+
+def test_duplicate_ids_keep_row_order(capsys):
+    store = ProfessorStore.from_professors([PROFESSORS[0], PROFESSORS[1], PROFESSORS[0]])
+
+    assert len(store) == 3
+    assert store.get(professor_id(PROFESSORS[0])).index == 0
+    assert "중복 교수 ID" in capsys.readouterr().out
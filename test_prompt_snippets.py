@@ -0,0 +1,71 @@
+"""
+추천 프롬프트 교수 요약 테스트 (요약 형식 / 행별 목록 지연 로드 / 레코드 계산 대체)
+"""
+import json
+import os
+
+import pytest
+
+from corpus_utils import professor_id
+from embedding_store import (DEFAULT_EMBEDDING_PATH, load_embedding_matrix, rows_path_for,
+                             save_embedding_matrix)
+from generate_embeddings import EmbeddingGenerator
+from professor_store import ProfessorStore
+from streamlit_lab_recommender import LabRecommendationSystem
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "professors_final_complete.json")
+
+
+@pytest.fixture(scope="module")
+def professors():
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)["교수진"][:3]
+
+
+def make_system(professors):
+    system = LabRecommendationSystem()
+    system.professor_store = ProfessorStore.from_professors(professors)
+    return system
+
+
+def test_snippet_is_one_compact_line(professors):
+    professor = professors[0]
+    snippet = EmbeddingGenerator.create_professor_prompt_snippet(professor)
+
+    assert "\n" not in snippet
+    assert snippet.startswith(f"교수명: {professor['기본정보']['교수이름']} | ")
+    assert snippet.endswith(f"논문수: {len(professor['논문'])}")
+    assert f"이메일: {professor['기본정보']['이메일']}" in snippet
+    assert len(snippet) < len(json.dumps(professor, ensure_ascii=False, indent=2))
+
+
+def test_empty_fields_are_omitted(professors):
+    professor = {**professors[0], "기술및방법": [], "연구실": {**professors[0]["연구실"], "연구실명": ""}}
+    snippet = EmbeddingGenerator.create_professor_prompt_snippet(professor)
+
+    assert "기술방법:" not in snippet and "연구실:" not in snippet
+
+
+def test_snippets_load_lazily_from_embedding_rows(professors, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    save_embedding_matrix(DEFAULT_EMBEDDING_PATH, [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]], "test-embedding",
+                          [professor_id(p) for p in professors], ["h1", "h2", "h3"],
+                          rows={"prompt_snippets": ["가", "나", "다"]})
+    system = make_system(professors)
+    _, system.embedding_header = load_embedding_matrix(DEFAULT_EMBEDDING_PATH)
+
+    assert system._prompt_snippets is None
+    assert system.prompt_snippets == ["가", "나", "다"]
+    # 한 번 로드하면 파일을 다시 읽지 않음
+    os.remove(rows_path_for(DEFAULT_EMBEDDING_PATH))
+    assert system.prompt_snippets == ["가", "나", "다"]
+
+
+def test_snippets_fall_back_to_records(professors):
+    system = make_system(professors)
+
+    assert system.prompt_snippets == [EmbeddingGenerator.create_professor_prompt_snippet(p) for p in professors]
+
+    record = system.professor_store[1]
+    messages = system.build_recommendation_messages("면역 연구", [(record, 0.9)])
+    assert f"1. {system.prompt_snippets[1]} | 유사도: 0.900" in messages[-1]["content"]
@@ -0,0 +1,96 @@
+"""
+임베딩 기반 질문 유형 라우터 테스트 (최근접 중심 분류 / 확신도 / 저장·로드 / 호환성 검사)
+"""
+import numpy as np
+import pytest
+
+from query_router import QueryRouter, confusion_matrix, cross_validate, format_report
+
+TYPES = ["new_search", "professor_detail", "general_info"]
+
+
+def make_examples(per_type=6, seed=0):
+    """유형마다 한 축 주변에 모인 분리 가능한 합성 임베딩"""
+    rng = np.random.default_rng(seed)
+    embeddings, labels = [], []
+    for axis, query_type in enumerate(TYPES):
+        for _ in range(per_type):
+            vector = rng.normal(0.0, 0.05, size=4)
+            vector[axis] += 1.0
+            embeddings.append(vector)
+            labels.append(query_type)
+    return np.asarray(embeddings, dtype=np.float32), labels
+
+
+@pytest.fixture
+def router():
+    embeddings, labels = make_examples()
+    return QueryRouter.fit(embeddings, labels, min_margin=0.1, model="test-embedding")
+
+
+def test_fit_and_predict_on_separable_examples(router):
+    embeddings, labels = make_examples(seed=1)
+
+    assert router.dimension == 4
+    assert set(router.labels) == set(TYPES)
+    assert router.predict(embeddings) == labels
+
+
+def test_route_margin_and_exclude(router):
+    decision = router.route([1.0, 0.0, 0.0, 0.0])
+    assert decision.query_type == "new_search"
+    assert decision.score > 0.9 and decision.margin >= router.min_margin
+
+    # 두 유형의 중간이면 확신이 낮아 규칙 기반 분류에 맡김
+    assert router.route([1.0, 1.0, 0.0, 0.0]) is None
+
+    excluded = router.route([1.0, 0.0, 0.2, 0.0], exclude={"new_search"})
+    assert excluded is not None and excluded.query_type == "general_info"
+    assert router.route([1.0, 0.0, 0.0, 0.0], exclude=TYPES) is None
+
+
+def test_scores_reject_dimension_mismatch(router):
+    with pytest.raises(ValueError):
+        router.scores([1.0, 0.0])
+
+
+def test_save_and_load_round_trip(router, tmp_path):
+    path = str(tmp_path / "router.npz")
+    router.save(path)
+
+    loaded = QueryRouter.load(path)
+    assert loaded.labels == router.labels
+    assert loaded.model == "test-embedding" and loaded.dimension == 4
+    assert loaded.min_margin == pytest.approx(0.1)
+    np.testing.assert_allclose(loaded.centroids, router.centroids, rtol=1e-6)
+    assert QueryRouter.load(str(tmp_path / "missing.npz")) is None
+
+
+def test_load_rejects_corrupted_dimension(router, tmp_path):
+    path = str(tmp_path / "router.npz")
+    np.savez(path, labels=np.array(router.labels), centroids=router.centroids,
+             min_margin=np.float32(router.min_margin), model=np.array("test-embedding"),
+             dimension=np.int64(8))
+
+    with pytest.raises(ValueError):
+        QueryRouter.load(path)
+
+
+def test_compatibility_error(router):
+    assert router.compatibility_error("test-embedding", 4) is None
+    assert router.compatibility_error(None, 4) is None
+    assert "모델 불일치" in router.compatibility_error("other-embedding", 4)
+    assert "차원 불일치" in router.compatibility_error("test-embedding", 8)
+
+    untrained = QueryRouter(router.labels, router.centroids)
+    assert "모델 정보가 없습니다" in untrained.compatibility_error("test-embedding", 4)
+
+
+def test_cross_validation_report():
+    embeddings, labels = make_examples()
+    predictions = cross_validate(embeddings, labels, folds=3)
+    matrix = confusion_matrix(labels, predictions, TYPES)
+
+    assert predictions == labels
+    assert matrix.tolist() == [[6, 0, 0], [0, 6, 0], [0, 0, 6]]
+    assert "정확도: 1.000 (18/18)" in format_report(matrix, TYPES)
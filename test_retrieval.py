@@ -0,0 +1,112 @@
+"""
+교수 문서 검색기 테스트 (4차원 벡터의 작은 FAISS 저장소)
+"""
+import numpy as np
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import FakeEmbeddings
+
+from ann_index import build_index
+from lexical_index import BM25Index
+from retrieval import ProfessorRetriever
+
+CHUNKS = [
+    ("p1:0", "p1", "딥러닝 영상", [1.0, 0.0, 0.0, 0.0]),
+    ("p1:1", "p1", "영상 분석", [0.8, 0.6, 0.0, 0.0]),
+    ("p2:0", "p2", "면역 세포", [0.0, 1.0, 0.0, 0.0]),
+    ("p3:0", "p3", "오가노이드 배양", [0.0, 0.0, 1.0, 0.0]),
+]
+
+
+@pytest.fixture
+def documents():
+    return [Document(page_content=text, metadata={"doc_id": doc_id, "professor_id": pid})
+            for doc_id, pid, text, _ in CHUNKS]
+
+
+@pytest.fixture
+def vector_store(documents):
+    ids = [doc_id for doc_id, *_ in CHUNKS]
+    return FAISS(
+        embedding_function=FakeEmbeddings(size=4),
+        index=build_index(np.asarray([vector for *_, vector in CHUNKS], dtype=np.float32), "flat"),
+        docstore=InMemoryDocstore(dict(zip(ids, documents))),
+        index_to_docstore_id=dict(enumerate(ids)),
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+    )
+
+
+def test_dense_search_groups_chunks_by_professor(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, k=2, fetch_k=4)
+    docs = retriever.search_by_vector([1.0, 0.0, 0.0, 0.0])
+
+    assert docs[0].metadata["professor_id"] == "p1"
+    assert docs[0].metadata["matched_chunks"] == ["p1:0", "p1:1"]
+    assert docs[0].metadata["score"] == pytest.approx(1.0 + 0.1 * 0.8)
+    assert len(docs) == 2
+
+
+def test_lexical_fusion_keeps_cosine_relevance(vector_store, documents):
+    """RRF는 후보 선택에만 쓰고, 어휘 검색에서만 나온 청크의 관련도도 코사인 유사도"""
+    retriever = ProfessorRetriever(vector_store=vector_store, k=2, fetch_k=2,
+                                   lexical_index=BM25Index.from_documents(documents))
+    query = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+    doc_ids, vectors = retriever.fetch_candidates(query)
+    assert doc_ids == ["p1:0", "p1:1"]
+
+    fused_ids, fused_vectors, relevance = retriever.fuse_lexical(query, "오가노이드", doc_ids, vectors,
+                                                                 vectors @ query)
+    assert fused_ids == ["p1:0", "p3:0"]
+    assert relevance.tolist() == pytest.approx([1.0, 0.0])
+    assert fused_vectors.shape == (2, 4)
+
+
+def test_lexical_fusion_without_matches_returns_dense_candidates(vector_store, documents):
+    retriever = ProfessorRetriever(vector_store=vector_store, fetch_k=2,
+                                   lexical_index=BM25Index.from_documents(documents))
+    query = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+    doc_ids, vectors = retriever.fetch_candidates(query)
+    relevance = vectors @ query
+
+    assert retriever.fuse_lexical(query, "taiwan", doc_ids, vectors, relevance)[0] == doc_ids
+
+
+def test_professor_filter_is_preferred_without_changing_scores(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, k=1, fetch_k=4)
+    query = np.array([1.0, 0.0, 0.3, 0.0])
+    assert retriever.search_by_vector(query)[0].metadata["professor_id"] == "p1"
+
+    docs = retriever.search_by_vector(query, professor_filter=frozenset({"p3"}))
+    assert [doc.metadata["professor_id"] for doc in docs] == ["p3"]
+    assert docs[0].metadata["score"] == pytest.approx(0.3 / np.linalg.norm(query))
+
+
+def test_rescore_professors_orders_by_score_and_applies_ratio(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store)
+    query = [0.6, 0.8, 0.0, 0.0]
+
+    docs = retriever.rescore_professors(query, ["p3", "p2", "p1", "missing", "p1"], min_score_ratio=0.5)
+    assert [doc.metadata["professor_id"] for doc in docs] == ["p1", "p2"]
+    assert docs[0].metadata["matched_chunks"] == ["p1:1", "p1:0"]
+    assert docs[0].metadata["score"] == pytest.approx(0.96 + 0.1 * 0.6)
+    assert docs[1].metadata["score"] == pytest.approx(0.8)
+
+    # 기본 비율(0.8)이면 최고 점수에 크게 못 미치는 p2도 제외
+    assert [doc.metadata["professor_id"] for doc in retriever.rescore_professors(query, ["p1", "p2"])] == ["p1"]
+
+
+def test_rescore_professors_limits_chunks_per_professor(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store, max_chunks_per_professor=1)
+    docs = retriever.rescore_professors([0.6, 0.8, 0.0, 0.0], ["p1"])
+
+    assert docs[0].metadata["matched_chunks"] == ["p1:1"]
+    assert docs[0].metadata["score"] == pytest.approx(0.96)
+
+
+def test_rescore_professors_without_indexed_chunks(vector_store):
+    retriever = ProfessorRetriever(vector_store=vector_store)
+    assert retriever.rescore_professors([1.0, 0.0, 0.0, 0.0], []) == []
+    assert retriever.rescore_professors([1.0, 0.0, 0.0, 0.0], ["missing"]) == []
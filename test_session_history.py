@@ -0,0 +1,46 @@
+"""
+세션별 대화 히스토리 테스트 (엔진 하나를 여러 사용자가 공유)
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from rag_lab_recommender import ConversationHistory
+
+
+def test_followup_uses_only_its_own_history(fake_rag):
+    alice, bob = ConversationHistory(), ConversationHistory()
+    fake_rag.process_query("면역 세포 연구하는 교수님 추천해줘", alice)
+    retrieved = alice.last_retrieved
+
+    fake_rag.process_query("그 중에서 논문이 많은 교수님은?", alice)
+    assert alice.last_classification["type"] == "refine_previous"
+    # 이전 결과 재채점이라 같은 교수 안에서 답변
+    assert {ref.professor_id for ref in alice.last_retrieved} <= {ref.professor_id for ref in retrieved}
+
+    # 이전 결과가 없는 세션의 후속 질문은 새 검색으로 처리
+    fake_rag.process_query("그 중에서 논문이 많은 교수님은?", bob)
+    assert bob.last_classification["type"] == "new_search"
+    assert list(bob.queries) == ["그 중에서 논문이 많은 교수님은?"]
+
+    assert len(alice.queries) == 2
+    assert not fake_rag.conversation_history.queries
+
+
+def test_concurrent_sessions_share_one_engine(fake_rag):
+    queries = ["종양 면역 연구실 추천", "분자영상 교수님 알려줘", "단일세포 분석 연구실", "유전체 연구 교수님"]
+    histories = [ConversationHistory() for _ in queries]
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        answers = list(pool.map(fake_rag.process_query, queries, histories))
+
+    assert all(answers)
+    assert [list(history.queries) for history in histories] == [[query] for query in queries]
+    assert all(history.last_trace is not None for history in histories)
+    assert not fake_rag.conversation_history.queries
+
+
+def test_default_history_is_used_without_session(fake_rag):
+    fake_rag.process_query("나노의학 연구실 추천")
+    try:
+        assert list(fake_rag.conversation_history.queries) == ["나노의학 연구실 추천"]
+    finally:
+        fake_rag.conversation_history.clear()
@@ -0,0 +1,50 @@
+"""
+답변 토큰 스트리밍 테스트 (가짜 Azure OpenAI 서버의 SSE 응답)
+"""
+import asyncio
+
+from rag_lab_recommender import ConversationHistory
+
+
+def test_stream_yields_tokens_and_records_turn_at_the_end(fake_rag):
+    history = ConversationHistory()
+    stream = fake_rag.process_query_stream("면역 치료 연구하는 교수님 추천해줘", history)
+
+    first = next(stream)
+    # 답변이 끝나기 전에는 히스토리에 기록하지 않음
+    assert first and not history.queries
+    tokens = [first, *stream]
+
+    assert len(tokens) > 1
+    assert history.queries[-1] == "면역 치료 연구하는 교수님 추천해줘"
+    assert history.context_entries[-1].startswith("Q: 면역 치료 연구하는 교수님 추천해줘\nA: " + "".join(tokens)[:50])
+    assert history.last_retrieved
+    assert history.last_classification["type"] == "new_search"
+    assert history.last_trace.tokens["completion"] > 0
+
+
+def test_stream_matches_blocking_answer(fake_rag):
+    streamed = "".join(fake_rag.process_query_stream("뇌영상 분석 교수님 알려줘", ConversationHistory()))
+    # 같은 질문이라 답변 캐시에서 그대로 반환
+    assert fake_rag.process_query("뇌영상 분석 교수님 알려줘", ConversationHistory()) == streamed
+
+
+def test_async_stream(fake_rag):
+    history = ConversationHistory()
+
+    async def collect():
+        return [token async for token in fake_rag.aprocess_query_stream("나노입자 영상 연구실 추천", history)]
+
+    tokens = asyncio.run(collect())
+    assert len(tokens) > 1
+    assert history.queries[-1] == "나노입자 영상 연구실 추천"
+    assert history.last_trace.tokens["completion"] > 0
+
+
+def test_abandoned_stream_is_not_recorded(fake_rag):
+    history = ConversationHistory()
+    stream = fake_rag.process_query_stream("유전체 분석 교수님 추천", history)
+    next(stream)
+    stream.close()
+
+    assert not history.queries
@@ -0,0 +1,56 @@
+"""
+합성 교수 코퍼스 생성기 테스트 (시드 결정성 / 스키마 / 파일 형식)
+"""
+import json
+import os
+
+import pytest
+
+from synthetic_corpus import SyntheticCorpusGenerator, validate_professor, write_corpus
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "professors_final_complete.json")
+
+
+@pytest.fixture(scope="module")
+def source():
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)["교수진"][:10]
+
+
+def test_same_seed_generates_same_corpus(source):
+    first = list(SyntheticCorpusGenerator(source, seed=7).generate(60))
+    second = list(SyntheticCorpusGenerator(source, seed=7).generate(60))
+
+    assert first == second
+    assert first[:10] == source
+    assert first[10:] != list(SyntheticCorpusGenerator(source, seed=8).generate(60))[10:]
+
+
+def test_professor_is_independent_of_generation_order(source):
+    generator = SyntheticCorpusGenerator(source, seed=3)
+    forward = list(generator.generate(30))
+
+    assert [generator.professor(index) for index in reversed(range(30))] == forward[::-1]
+
+
+def test_generated_professors_match_schema(source):
+    generator = SyntheticCorpusGenerator(source, seed=0, include_source=False)
+    professors = list(generator.generate(50))
+
+    assert all(validate_professor(professor) == [] for professor in professors)
+    assert professors[0]["기본정보"]["이메일"] == "prof0000000@synthetic.example.ac.kr"
+    assert len({professor["기본정보"]["이메일"] for professor in professors}) == 50
+    assert validate_professor({"기본정보": "x"})
+
+
+def test_write_corpus_produces_data_file_format(source, tmp_path):
+    path = tmp_path / "corpus.json"
+    professors = list(SyntheticCorpusGenerator(source, seed=1).generate(15))
+    seen = []
+
+    count = write_corpus(str(path), iter(professors), {"교수수": 15},
+                         on_professor=lambda index, professor: seen.append(index))
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert count == 15 and seen == list(range(15))
+    assert data == {"메타데이터": {"교수수": 15}, "사용법": {}, "교수진": professors}
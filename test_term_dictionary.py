@@ -0,0 +1,64 @@
+"""
+한→영 연구 용어 사전 테스트
+"""
+from term_dictionary import (TermDictionary, extract_candidate_terms, extract_parenthesized_pairs,
+                             strip_particle)
+
+PROFESSOR = {
+    "연구분야": {"키워드": "면역, 암 치료 및 오가노이드를", "설명": "장내 미생물군집(microbiota) 연구"},
+    "기술및방법": ["단일세포 시퀀싱"],
+    "연구주제": ["연구 방법론"],
+    "논문": ["염증조절복합체 (NLRP3 inflammasome) 분석"],
+}
+
+
+def test_longest_match_wins():
+    dictionary = TermDictionary()
+    assert dictionary.match_word("종양미세환경에서") == ["tumor microenvironment"]
+    assert dictionary.match_word("오가노이드배양") == ["organoid", "culture"]
+    assert dictionary.match_word("큐브") == []
+
+
+def test_expand_skips_stopwords_and_reports_coverage():
+    dictionary = TermDictionary()
+
+    keywords, coverage = dictionary.expand("딥러닝 연구하는 교수님 추천해줘")
+    assert keywords == ["deep learning"]
+    assert coverage == 1.0
+
+    keywords, coverage = dictionary.expand("오가노이드 배양과 큐브 연구")
+    assert keywords == ["organoid", "culture"]
+    assert coverage == 2 / 3
+
+    assert dictionary.expand("") == ([], 1.0)
+
+
+def test_custom_terms_ignore_spaces():
+    dictionary = TermDictionary({"단일 세포": "single-cell", "빈값": ""})
+    assert len(dictionary) == 1
+    assert dictionary.match_word("단일세포") == ["single-cell"]
+
+
+def test_save_and_load_merge_with_seed_terms(tmp_path):
+    path = str(tmp_path / "terms.json")
+    TermDictionary({"큐브": "cube"}).save(path, source="test")
+
+    dictionary = TermDictionary.load(path)
+    assert dictionary.match_word("큐브") == ["cube"]
+    assert dictionary.match_word("딥러닝") == ["deep learning"]
+    assert len(TermDictionary.load(str(tmp_path / "missing.json"))) == len(TermDictionary())
+
+
+def test_strip_particle_keeps_short_stems():
+    assert strip_particle("오가노이드를") == "오가노이드"
+    assert strip_particle("세포에서") == "세포"
+    assert strip_particle("암을") == "암을"
+
+
+def test_extract_terms_from_professor_fields():
+    candidates = extract_candidate_terms([PROFESSOR])
+    assert candidates["면역"] == 1 and candidates["오가노이드"] == 1 and candidates["단일세포"] == 1
+    assert "암" not in candidates and "연구" not in candidates
+
+    assert extract_parenthesized_pairs([PROFESSOR]) == {"미생물군집": "microbiota",
+                                                       "염증조절복합체": "NLRP3 inflammasome"}
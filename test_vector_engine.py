@@ -0,0 +1,93 @@
+"""
+벡터 검색 엔진 테스트 (부분 정렬 top-k / 배치 검색 / MMR 선택)
+"""
+import numpy as np
+import pytest
+
+from vector_engine import VectorSearchEngine, mmr_select, normalize_rows, top_k_indices
+
+
+def full_sort(scores, top_k):
+    return np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+
+
+@pytest.mark.parametrize("top_k", [1, 3, 10])
+def test_top_k_matches_full_sort(top_k):
+    scores = np.random.default_rng(0).normal(size=(4, 10)).astype(np.float32)
+    np.testing.assert_array_equal(top_k_indices(scores, top_k), full_sort(scores, top_k))
+
+
+def test_top_k_with_ties_returns_top_scores():
+    scores = np.array([[0.5, 0.9, 0.5, 0.1, 0.5, 0.9]], dtype=np.float32)
+    indices = top_k_indices(scores, 3)[0]
+
+    assert len(set(indices.tolist())) == 3
+    assert set(indices[:2].tolist()) == {1, 5}
+    assert scores[0, indices].tolist() == pytest.approx([0.9, 0.9, 0.5])
+
+
+def test_top_k_bounds():
+    scores = np.array([0.2, 0.7, 0.1], dtype=np.float32)
+
+    assert top_k_indices(scores, 10).tolist() == [[1, 0, 2]]
+    assert top_k_indices(scores, 0).shape == (1, 0)
+    assert top_k_indices(scores, -1).shape == (1, 0)
+
+
+def test_normalize_rows_keeps_zero_vectors():
+    rows = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert rows.dtype == np.float32
+    np.testing.assert_allclose(rows, [[0.6, 0.8], [0.0, 0.0]], rtol=1e-6)
+
+
+def test_search_batch_matches_single_searches():
+    rng = np.random.default_rng(1)
+    engine = VectorSearchEngine(rng.normal(size=(20, 8)))
+    queries = rng.normal(size=(5, 8))
+
+    assert engine.size == 20 and engine.dimension == 8
+    for batched, query in zip(engine.search_batch(queries, 4), queries):
+        single = engine.search(query, 4)
+        assert [i for i, _ in batched] == [i for i, _ in single]
+        assert [score for _, score in batched] == pytest.approx([score for _, score in single])
+
+    best, similarity = engine.search(engine.matrix[7] * 2.0, 1)[0]
+    assert best == 7 and similarity == pytest.approx(1.0)
+
+
+def test_empty_engine_and_set_matrix():
+    engine = VectorSearchEngine()
+    assert engine.search_batch([[1.0, 0.0], [0.0, 1.0]]) == [[], []]
+
+    with pytest.raises(ValueError):
+        engine.set_matrix(np.ones((2, 2), dtype=np.float64))
+    matrix = normalize_rows(np.eye(2))
+    engine.set_matrix(matrix)
+    assert engine.matrix is matrix
+
+
+CANDIDATES = np.array([
+    [1.0, 0.3, 0.0],
+    [1.0, 0.25, 0.0],  # 0번과 거의 같은 방향 (관련도 2위)
+    [0.3, 1.0, 0.0],
+    [0.0, 0.0, 1.0],
+], dtype=np.float32)
+QUERY = [1.0, 0.5, 0.0]
+
+
+def test_mmr_with_lambda_one_is_relevance_order():
+    assert mmr_select(QUERY, CANDIDATES, 4, lambda_mult=1.0) == [0, 1, 2, 3]
+
+
+def test_mmr_prefers_diverse_candidates():
+    # 관련도 2위인 중복 후보보다 방향이 다른 후보를 먼저 선택
+    assert mmr_select(QUERY, CANDIDATES, 4, lambda_mult=0.5) == [0, 2, 3, 1]
+    assert mmr_select(QUERY, CANDIDATES, 2, lambda_mult=0.0) == [0, 3]
+
+
+def test_mmr_uses_given_relevance_and_bounds():
+    relevance = np.array([0.1, 0.2, 0.3, 1.0])
+    assert mmr_select(QUERY, CANDIDATES, 2, lambda_mult=1.0, relevance=relevance) == [3, 2]
+    assert sorted(mmr_select(QUERY, CANDIDATES, 10)) == [0, 1, 2, 3]
+    assert mmr_select(QUERY, CANDIDATES, 0) == []
+    assert mmr_select(QUERY, np.zeros((0, 3), dtype=np.float32), 3) == []
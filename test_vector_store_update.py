@@ -0,0 +1,145 @@
+"""
+벡터 저장소 증분 갱신 테스트 (매니페스트 비교 / 변경 교수만 재임베딩 / 전체 재생성 대체 경로)
+"""
+import copy
+import json
+import os
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from fake_openai_server import fake_embedding
+
+DIMENSION = 16
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "professors_final_complete.json")
+
+
+class CountingEmbeddings(Embeddings):
+    """임베딩한 텍스트를 기록하는 결정적 가짜 임베딩 (정규화되지 않은 벡터 반환)"""
+
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[3.0 * x for x in fake_embedding(text, DIMENSION)] for text in texts]
+
+    def embed_query(self, text):
+        return fake_embedding(text, DIMENSION)
+
+
+@pytest.fixture(scope="module")
+def professors():
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)["교수진"][:3]
+
+
+@pytest.fixture
+def make_rag(tmp_path, monkeypatch):
+    """가짜 임베딩을 쓰는 LabRecommenderRAG (캐시/라우터/용어 사전 기본 경로는 tmp_path 아래)"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "http://127.0.0.1:9")
+    monkeypatch.setenv("OPENAI_API_KEY", "fake")
+    monkeypatch.setenv("OPENAI_API_VERSION", "2024-02-01")
+    from rag_lab_recommender import LabRecommenderRAG
+
+    def make(professors, index_type="flat"):
+        data_path = tmp_path / "professors.json"
+        data_path.write_text(json.dumps({"교수진": professors}, ensure_ascii=False), encoding="utf-8")
+        rag = LabRecommenderRAG(str(data_path), str(tmp_path / "vector_store"), index_type=index_type)
+        rag.embeddings = CountingEmbeddings()
+        return rag
+
+    return make
+
+
+def chunk_texts(rag, pid):
+    return [doc.page_content for doc in rag.load_and_chunk_data() if doc.metadata["professor_id"] == pid]
+
+
+def stored_documents(rag):
+    store = rag.vector_store
+    return [store.docstore.search(store.index_to_docstore_id[i]) for i in range(store.index.ntotal)]
+
+
+def test_update_re_embeds_only_changed_professor(make_rag, professors):
+    rag = make_rag(professors)
+    rag.create_vector_store()
+    pids = list(rag.load_manifest()["professors"])
+    assert len(pids) == 3
+
+    changed = copy.deepcopy(professors)
+    changed[1]["연구분야"]["키워드"] += ", 큐브위성"
+    rag = make_rag(changed)
+    rag.update_vector_store()
+
+    assert rag.embeddings.texts == chunk_texts(rag, pids[1])
+    manifest = rag.load_manifest()["professors"]
+    assert list(manifest) == pids
+    assert rag.vector_store.index.ntotal == sum(len(entry["doc_ids"]) for entry in manifest.values())
+
+    # docstore와 BM25 모두 변경된 내용을 반영
+    docs = stored_documents(rag)
+    assert any("큐브위성" in doc.page_content for doc in docs if doc.metadata["professor_id"] == pids[1])
+    hits = [doc_id for doc_id, _ in rag.lexical_index.search("큐브위성")]
+    assert hits and all(doc_id.startswith(pids[1]) for doc_id in hits)
+
+    # 증분 추가된 벡터도 build_index처럼 단위 벡터
+    vectors = rag.vector_store.index.reconstruct_n(0, rag.vector_store.index.ntotal)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+
+
+def test_update_adds_and_removes_professors(make_rag, professors):
+    rag = make_rag(professors[:2])
+    rag.create_vector_store()
+    removed = list(rag.load_manifest()["professors"])[0]
+
+    rag = make_rag(professors[1:])
+    rag.update_vector_store()
+    added = list(rag.load_manifest()["professors"])[-1]
+
+    assert rag.embeddings.texts == chunk_texts(rag, added)
+    assert removed not in rag.load_manifest()["professors"]
+    assert {doc.metadata["professor_id"] for doc in stored_documents(rag)} == set(rag.load_manifest()["professors"])
+
+
+def test_unchanged_corpus_embeds_nothing(make_rag, professors):
+    make_rag(professors).create_vector_store()
+
+    rag = make_rag(professors)
+    rag.update_vector_store()
+    assert rag.embeddings.texts == []
+
+
+def test_index_type_switch_rebuilds(make_rag, professors):
+    make_rag(professors).create_vector_store()
+
+    rag = make_rag(professors, index_type="hnsw")
+    rag.update_vector_store()
+    assert len(rag.embeddings.texts) == len(rag.load_and_chunk_data())
+    assert rag.load_manifest()["index_type"] == "hnsw"
+
+
+def test_index_without_removal_rebuilds_on_change(make_rag, professors):
+    make_rag(professors, index_type="hnsw").create_vector_store()
+
+    changed = copy.deepcopy(professors)
+    changed[0]["연구분야"]["키워드"] += ", 큐브위성"
+    rag = make_rag(changed, index_type="hnsw")
+    rag.update_vector_store()
+    assert len(rag.embeddings.texts) == len(rag.load_and_chunk_data())
+
+
+def test_professor_level_store_is_rechunked(make_rag, professors):
+    rag = make_rag(professors)
+    rag.create_vector_store()
+    manifest = rag.load_manifest()
+    manifest["chunking"] = "professor"
+    with open(rag.manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    rag = make_rag(professors)
+    rag.update_vector_store()
+    assert len(rag.embeddings.texts) == len(rag.load_and_chunk_data())
+    assert rag.load_manifest()["chunking"] == "field"
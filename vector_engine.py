@@ -0,0 +1,116 @@
+"""
+교수 임베딩 벡터 검색 엔진
+정규화된 float32 행렬 + 행렬곱 + 부분 정렬(top-k) 기반 유사도 검색
+"""
+
+import numpy as np
+from typing import List, Sequence, Tuple
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (0 벡터는 그대로 유지)"""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """점수 배열에서 상위 k개 인덱스를 내림차순으로 반환 (전체 정렬 없이 부분 선택)"""
+    scores = np.atleast_2d(scores)
+    n = scores.shape[1]
+    top_k = min(top_k, n)
+    if top_k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+
+    if top_k < n:
+        # argpartition으로 상위 k개만 뽑은 뒤 그 k개만 정렬
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    else:
+        candidates = np.tile(np.arange(n), (scores.shape[0], 1))
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class VectorSearchEngine:
+    """정규화된 임베딩 행렬 기반 코사인 유사도 검색 엔진"""
+
+    def __init__(self, embeddings: Sequence[Sequence[float]] = None):
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        if embeddings is not None and len(embeddings) > 0:
+            self.set_embeddings(embeddings)
+
+    def set_embeddings(self, embeddings: Sequence[Sequence[float]]):
+        """임베딩 목록을 연속된 정규화 float32 행렬로 변환해 보관"""
+        self.matrix = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+
+    def set_matrix(self, matrix: np.ndarray):
+        """이미 정규화된 float32 행렬(memmap 포함)을 복사 없이 그대로 사용"""
+        if matrix.dtype != np.float32 or not matrix.flags["C_CONTIGUOUS"]:
+            raise ValueError("연속된 float32 행렬만 직접 사용할 수 있습니다.")
+        self.matrix = matrix
+
+    @property
+    def size(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    def search(self, query_embedding: Sequence[float], top_k: int = 5) -> List[Tuple[int, float]]:
+        """단일 쿼리 검색 - (교수 인덱스, 유사도) 목록 반환"""
+        return self.search_batch([query_embedding], top_k)[0]
+
+    def search_batch(self, query_embeddings: Sequence[Sequence[float]], top_k: int = 5) -> List[List[Tuple[int, float]]]:
+        """여러 쿼리를 한 번의 행렬곱으로 검색"""
+        if self.size == 0:
+            return [[] for _ in range(len(query_embeddings))]
+
+        queries = normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        scores = queries @ self.matrix.T
+        indices = top_k_indices(scores, top_k)
+
+        results = []
+        for row, row_indices in enumerate(indices):
+            results.append([(int(i), float(scores[row, i])) for i in row_indices])
+        return results
+
+
+def mmr_select(query_embedding: Sequence[float], candidates: np.ndarray, k: int,
+               lambda_mult: float = 0.5, relevance: np.ndarray = None) -> List[int]:
+    """정규화된 후보 행렬 위에서 MMR(Maximal Marginal Relevance) 선택
+
+    후보 간 유사도는 선택된 후보의 행만 한 번씩 계산하고(k x fetch_k),
+    선택된 후보와의 최대 유사도를 누적 갱신하여 파이썬 루프는 k회만 돈다.
+    """
+    if len(candidates) == 0 or k <= 0:
+        return []
+
+    candidates = normalize_rows(candidates)
+    if relevance is None:
+        query = normalize_rows(np.asarray(query_embedding, dtype=np.float32))[0]
+        relevance = candidates @ query
+    relevance = np.asarray(relevance, dtype=np.float32)
+
+    k = min(k, len(candidates))
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+    max_similarity = candidates @ candidates[first]
+    available = np.ones(len(candidates), dtype=bool)
+    available[first] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        chosen = int(np.argmax(scores))
+        selected.append(chosen)
+        available[chosen] = False
+        np.maximum(max_similarity, candidates @ candidates[chosen], out=max_similarity)
+
+    return selected